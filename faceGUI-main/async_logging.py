@@ -0,0 +1,144 @@
+"""
+Asynchronous, rate-limited logging for the render/inference threads.
+
+`start_queue_logging` moves the real handlers (e.g. the `face01_debug.log`
+FileHandler) behind a `QueueHandler`/`QueueListener` pair, so callers only
+enqueue records and disk I/O happens on a background thread. Records are not
+pre-formatted on the caller's thread: `Lazy` payloads are rendered by the
+writer, and only if the record survived level checks, rate limiting and
+sampling. Frame telemetry goes to a separate JSON-lines file via `log_frame`.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+TELEMETRY_LOGGER = "face01.telemetry"
+
+
+class Lazy:
+    """Defer building an expensive log argument until the message is formatted.
+
+    The callable runs on the writer thread, so it should capture values that
+    will not be mutated afterwards (e.g. a landmark protobuf, not a reused buffer).
+    """
+
+    __slots__ = ("_fn",)
+
+    def __init__(self, fn: Callable[[], object]):
+        self._fn = fn
+
+    def __str__(self):
+        try:
+            return str(self._fn())
+        except Exception as e:  # never let a log payload break the writer
+            return f"<lazy payload failed: {e!r}>"
+
+    __repr__ = __str__
+
+
+class RateLimitFilter(logging.Filter):
+    """Per-call-site token bucket plus 1-in-N sampling for records below `exempt_level`.
+
+    rate: sustained records per second allowed for one message template.
+    burst: bucket size (records allowed back to back).
+    sample_every: keep only every Nth record of a call site (1 = keep all).
+    """
+
+    def __init__(self, rate: float = 2.0, burst: int = 10, sample_every: int = 1,
+                 exempt_level: int = logging.WARNING):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample_every = max(1, int(sample_every))
+        self.exempt_level = exempt_level
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.exempt_level:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last, seen = self._buckets.get(key, (float(self.burst), now, 0))
+            seen += 1
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            keep = seen % self.sample_every == 0 and tokens >= 1.0
+            if keep:
+                tokens -= 1.0
+            else:
+                self.suppressed += 1
+            self._buckets[key] = (tokens, now, seen)
+        return keep
+
+
+class _ThreadQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler for an in-process queue: skip the eager format in prepare()
+    so the message (and any Lazy args) is rendered on the listener thread."""
+
+    def prepare(self, record):
+        return record
+
+
+class _NonBlockingQueueHandler(_ThreadQueueHandler):
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _NonBlockingQueueHandler.dropped += 1
+
+
+class CompactJsonFormatter(logging.Formatter):
+    """One compact JSON object per line: {"t": epoch, ...fields}."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = getattr(record, "fields", None) or {"msg": record.getMessage()}
+        return json.dumps({"t": round(record.created, 4), **payload}, separators=(",", ":"), default=str)
+
+
+_listeners = []
+
+
+def start_queue_logging(logger: logging.Logger, handlers: Iterable[logging.Handler],
+                        rate_filter: Optional[logging.Filter] = None, maxsize: int = 10000):
+    """Route `logger` through a queue to `handlers` written on a background thread.
+
+    Returns the QueueListener; it is stopped (and the queue flushed) at exit.
+    When the queue is full, new records are dropped rather than blocking the caller.
+    """
+    q = queue.Queue(maxsize=maxsize)
+    qh = _NonBlockingQueueHandler(q)
+    if rate_filter is not None:
+        qh.addFilter(rate_filter)
+    listener = logging.handlers.QueueListener(q, *handlers, respect_handler_level=True)
+    listener.start()
+    logger.addHandler(qh)
+    _listeners.append(listener)
+    return listener
+
+
+def stop_queue_logging() -> None:
+    """Flush and stop every listener started by `start_queue_logging`."""
+    while _listeners:
+        listener = _listeners.pop()
+        try:
+            listener.stop()
+        except Exception:
+            pass
+
+
+atexit.register(stop_queue_logging)
+
+
+def log_frame(logger: logging.Logger, **fields) -> None:
+    """Emit one structured telemetry record; a no-op unless the logger is enabled for DEBUG."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("frame", extra={"fields": fields})
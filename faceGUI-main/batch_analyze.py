@@ -0,0 +1,292 @@
+"""
+Headless batch analysis: stream image folders, globs and video files through
+MediaPipe FaceMesh on a process pool and write one record per detected face
+(`face` is its index in the frame; a frame without a face gives one record
+with `faces: 0`) to JSONL (default) or Parquet (requires pyarrow).
+
+Each worker process builds its own FaceMesh in the pool initializer, because
+a FaceMesh graph cannot be shared across processes. Videos are split into
+frame-range chunks so a single long recording also spreads across all cores.
+
+Usage:
+    python batch_analyze.py photos/ "shots/**/*.jpg" session.mp4 -o results.jsonl -j 8
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from face_analysis import MAX_LANDMARKS, analyze_faces, create_face_mesh, landmarks_to_array, read_image_reduced
+from features import default_engine
+from frame_sources import VideoFileSource
+from result_cache import DEFAULT_CACHE_DIR, CachedResult, ResultCache, hash_file
+from roi import downscale_for_inference
+
+logger = logging.getLogger("face01.batch")
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+VIDEO_EXTS = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v", ".wmv"}
+INFERENCE_MAX_SIDE = 1280
+
+# Per-process state, set by _init_worker
+_worker_mesh = None
+_worker_cache = None
+_worker_settings = {}
+
+
+def collect_tasks(inputs, chunk_frames: int = 300, stride: int = 1):
+    """Expand directories/globs/files into (kind, path, start, stop, stride) tasks."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for p in sorted(Path(item).rglob("*")):
+                if p.suffix.lower() in IMAGE_EXTS | VIDEO_EXTS:
+                    paths.append(str(p))
+        elif any(ch in item for ch in "*?["):
+            paths.extend(sorted(glob.glob(item, recursive=True)))
+        elif os.path.exists(item):
+            paths.append(item)
+        else:
+            logger.warning("collect_tasks: no such input %s", item)
+
+    tasks = []
+    for path in dict.fromkeys(paths):  # 중복 입력 제거 (순서 유지)
+        ext = Path(path).suffix.lower()
+        if ext in IMAGE_EXTS:
+            tasks.append(("image", path, 0, 1, 1))
+        elif ext in VIDEO_EXTS:
+            with VideoFileSource(path) as src:
+                total = src.frame_count
+            if total <= 0:
+                # 프레임 수를 알 수 없으면 한 작업으로 끝까지 읽습니다.
+                tasks.append(("video", path, 0, -1, stride))
+                continue
+            for start in range(0, total, chunk_frames):
+                tasks.append(("video", path, start, min(start + chunk_frames, total), stride))
+    return tasks
+
+
+def _init_worker(refine_landmarks: bool, max_num_faces: int, min_detection_confidence: float,
+                 cache_dir: Optional[str] = None):
+    """Pool initializer: one FaceMesh (and cache handle) per worker process."""
+    global _worker_mesh, _worker_cache, _worker_settings
+    _worker_settings = dict(
+        static_image_mode=True,
+        max_num_faces=max_num_faces,
+        refine_landmarks=refine_landmarks,
+        min_detection_confidence=min_detection_confidence,
+    )
+    _worker_mesh = create_face_mesh(**_worker_settings)
+    _worker_cache = ResultCache(cache_dir) if cache_dir else None
+
+
+def _infer(rgb: np.ndarray) -> Optional[np.ndarray]:
+    """FaceMesh on `rgb`; returns an (F, N, 3) landmark batch or None."""
+    # 큰 사진은 축소해서 추론 (정규화 좌표는 그대로 유효)
+    results = _worker_mesh.process(downscale_for_inference(rgb, INFERENCE_MAX_SIDE))
+    if not (results and results.multi_face_landmarks):
+        return None
+    return np.stack([landmarks_to_array(lm) for lm in results.multi_face_landmarks])
+
+
+def _make_records(batch: Optional[np.ndarray], analyses, w: int, h: int, source: str, frame_idx: int,
+                  with_landmarks: bool) -> list:
+    """One record per face in `batch` (one record with `faces: 0` if there is none)."""
+    if batch is None or not len(batch):
+        return [{"source": source, "frame": frame_idx, "width": w, "height": h, "faces": 0}]
+    # 거리/해상도와 무관한 특징 (눈 사이 거리로 정규화, 각도는 도)
+    engine = default_engine()
+    features = engine.as_dicts(engine.compute(batch, w, h)) if batch.shape[1] >= engine.min_landmarks else None
+    records = []
+    for i in range(len(batch)):
+        record = {"source": source, "frame": frame_idx, "width": w, "height": h, "faces": len(batch),
+                  "face": i, "analysis": analyses[i]}
+        if features is not None:
+            record["features"] = features[i]
+        if with_landmarks:
+            record["landmarks"] = np.round(batch[i], 6).tolist()
+        records.append(record)
+    return records
+
+
+def _analyze_rgb(rgb: np.ndarray, source: str, frame_idx: int, with_landmarks: bool) -> list:
+    h, w = rgb.shape[:2]
+    batch = _infer(rgb)
+    analyses = analyze_faces(batch, w, h) if batch is not None else []
+    return _make_records(batch, analyses, w, h, source, frame_idx, with_landmarks)
+
+
+def _analyze_image(path: str, with_landmarks: bool) -> list:
+    """Still image: served from the result cache when possible (no decode, no inference)."""
+    key = None
+    if _worker_cache is not None:
+        key = hash_file(path, dict(_worker_settings, inference_max_side=INFERENCE_MAX_SIDE, mode="batch"))
+        entry = _worker_cache.get(key)
+        if entry is not None:
+            batch = entry.landmarks if entry.landmarks.size else None
+            return _make_records(batch, entry.analyses, entry.width, entry.height, path, 0, with_landmarks)
+    # 큰 사진은 추론 크기로 줄여서 디코딩 (측정은 원본 크기 기준)
+    image = read_image_reduced(path, INFERENCE_MAX_SIDE)
+    w, h = image.width, image.height
+    batch = _infer(image.rgb)
+    analyses = analyze_faces(batch, w, h) if batch is not None else []
+    if key is not None:
+        empty = np.zeros((0, MAX_LANDMARKS, 3), dtype=np.float32)
+        _worker_cache.put(key, CachedResult(batch if batch is not None else empty, analyses, w, h))
+    return _make_records(batch, analyses, w, h, path, 0, with_landmarks)
+
+
+def process_task(args):
+    """Worker entry point: returns the list of records for one task."""
+    (kind, path, start, stop, stride), with_landmarks = args
+    records = []
+    try:
+        if kind == "image":
+            records.extend(_analyze_image(path, with_landmarks))
+            return records
+        with VideoFileSource(path) as src:
+            if start:
+                src.seek(start)
+            idx = start
+            frame = rgb = None  # 디코딩/색 변환 버퍼를 프레임마다 재사용
+            while stop < 0 or idx < stop:
+                ok = src.grab()
+                if not ok:
+                    break
+                # 청크 시작이 아니라 영상 전체 기준으로 N번째 프레임 (청크 경계와 무관)
+                if idx % stride == 0:
+                    ok, frame = src.retrieve(frame)
+                    if ok and frame is not None:
+                        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+                        records.extend(_analyze_rgb(rgb, path, idx, with_landmarks))
+                idx += 1
+    except Exception as e:
+        logger.exception("process_task failed for %s [%s:%s]: %s", path, start, stop, e)
+        records.append({"source": path, "frame": start, "error": str(e)})
+    return records
+
+
+class JsonlWriter:
+    def __init__(self, path):
+        self._f = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+
+    def write(self, records):
+        for r in records:
+            self._f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+    def close(self):
+        if self._f is not sys.stdout:
+            self._f.close()
+
+
+class ParquetWriter:
+    """Buffers records and writes row groups with pyarrow."""
+
+    def __init__(self, path, row_group_size: int = 2048):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow")
+        self._pa, self._pq = pa, pq
+        self._path = path
+        self._rows = []
+        self._row_group_size = row_group_size
+        self._writer = None
+        self._schema = pa.schema([
+            ("source", pa.string()),
+            ("frame", pa.int64()),
+            ("width", pa.int32()),
+            ("height", pa.int32()),
+            ("faces", pa.int32()),
+            ("face", pa.int32()),
+            ("analysis", pa.string()),
+            ("landmarks", pa.list_(pa.list_(pa.float32(), 3))),
+            ("features", pa.struct([(name, pa.float32()) for name in default_engine().names])),
+            ("error", pa.string()),
+        ])
+
+    def write(self, records):
+        self._rows.extend(records)
+        if len(self._rows) >= self._row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        cols = {name: [r.get(name) for r in self._rows] for name in self._schema.names}
+        table = self._pa.Table.from_pydict(cols, schema=self._schema)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, self._schema)
+        self._writer.write_table(table)
+        self._rows = []
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_writer(path):
+    if str(path).lower().endswith(".parquet"):
+        return ParquetWriter(path)
+    return JsonlWriter(path)
+
+
+def run(inputs, output, workers=None, chunk_frames=300, stride=1, with_landmarks=True,
+        refine_landmarks=True, max_num_faces=1, min_detection_confidence=0.5, cache_dir=DEFAULT_CACHE_DIR):
+    """Analyze every input on a process pool and stream records to `output`. Returns frame count."""
+    tasks = collect_tasks(inputs, chunk_frames=chunk_frames, stride=stride)
+    if not tasks:
+        logger.warning("run: nothing to do for inputs %s", inputs)
+        return 0
+    workers = workers or os.cpu_count() or 1
+    writer = open_writer(output)
+    n_frames = 0
+    t0 = time.perf_counter()
+    try:
+        with Pool(processes=workers, initializer=_init_worker,
+                  initargs=(refine_landmarks, max_num_faces, min_detection_confidence, cache_dir)) as pool:
+            # 결과는 끝나는 순서대로 바로 기록해서 메모리에 쌓이지 않게 합니다.
+            for records in pool.imap_unordered(process_task, [(t, with_landmarks) for t in tasks]):
+                writer.write(records)
+                n_frames += sum(1 for r in records if not r.get("face"))  # 프레임마다 face 0 또는 faces 0
+    finally:
+        writer.close()
+    dt = time.perf_counter() - t0
+    logger.info("batch: %s frames from %s tasks in %.1fs (%.1f frames/s, %s workers)",
+                n_frames, len(tasks), dt, n_frames / dt if dt > 0 else 0.0, workers)
+    return n_frames
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Batch FaceMesh physiognomy analysis for images and videos.")
+    ap.add_argument("inputs", nargs="+", help="image/video files, directories or glob patterns")
+    ap.add_argument("-o", "--output", default="-", help="output .jsonl or .parquet (default: stdout JSONL)")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--stride", type=int, default=1, help="analyze every Nth video frame")
+    ap.add_argument("--chunk-frames", type=int, default=300, help="video frames per worker task")
+    ap.add_argument("--no-landmarks", action="store_true", help="omit landmark arrays from the output")
+    ap.add_argument("--max-faces", type=int, default=1)
+    ap.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="still-image result cache directory")
+    ap.add_argument("--no-cache", action="store_true", help="always decode and re-run inference")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s", stream=sys.stderr)
+    n = run(args.inputs, args.output, workers=args.workers, chunk_frames=args.chunk_frames,
+            stride=max(1, args.stride), with_landmarks=not args.no_landmarks, max_num_faces=args.max_faces,
+            cache_dir=None if args.no_cache else args.cache_dir)
+    return 0 if n else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
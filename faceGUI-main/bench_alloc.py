@@ -0,0 +1,165 @@
+"""
+Per-frame allocation check for the live preview's frame path; no camera or display needed.
+
+Frames are read from a source into a reused buffer, mirrored and converted
+to RGB into a pooled buffer (`FramePipeline.make_packet`) and widened into
+the reused RGBA display buffer (`render.to_pil`), exactly as the GUI does.
+After a warm-up, `tracemalloc` (which sees numpy and cv2 array data) records
+how far memory rose during each frame. The old path (`cv2.flip` and
+`cv2.cvtColor` returning new arrays) is measured for comparison, and so is
+the full frame including `_process_packet` (inference, tracking, overlay,
+analysis). By default the model is `ArrayMesh`, which hands out landmarks
+from reused arrays like a replayed recording, so only the app's own
+allocations are counted; with `--mesh synthetic` or `mediapipe` the model's
+per-call output objects are included and the full-frame bound is not checked.
+
+    python bench_alloc.py                            # synthetic 640x480 frames
+    python bench_alloc.py --source clip.mp4 --mesh mediapipe
+
+Exit code 1 when either path creates a frame buffer after warm-up, the
+pooled path allocates more than --max-bytes in any frame, or the full frame
+allocates more than --max-frame-fraction of one BGR frame. The guarantee is
+"no frame-sized allocations", not zero bytes: the per-frame `FramePacket`
+object and small NumPy temporaries (tracker matching, analysis text) remain.
+"""
+import argparse
+import json
+import sys
+import tracemalloc
+import types
+
+import cv2
+import numpy as np
+
+import face01
+from face_analysis import SyntheticMesh
+from frame_sources import open_source
+from pipeline import FramePipeline
+from render import to_pil
+
+
+class ArrayMesh:
+    """FaceMesh stand-in returning jittered landmark arrays from reused buffers (no per-call output objects)."""
+
+    def __init__(self, max_num_faces: int = 1, seed: int = 0):
+        synthetic = SyntheticMesh(max_num_faces, seed)
+        self.base = synthetic.base
+        self.jitter = synthetic.rng.normal(0, 0.002, size=(16,) + self.base.shape).astype(np.float32)
+        self.out = np.empty_like(self.base)
+        self.results = types.SimpleNamespace(multi_face_landmarks=list(self.out))
+        self.calls = 0
+
+    def process(self, rgb):
+        np.add(self.base, self.jitter[self.calls % len(self.jitter)], out=self.out)
+        self.calls += 1
+        return self.results
+
+    def close(self):
+        pass
+
+
+def measure(step, warmup: int, frames: int, buffers=None) -> dict:
+    """Peak traced-memory growth (bytes) of `step(i)` per frame after `warmup` frames."""
+    for i in range(warmup):
+        step(i)
+    allocations = buffers.allocations if buffers is not None else 0
+    growth = []
+    tracemalloc.start()
+    try:
+        for i in range(frames):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            step(warmup + i)
+            growth.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    out = {"mean_bytes": round(sum(growth) / len(growth), 1), "max_bytes": max(growth)}
+    if buffers is not None:
+        out["buffer_allocations"] = buffers.allocations - allocations  # 예열 이후 새로 만든 프레임 버퍼
+    return out
+
+
+def run(source_spec: str = "synthetic:640x480", frames: int = 200, warmup: int = 20, mesh: str = "array") -> dict:
+    """Measure the legacy, pooled and full-frame paths; returns the report dict."""
+    source = open_source(source_spec, loop=True, preload=True)
+    if mesh == "array":
+        model = ArrayMesh(1)
+        face01.get_face_mesh = lambda **overrides: model
+    elif mesh == "synthetic":
+        model = SyntheticMesh(1)
+        face01.get_face_mesh = lambda **overrides: model
+    elif mesh != "mediapipe":
+        raise ValueError(f"unknown mesh {mesh!r} (array, synthetic or mediapipe)")
+    app = face01.PhysiognomyApp.headless()
+    pipeline = FramePipeline(app._process_packet)
+    state = {"raw": None, "shown": None, "rgba": None}
+
+    def pooled(seq, process=False):
+        ok, frame = source.read(state["raw"])
+        if not ok:
+            raise SystemExit("source returned no frame")
+        state["raw"] = frame
+        pkt = pipeline.make_packet(frame, seq, 0.0)
+        if process:
+            app._process_packet(pkt)
+        if state["rgba"] is None:
+            state["rgba"] = np.empty(pkt.rgb.shape[:2] + (4,), dtype=np.uint8)
+        to_pil(pkt.rgb, state["rgba"])
+        # 다음 프레임이 표시될 때 버퍼를 돌려주는 latest_result 와 같은 순서
+        pipeline.recycle(state["shown"])
+        state["shown"] = pkt
+
+    def legacy(seq):
+        ok, frame = source.read()
+        rgb = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+        to_pil(rgb)
+
+    try:
+        report = {"source": source_spec, "mesh": mesh, "frames": frames, "legacy": measure(legacy, warmup, frames)}
+        report["pooled"] = measure(pooled, warmup, frames, pipeline.buffers)
+        report["pooled"]["buffers"] = pipeline.buffers.allocations
+        report["full_frame"] = measure(lambda i: pooled(i, process=True), warmup, frames, pipeline.buffers)
+        h, w = state["raw"].shape[:2]
+        report["frame_bytes"] = w * h * 3
+    finally:
+        source.release()
+    return report
+
+
+def check(report: dict, max_bytes: int = 1024, max_frame_fraction: float = 0.01) -> list:
+    """Failure messages for `report` (empty when the steady state allocates no frame-sized memory)."""
+    failures = []
+    for path in ("pooled", "full_frame"):
+        if report[path]["buffer_allocations"]:
+            failures.append(f"{path}: {report[path]['buffer_allocations']} frame buffers created after warm-up")
+    if report["pooled"]["max_bytes"] > max_bytes:
+        failures.append(f"pooled: up to {report['pooled']['max_bytes']} bytes per frame (limit {max_bytes})")
+    limit = int(report["frame_bytes"] * max_frame_fraction)
+    if report["mesh"] == "array" and report["full_frame"]["max_bytes"] > limit:
+        failures.append(f"full_frame: up to {report['full_frame']['max_bytes']} bytes per frame "
+                        f"(limit {limit} = {max_frame_fraction:.0%} of a frame)")
+    return failures
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Bytes allocated per frame by the preview frame path")
+    ap.add_argument("--source", default="synthetic:640x480", help="video file, image(s) or synthetic[:WxH]")
+    ap.add_argument("--frames", type=int, default=200)
+    ap.add_argument("--warmup", type=int, default=20)
+    ap.add_argument("--mesh", choices=("array", "synthetic", "mediapipe"), default="array",
+                    help="model for the full-frame measurement (array: reused output, app allocations only)")
+    ap.add_argument("--max-bytes", type=int, default=1024, help="allowed growth per frame on the pooled path")
+    ap.add_argument("--max-frame-fraction", type=float, default=0.01,
+                    help="allowed full-frame growth as a fraction of one BGR frame (array mesh only)")
+    args = ap.parse_args(argv)
+
+    report = run(args.source, args.frames, args.warmup, args.mesh)
+    print(json.dumps(report, indent=2))
+    failures = check(report, args.max_bytes, args.max_frame_fraction)
+    for msg in failures:
+        print("FAIL:", msg)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
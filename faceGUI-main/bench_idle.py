@@ -0,0 +1,188 @@
+"""
+Idle-CPU benchmark: process CPU time of the live pipeline on an empty scene,
+without the presence gate, while the gate is searching, and once it is idle.
+
+The "camera" is a static room with sensor noise, played at --fps through a
+reader thread like a webcam. Frames go through `FramePipeline` and
+`PhysiognomyApp._process_packet` as in the GUI, and a consumer thread stands
+in for the Tk loop, polling at the GUI's active or idle rate. After the idle
+measurement a visitor walks in and the time until the gate wakes up is
+reported.
+
+    python bench_idle.py                         # FaceMesh stand-in: 12 ms of CPU, no face
+    python bench_idle.py --mesh mediapipe        # the real model on the empty frames
+    python bench_idle.py --min-ratio 10          # exit 1 if idle is not 10x cheaper
+
+`--mesh empty:MS` replaces FaceMesh with a stand-in that burns MS ms of CPU
+and finds no face, for machines without mediapipe.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+import types
+
+import cv2
+import numpy as np
+
+import face01
+from face_analysis import create_face_mesh
+from frame_sources import FrameSource, PacedSource, ThreadedSource
+from pipeline import FramePipeline
+
+
+class EmptyScene(FrameSource):
+    """Static background with per-frame sensor noise; `visitor=True` adds a moving face-sized blob."""
+
+    def __init__(self, width: int = 640, height: int = 480, noise: int = 3, variants: int = 8, fps: float = 30.0):
+        rng = np.random.default_rng(0)
+        self.name = f"empty scene {width}x{height}"
+        y, x = np.mgrid[0:height, 0:width]
+        room = np.dstack([60 + x * 80 // width, 70 + y * 60 // height, 90 + (x + y) * 40 // (width + height)])
+        room = room.astype(np.uint8)
+        cv2.rectangle(room, (width // 8, height // 3), (width // 3, height - 20), (40, 50, 70), -1)  # 문
+        cv2.rectangle(room, (width // 2, height // 6), (width - 40, height // 2), (150, 160, 170), -1)  # 창
+        self.frames = [cv2.add(room, rng.integers(0, noise + 1, room.shape, dtype=np.uint8)) for _ in range(variants)]
+        self.fps = fps
+        self.visitor = False
+        self._i = 0
+
+    def isOpened(self) -> bool:
+        return True
+
+    def read(self, out=None):
+        frame = self.frames[self._i % len(self.frames)]
+        self._i += 1
+        out = out if out is not None and out.shape == frame.shape else np.empty_like(frame)
+        np.copyto(out, frame)
+        if self.visitor:
+            h, w = out.shape[:2]
+            cx = int(w * (0.3 + 0.4 * ((self._i % 60) / 60.0)))
+            cv2.ellipse(out, (cx, h // 2), (w // 8, h // 5), 0, 0, 360, (170, 185, 215), -1)
+        return True, out
+
+    def get(self, prop) -> float:
+        return self.fps if prop == cv2.CAP_PROP_FPS else 0.0
+
+
+class EmptyMesh:
+    """FaceMesh stand-in: spends `ms` of CPU per call and never finds a face."""
+
+    def __init__(self, ms: float):
+        self.ms = ms
+        self.calls = 0
+
+    def process(self, rgb):
+        self.calls += 1
+        end = time.thread_time() + self.ms / 1000.0
+        while time.thread_time() < end:
+            pass
+        return types.SimpleNamespace(multi_face_landmarks=None)
+
+    def close(self):
+        pass
+
+
+class CountingMesh:
+    def __init__(self, mesh):
+        self.mesh = mesh
+        self.calls = 0
+
+    def process(self, rgb):
+        self.calls += 1
+        return self.mesh.process(rgb)
+
+
+def run_phase(gate: bool, args, mesh) -> dict:
+    face01.PhysiognomyApp.PRESENCE_GATE = gate
+    face01.PhysiognomyApp.IDLE_AFTER_S = args.idle_after
+    app = face01.PhysiognomyApp.headless()
+    presence = app.presence
+    pipeline = FramePipeline(app._process_packet, timer=app.timer,
+                             poll_interval=(lambda: presence.poll_interval) if presence else None)
+    scene = EmptyScene(fps=args.fps)
+    pipeline.set_capture(ThreadedSource(PacedSource(scene, args.fps)))
+    stop = threading.Event()
+
+    def tk_loop():
+        # GUI 의 after 루프처럼 결과를 가져갑니다 (유휴 상태에서는 드물게).
+        while not stop.is_set():
+            pipeline.latest_result()
+            idle = presence is not None and presence.idle
+            stop.wait((face01.PhysiognomyApp.IDLE_DELAY_MS if idle else 15) / 1000.0)
+
+    consumer = threading.Thread(target=tk_loop, daemon=True)
+    pipeline.start()
+    consumer.start()
+    out = {}
+
+    def measure(seconds):
+        calls0, frames0 = mesh.calls, pipeline.stats.inference.total
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        time.sleep(seconds)
+        wall = time.perf_counter() - wall0
+        return {"cpu_pct": round((time.process_time() - cpu0) / wall * 100.0, 2),
+                "frames_per_s": round((pipeline.stats.inference.total - frames0) / wall, 1),
+                "mesh_per_s": round((mesh.calls - calls0) / wall, 2)}
+
+    try:
+        time.sleep(1.0)  # 카메라 시작, 첫 프레임
+        if presence is None:
+            out["no_gate"] = measure(args.seconds)
+            return out
+        out["searching"] = measure(max(0.5, args.idle_after - 1.5))
+        deadline = time.perf_counter() + args.idle_after + 5.0
+        while not presence.idle and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        if not presence.idle:
+            raise SystemExit(f"gate did not go idle: {presence.snapshot()}")
+        out["idle"] = measure(args.seconds)
+        # 방문자: 움직임이 생기고 나서 게이트가 유휴 상태를 벗어나기까지의 시간
+        t0 = time.perf_counter()
+        scene.visitor = True
+        while presence.idle and time.perf_counter() - t0 < 5.0:
+            time.sleep(0.005)
+        out["wake_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+        out["presence"] = presence.snapshot()
+        return out
+    finally:
+        stop.set()
+        consumer.join(1.0)
+        pipeline.stop()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="CPU use of the live pipeline on an empty scene, with and without the presence gate")
+    ap.add_argument("--mesh", default="empty:12", help="mediapipe or empty:MS (stand-in burning MS ms per call)")
+    ap.add_argument("--fps", type=float, default=30.0, help="camera frame rate")
+    ap.add_argument("--seconds", type=float, default=5.0, help="measurement time per phase")
+    ap.add_argument("--idle-after", type=float, default=3.0, help="PhysiognomyApp.IDLE_AFTER_S for the run")
+    ap.add_argument("--min-ratio", type=float, default=None, help="fail unless no-gate CPU / idle CPU reaches this")
+    args = ap.parse_args(argv)
+
+    if args.mesh.startswith("empty:"):
+        mesh = EmptyMesh(float(args.mesh.split(":", 1)[1]))
+    elif args.mesh == "mediapipe":
+        try:
+            mesh = CountingMesh(create_face_mesh())
+        except ImportError:
+            raise SystemExit("mediapipe is not installed; use --mesh empty:MS to benchmark with a stand-in")
+    else:
+        raise SystemExit(f"unknown --mesh {args.mesh!r} (mediapipe or empty:MS)")
+    face01.get_face_mesh = lambda **overrides: mesh
+
+    report = {"mesh": args.mesh, "fps": args.fps, "idle_after": args.idle_after}
+    report.update(run_phase(False, args, mesh))
+    report.update(run_phase(True, args, mesh))
+    idle_cpu = max(report["idle"]["cpu_pct"], 0.01)
+    report["idle_vs_no_gate"] = round(report["no_gate"]["cpu_pct"] / idle_cpu, 1)
+    print(json.dumps(report, indent=2))
+    if args.min_ratio is not None and report["idle_vs_no_gate"] < args.min_ratio:
+        print(f"FAIL: idle CPU only {report['idle_vs_no_gate']}x lower than without the gate (need {args.min_ratio}x)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Import-time benchmark: cold-start cost of library-only use (`face_analysis`)
+versus the GUI module (`face01`), each measured in a fresh interpreter.
+
+    python bench_import.py [--repeat 5] [--with-model]
+
+`--with-model` also times the first `get_face_mesh()` call, i.e. what a caller
+pays once it actually needs inference.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+TARGETS = {
+    "library (face_analysis)": "import face_analysis",
+    "gui (face01)": "import face01",
+}
+MODEL_TARGET = ("library + first FaceMesh", "import face_analysis; face_analysis.get_face_mesh()")
+
+_SNIPPET = (
+    "import time, json; t0 = time.perf_counter(); {stmt}; "
+    "print(json.dumps(time.perf_counter() - t0))"
+)
+
+
+def time_cold_import(stmt: str, repeat: int = 5):
+    """Run `stmt` in `repeat` fresh interpreters; returns the list of seconds."""
+    out = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-c", _SNIPPET.format(stmt=stmt)],
+                              cwd=HERE, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{stmt!r} failed:\n{proc.stderr.strip()}")
+        out.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--with-model", action="store_true", help="also time the first FaceMesh construction")
+    args = ap.parse_args(argv)
+
+    targets = dict(TARGETS)
+    if args.with_model:
+        targets[MODEL_TARGET[0]] = MODEL_TARGET[1]
+
+    print(f"{'target':<28}{'min ms':>10}{'median ms':>12}")
+    for name, stmt in targets.items():
+        try:
+            times = time_cold_import(stmt, args.repeat)
+        except RuntimeError as e:
+            print(f"{name:<28}  error: {e}")
+            continue
+        print(f"{name:<28}{min(times) * 1000:>10.1f}{statistics.median(times) * 1000:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Large-photo benchmark: decode time and peak memory of the full-resolution path
+(`read_image_rgb` + downscale) versus `read_image_reduced`, each measured in a
+fresh interpreter so peak RSS belongs to that path alone.
+
+    python bench_large_image.py                      # synthetic 48 MP JPEG
+    python bench_large_image.py photo.jpg --max-side 1280 --max-rss-mb 300
+
+Exit code 1 when the reduced path's peak RSS growth exceeds --max-rss-mb.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+_SNIPPET = r"""
+import json, resource, sys, time
+sys.path.insert(0, {here!r})
+import cv2, numpy as np
+from PIL import Image
+import face_analysis
+from roi import downscale_for_inference
+def rss_mb():
+    # Linux: VmHWM belongs to this exec'd image; ru_maxrss would include the parent's peak at fork time
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r / 2**20 if sys.platform == "darwin" else r / 1024
+base = rss_mb()
+t0 = time.perf_counter()
+if {mode!r} == "full":
+    rgb = face_analysis.read_image_rgb({path!r})
+    size = rgb.shape[1], rgb.shape[0]
+    rgb = downscale_for_inference(rgb, {max_side})
+else:
+    img = face_analysis.read_image_reduced({path!r}, {max_side})
+    rgb, size = img.rgb, (img.width, img.height)
+ms = (time.perf_counter() - t0) * 1000.0
+print(json.dumps({{"ms": ms, "peak_rss_growth_mb": rss_mb() - base, "original": size, "proxy": rgb.shape[:2][::-1]}}))
+"""
+
+
+def measure(mode: str, path: str, max_side: int) -> dict:
+    code = _SNIPPET.format(here=str(HERE), mode=mode, path=path, max_side=max_side)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def make_synthetic_jpeg(megapixels: float, directory: str) -> str:
+    import cv2
+    import numpy as np
+
+    h = int((megapixels * 1e6 * 3 / 4) ** 0.5)
+    w = h * 4 // 3
+    # 부드러운 그라디언트 + 잡음 (실제 사진과 비슷한 압축률)
+    y, x = np.mgrid[0:h, 0:w]
+    img = np.dstack([(x * 255 // w), (y * 255 // h), ((x + y) * 255 // (w + h))]).astype(np.uint8)
+    img += np.random.default_rng(0).integers(0, 16, img.shape, dtype=np.uint8)
+    path = os.path.join(directory, f"synthetic_{w}x{h}.jpg")
+    cv2.imwrite(path, img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return path
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Decode time / peak memory of large still images")
+    ap.add_argument("image", nargs="?", help="photo to test (default: a generated JPEG)")
+    ap.add_argument("--megapixels", type=float, default=48.0, help="size of the generated JPEG")
+    ap.add_argument("--max-side", type=int, default=1280, help="inference proxy size (STILL_MAX_SIDE)")
+    ap.add_argument("--max-rss-mb", type=float, default=None, help="fail if the reduced path grows RSS beyond this")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.image or make_synthetic_jpeg(args.megapixels, tmp)
+        report = {"image": path, "max_side": args.max_side}
+        for mode in ("full", "reduced"):
+            runs = [measure(mode, path, args.max_side) for _ in range(max(1, args.repeat))]
+            report[mode] = {"ms": round(min(r["ms"] for r in runs), 1),
+                            "peak_rss_growth_mb": round(max(r["peak_rss_growth_mb"] for r in runs), 1),
+                            "original": runs[0]["original"], "proxy": runs[0]["proxy"]}
+    print(json.dumps(report, indent=2))
+    if args.max_rss_mb is not None and report["reduced"]["peak_rss_growth_mb"] > args.max_rss_mb:
+        print(f"FAIL: reduced decode grew RSS by {report['reduced']['peak_rss_growth_mb']} MB "
+              f"(limit {args.max_rss_mb} MB)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Multi-face throughput benchmark at 1, 2, 4 and 8 faces.
+
+Post-inference stage (always runs, no camera or MediaPipe needed): synthetic
+landmark batches go through FaceTracker (IDs + smoothing), analyze_faces and
+landmark drawing; the per-face analysis loop is timed alongside for comparison.
+All times are milliseconds per frame.
+
+`--mesh` additionally runs real FaceMesh (max_num_faces=N) on a grid made of
+N copies of the bundled image.png, so inference cost per face count is
+measured as well.
+
+    python bench_multiface.py [--frames 300] [--mesh]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from face_analysis import (
+    MAX_LANDMARKS, analyze_faces, analyze_physiognomy_mp, draw_landmark_points, landmarks_to_pixels,
+)
+from tracking import FaceTracker
+
+HERE = Path(__file__).resolve().parent
+FACE_COUNTS = (1, 2, 4, 8)
+W, H = 1280, 720
+
+
+def synthetic_faces(n_faces: int, rng) -> np.ndarray:
+    """(F, 478, 3) landmark clouds laid out on a grid, like several people in frame."""
+    cols = int(np.ceil(np.sqrt(n_faces)))
+    batch = rng.random((n_faces, MAX_LANDMARKS, 3)).astype(np.float32) * (0.6 / cols)
+    for i in range(n_faces):
+        batch[i, :, 0] += 0.05 + (i % cols) / cols
+        batch[i, :, 1] += 0.05 + (i // cols) / cols * 0.9
+    return np.clip(batch, 0.0, 0.999)
+
+
+def bench_post(n_faces: int, frames: int) -> dict:
+    """Per-frame ms for tracking, vectorized vs looped analysis, and drawing."""
+    rng = np.random.default_rng(n_faces)
+    base = synthetic_faces(n_faces, rng)
+    jitter = rng.normal(0, 0.002, size=(frames,) + base.shape).astype(np.float32)
+    image = np.zeros((H, W, 3), dtype=np.uint8)
+    px = np.empty((n_faces * MAX_LANDMARKS, 2), dtype=np.int32)
+    tracker = FaceTracker()
+    t_track = t_vec = t_loop = t_draw = 0.0
+    ids = []
+    for f in range(frames):
+        t0 = time.perf_counter()
+        ids, batch = tracker.update(base + jitter[f])
+        t1 = time.perf_counter()
+        analyze_faces(batch, W, H)
+        t2 = time.perf_counter()
+        for face in batch:
+            analyze_physiognomy_mp(face, W, H)
+        t3 = time.perf_counter()
+        draw_landmark_points(image, landmarks_to_pixels(batch.reshape(-1, 3), W, H, out=px))
+        t4 = time.perf_counter()
+        t_track += t1 - t0
+        t_vec += t2 - t1
+        t_loop += t3 - t2
+        t_draw += t4 - t3
+    ms = 1000.0 / frames
+    return {
+        "track_ms": t_track * ms, "analyze_ms": t_vec * ms, "analyze_loop_ms": t_loop * ms,
+        "draw_ms": t_draw * ms, "total_ms": (t_track + t_vec + t_draw) * ms,
+        "stable_ids": sorted(ids) == list(range(1, n_faces + 1)),
+    }
+
+
+def bench_mesh(n_faces: int, frames: int) -> dict:
+    from face_analysis import create_face_mesh, read_image_rgb
+    import cv2
+
+    face = cv2.resize(read_image_rgb(HERE / "image.png"), (320, 240))
+    cols = int(np.ceil(np.sqrt(n_faces)))
+    rows = int(np.ceil(n_faces / cols))
+    grid = np.zeros((rows * 240, cols * 320, 3), dtype=np.uint8)
+    for i in range(n_faces):
+        r, c = divmod(i, cols)
+        grid[r * 240:(r + 1) * 240, c * 320:(c + 1) * 320] = face
+    mesh = create_face_mesh(max_num_faces=n_faces)
+    try:
+        results = mesh.process(grid)  # warm-up
+        found = len(results.multi_face_landmarks or [])
+        t0 = time.perf_counter()
+        for _ in range(frames):
+            mesh.process(grid)
+        return {"mesh_ms": (time.perf_counter() - t0) / frames * 1000, "faces_found": found}
+    finally:
+        mesh.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Multi-face throughput benchmark")
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--mesh", action="store_true", help="also time real FaceMesh inference (needs mediapipe)")
+    args = ap.parse_args(argv)
+
+    print(f"{'faces':>5}{'track':>8}{'analyze':>9}{'(loop)':>8}{'draw':>8}{'total ms':>10}{'faces/s':>9}{'ids ok':>8}"
+          + (f"{'mesh ms':>10}{'found':>7}" if args.mesh else ""))
+    for n in FACE_COUNTS:
+        r = bench_post(n, args.frames)
+        line = (f"{n:>5}{r['track_ms']:>8.3f}{r['analyze_ms']:>9.3f}{r['analyze_loop_ms']:>8.3f}"
+                f"{r['draw_ms']:>8.3f}{r['total_ms']:>10.3f}{n / (r['total_ms'] / 1000):>9.0f}"
+                f"{str(r['stable_ids']):>8}")
+        if args.mesh:
+            m = bench_mesh(n, max(10, args.frames // 10))
+            line += f"{m['mesh_ms']:>10.1f}{m['faces_found']:>7}"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""
+Reproducible live-pipeline benchmark; no camera or display needed.
+
+Frames come from a video file, an image / image directory / glob (default:
+the bundled image.png) or a seeded synthetic generator, and go through the
+same per-frame path as the GUI: capture read + mirror/RGB conversion into a
+pooled buffer (`FramePipeline.make_packet`), then
+`PhysiognomyApp._process_packet` (scheduler, ROI, FaceMesh,
+tracking, drawing, analysis) and the PIL view `FrameRenderer` pastes into
+the Tk photo. Frames are processed one after another on
+one thread, so every frame is measured (the GUI's latest-frame-wins queues
+would drop frames instead).
+
+Reports FPS, per-stage p50/p95/p99 (profiler.StageTimer) and peak RSS.
+With --baseline the run is compared against a stored result and the exit
+code is 1 on any regression beyond --tolerance.
+
+    python bench_pipeline.py                          # image.png, 300 frames
+    python bench_pipeline.py --source clip.mp4 --out run.json
+    python bench_pipeline.py --source synthetic:1280x720 --mesh synthetic
+    python bench_pipeline.py --save-baseline bench_baseline.json
+    python bench_pipeline.py --baseline bench_baseline.json --tolerance 0.2
+
+`--mesh synthetic` replaces FaceMesh with seeded landmark clouds, to measure
+everything except the model (e.g. where mediapipe is not installed);
+`--mesh replay:session.lmr` feeds landmarks recorded by landmark_recording.py.
+`--fixed-interval` disables the adaptive scheduler (inference on every frame)
+so runs on machines of different speeds do the same work.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import face01
+from face_analysis import SyntheticMesh
+from landmark_recording import LandmarkRecording, ReplayMesh
+from overlay import OVERLAY_LEVELS
+from inference_pool import InferencePool
+from frame_sources import open_source
+from pipeline import FramePipeline
+from render import to_pil
+
+HERE = Path(__file__).resolve().parent
+# 기준선 비교: 이보다 작은 차이(ms)는 측정 잡음으로 보고 무시합니다.
+NOISE_FLOOR_MS = 0.5
+
+
+# --- measurement ---
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where it cannot be read)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 2**20
+        except Exception:
+            return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024  # macOS: bytes, Linux: KB
+
+
+def run(args) -> dict:
+    # 파일/합성 소스는 스레드 없이 순서대로 모든 프레임을 읽고 (이미지는 미리 디코딩), 카메라/스트림은 전용 스레드에서 읽습니다.
+    source = open_source(args.source, loop=True, preload=True)
+    face01.PhysiognomyApp.MAX_FACES = args.max_faces
+    face01.PhysiognomyApp.ROI_MODE = not args.no_roi
+    face01.PhysiognomyApp.OVERLAY_LEVEL = args.overlay
+    if args.mesh == "synthetic":
+        mesh = SyntheticMesh(args.max_faces)
+        face01.get_face_mesh = lambda **overrides: mesh
+    elif args.mesh.startswith("replay:"):
+        # 녹화된 랜드마크는 전체 프레임 좌표이므로 ROI 자르기를 끕니다.
+        mesh = ReplayMesh(LandmarkRecording(args.mesh.split(":", 1)[1]))
+        face01.get_face_mesh = lambda **overrides: mesh
+        face01.PhysiognomyApp.ROI_MODE = False
+        args.no_roi = True
+    elif args.mesh != "mediapipe":
+        raise SystemExit(f"unknown --mesh {args.mesh!r} (mediapipe, synthetic or replay:FILE.lmr)")
+    else:
+        try:
+            import mediapipe  # noqa: F401
+        except ImportError:
+            raise SystemExit("mediapipe is not installed; use --mesh synthetic to benchmark without the model")
+    app = face01.PhysiognomyApp.headless()
+    if args.inference_workers:
+        if args.mesh.startswith("replay:"):
+            raise SystemExit("--inference-workers runs FaceMesh (or --mesh synthetic) in the workers, not replay")
+        app.inference_pool = InferencePool(args.inference_workers, max_faces=args.max_faces,
+                                           synthetic=args.mesh == "synthetic").start()
+        args.no_roi = True
+    if args.fixed_interval:
+        app.scheduler.max_interval = app.scheduler.min_interval = app.scheduler.interval = 1
+    timer = app.timer
+    rgba = None  # FrameRenderer 처럼 재사용하는 RGBA 버퍼
+    raw = None   # 소스가 다시 읽어 들이는 BGR 버퍼
+    # 스레드는 시작하지 않고 GUI 와 같은 변환/버퍼 풀만 씁니다.
+    pipeline = FramePipeline(app._process_packet)
+    shown = None
+
+    def one_frame(seq):
+        nonlocal rgba, raw, shown
+        t0 = time.perf_counter()
+        with timer.stage("capture.read"):
+            ret, frame = source.read(raw)
+        if not ret:
+            raise SystemExit("source returned no frame")
+        raw = frame
+        with timer.stage("capture.convert"):
+            pkt = pipeline.make_packet(frame, seq, t0)
+        app._process_packet(pkt)
+        # GUI 와 같은 단계 이름 (GUI 에서는 PhotoImage 로 붙여넣는 시간까지 포함)
+        with timer.stage("tk.photoimage"):
+            if rgba is None or rgba.shape[:2] != pkt.rgb.shape[:2]:
+                rgba = np.empty(pkt.rgb.shape[:2] + (4,), dtype=np.uint8)
+            to_pil(pkt.rgb, rgba)
+        # 화면에 표시한 뒤 직전 프레임 버퍼를 반환합니다 (latest_result 와 같은 순서).
+        pipeline.recycle(shown)
+        shown = pkt
+        timer.add("frame", (time.perf_counter() - t0) * 1000.0)
+        return pkt
+
+    try:
+        for i in range(args.warmup):  # 모델 로딩/캐시 예열은 측정에서 제외
+            one_frame(i)
+        timer.reset()
+        timer.window = args.frames
+        inferred = detected = 0
+        t_start = time.perf_counter()
+        for i in range(args.frames):
+            pkt = one_frame(args.warmup + i)
+            inferred += bool(pkt.extra.get("inferred"))
+            detected += pkt.landmarks is not None
+        wall = time.perf_counter() - t_start
+        pool_stats = app.inference_pool.snapshot() if app.inference_pool is not None else None
+    finally:
+        source.release()
+        if app.inference_pool is not None:
+            app.inference_pool.close()
+
+    return {
+        "source": args.source,
+        "mesh": args.mesh,
+        "frames": args.frames,
+        "max_faces": args.max_faces,
+        "roi": not args.no_roi,
+        "fixed_interval": args.fixed_interval,
+        "overlay": args.overlay,
+        "inference_workers": args.inference_workers,
+        "pool": pool_stats,
+        "fps": args.frames / wall,
+        "inferred_ratio": inferred / args.frames,
+        "detected_ratio": detected / args.frames,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": timer.summary(),
+        "env": {"python": platform.python_version(), "platform": platform.platform(),
+                "numpy": np.__version__, "opencv": cv2.__version__},
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float):
+    """Regression messages: lower FPS, higher stage p95 or higher peak RSS than the baseline allows."""
+    problems = []
+    if result["fps"] < baseline["fps"] * (1 - tolerance):
+        problems.append(f"fps {result['fps']:.1f} < baseline {baseline['fps']:.1f} (-{tolerance:.0%} allowed)")
+    for name, base in baseline.get("stages", {}).items():
+        cur = result["stages"].get(name)
+        if cur is None:
+            continue
+        limit = max(base["p95"] * (1 + tolerance), base["p95"] + NOISE_FLOOR_MS)
+        if cur["p95"] > limit:
+            problems.append(f"{name} p95 {cur['p95']:.2f} ms > baseline {base['p95']:.2f} ms")
+    if result.get("peak_rss_mb") and baseline.get("peak_rss_mb"):
+        if result["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+            problems.append(f"peak RSS {result['peak_rss_mb']:.0f} MB > baseline {baseline['peak_rss_mb']:.0f} MB")
+    for key in ("source", "mesh", "max_faces", "roi", "fixed_interval", "overlay", "inference_workers"):
+        if key in baseline and baseline[key] != result[key]:
+            print(f"warning: baseline was recorded with {key}={baseline[key]!r}, this run uses {result[key]!r}")
+    return problems
+
+
+def print_report(r: dict) -> None:
+    rss = f"{r['peak_rss_mb']:.0f} MB" if r["peak_rss_mb"] else "n/a"
+    print(f"source={r['source']} mesh={r['mesh']} frames={r['frames']} faces<={r['max_faces']} roi={r['roi']} overlay={r.get('overlay')}")
+    print(f"fps={r['fps']:.1f}  inferred={r['inferred_ratio']:.0%}  detected={r['detected_ratio']:.0%}  peak RSS={rss}")
+    if r.get("pool"):
+        print("inference pool: " + "  ".join(f"{k}={v}" for k, v in r["pool"].items()))
+    print(f"{'stage':<20}{'n':>6}{'mean':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}")
+    for name, s in r["stages"].items():
+        print(f"{name:<20}{s['n']:>6}{s['mean']:>8.2f}{s['p50']:>8.2f}{s['p95']:>8.2f}{s['p99']:>8.2f}{s['max']:>8.2f}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Headless live-pipeline benchmark (no camera)")
+    ap.add_argument("--source", default=str(HERE / "image.png"),
+                    help="video file, image, image directory, glob or synthetic[:WxH] (default: image.png)")
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--warmup", type=int, default=20)
+    ap.add_argument("--max-faces", type=int, default=1)
+    ap.add_argument("--no-roi", action="store_true", help="always run FaceMesh on the full frame")
+    ap.add_argument("--fixed-interval", action="store_true", help="infer on every frame (no adaptive skipping)")
+    ap.add_argument("--mesh", default="mediapipe",
+                    help="mediapipe, synthetic, or replay:FILE.lmr (landmarks recorded by landmark_recording.py)")
+    ap.add_argument("--overlay", choices=OVERLAY_LEVELS, default=face01.PhysiognomyApp.OVERLAY_LEVEL,
+                    help="landmark overlay level drawn on each frame")
+    ap.add_argument("--inference-workers", type=int, default=0,
+                    help="run FaceMesh in N worker processes (shared-memory frames, latest result wins)")
+    ap.add_argument("--out", help="write the result JSON here")
+    ap.add_argument("--save-baseline", help="write the result JSON as a new baseline")
+    ap.add_argument("--baseline", help="compare against this baseline JSON; exit 1 on regression")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression (default 0.25)")
+    args = ap.parse_args(argv)
+
+    result = run(args)
+    print_report(result)
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+            print("wrote", path)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = compare(result, baseline, args.tolerance)
+        if problems:
+            print("\nREGRESSION against", args.baseline)
+            for p in problems:
+                print("  -", p)
+            return 1
+        print("\nOK: within", f"{args.tolerance:.0%}", "of", args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
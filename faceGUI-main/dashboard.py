@@ -0,0 +1,312 @@
+"""
+Multi-camera dashboard: several cameras / video files / streams analysed at once.
+
+    python dashboard.py 0 1                          # two webcams
+    python dashboard.py a.mp4 b.mp4 c.mp4 -j 2       # video files standing in for cameras
+    python dashboard.py a.mp4 b.mp4 --headless --seconds 20 --mesh synthetic
+
+Each feed has its own reader thread (`ThreadedSource`; files are paced to
+their frame rate) and its own FaceMesh, since a FaceMesh in video mode tracks
+one stream. `-j` inference threads form the shared CPU budget. `FairScheduler`
+hands the next inference to the feed that has a new frame and the least
+inference time used so far (start-time fair queuing), so a feed with a
+big frame or many faces cannot starve the others. A feed that was idle (no
+new frames) restarts at the current virtual time instead of catching up. FaceMesh releases the
+GIL while it runs, so the threads use separate cores.
+
+The Tk view shows the feeds in a grid. Each tile is resized from the newest
+analysed frame and drawn with the overlay at tile resolution. Per-feed and
+aggregate inference / capture FPS are shown under the grid, and with
+--headless they are printed as JSON.
+"""
+import argparse
+import json
+import logging
+import math
+import sys
+import threading
+import time
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from face_analysis import SyntheticMesh, create_face_mesh, landmarks_to_array, measure_faces, setup_file_logging
+from frame_sources import open_source
+from overlay import OverlayRenderer
+from pipeline import StageCounter
+from tracking import FaceTracker
+
+logger = logging.getLogger("face01")
+
+
+class Feed:
+    """One input: reader thread, own FaceMesh and tracker, newest analysed frame."""
+
+    def __init__(self, name: str, source, mesh, max_faces: int = 1):
+        self.name = name
+        self.source = source
+        self.mesh = mesh
+        self.max_faces = max_faces
+        self.tracker = FaceTracker()
+        self.lock = threading.Lock()
+        # 워커가 쓰는 RGB 버퍼와 화면이 읽는 버퍼를 번갈아 씁니다.
+        self._rgb = [None, None]
+        self._write = 0
+        self.rgb: Optional[np.ndarray] = None        # 마지막으로 분석된 프레임 (lock 안에서 읽기)
+        self.landmarks: Optional[np.ndarray] = None  # 그 프레임의 (F, N, 3)
+        self.ids: List[int] = []
+        self.analysis = ""
+        self.version = 0        # 분석 결과가 바뀔 때마다 증가
+        self.vtime = 0.0        # 공정 스케줄링용 가상 시각 (ms)
+        self.used = 0.0         # 실제로 쓴 추론 시간 (ms)
+        self.busy = False
+        self.last_frame = 0     # 마지막으로 분석한 ThreadedSource 프레임 번호
+        self.inferences = StageCounter(f"{name}.infer", window=3.0)
+        self.infer_ms = 0.0
+
+    def has_new_frame(self) -> bool:
+        return self.source.latest()[0] > self.last_frame
+
+    def analyse(self) -> float:
+        """Run FaceMesh on the newest frame; returns the inference time in ms (0 if no frame)."""
+        seq = self.source.latest()[0]
+        ok, frame = self.source.read(timeout=0)
+        if not ok:
+            return 0.0
+        self.last_frame = seq
+        buf = self._rgb[self._write]
+        if buf is None or buf.shape != frame.shape:
+            buf = self._rgb[self._write] = np.empty(frame.shape, dtype=np.uint8)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=buf)
+        t0 = time.perf_counter()
+        results = self.mesh.process(buf)
+        ms = (time.perf_counter() - t0) * 1000.0
+        batch = None
+        if results and results.multi_face_landmarks:
+            batch = np.stack([landmarks_to_array(lm) for lm in results.multi_face_landmarks[:self.max_faces]])
+        ids, batch = self.tracker.update(batch)
+        h, w = buf.shape[:2]
+        if batch is not None and batch.shape[1] >= 468:
+            # 타일 캡션에는 첫 얼굴의 측정값만 짧게 보여 줍니다.
+            philtrum, lips, eyes = measure_faces(batch[:1], w, h)[0].tolist()
+            analysis = f"인중 {int(philtrum)} · 입술 {int(lips)} · 눈 {int(eyes)} px"
+        else:
+            analysis = "얼굴 없음"
+        with self.lock:
+            self.rgb = buf
+            self.landmarks = batch
+            self.ids = ids
+            self.analysis = analysis
+            self.version += 1
+        self._write ^= 1
+        self.inferences.tick()
+        self.infer_ms = ms
+        return ms
+
+    def close(self) -> None:
+        self.source.release()
+        self.mesh.close()
+
+
+class FairScheduler:
+    """Give the next inference to the idle feed with a fresh frame and the least inference time used."""
+
+    def __init__(self, feeds: List[Feed], poll_interval: float = 0.005):
+        self.feeds = feeds
+        self.poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._stop = False
+        self._clock = 0.0   # 마지막으로 추론을 시작한 피드의 가상 시각
+
+    def acquire(self) -> Optional[Feed]:
+        """Block until a feed is ready; None once stopped."""
+        with self._cond:
+            while not self._stop:
+                ready = [f for f in self.feeds if not f.busy and f.has_new_frame()]
+                if ready:
+                    feed = min(ready, key=lambda f: f.vtime)
+                    # 한동안 프레임이 없던 피드는 밀린 몫을 몰아 쓰지 않도록 현재 가상 시각에서 시작합니다.
+                    feed.vtime = max(feed.vtime, self._clock)
+                    self._clock = feed.vtime
+                    feed.busy = True
+                    return feed
+                # 새 프레임은 리더 스레드가 알리지 않으므로 짧게 기다렸다가 다시 봅니다.
+                self._cond.wait(self.poll_interval)
+            return None
+
+    def release(self, feed: Feed, ms: float) -> None:
+        with self._cond:
+            feed.vtime += ms
+            feed.used += ms
+            feed.busy = False
+            self._cond.notify_all()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+
+
+class Dashboard:
+    """Feeds + fair scheduler + inference threads (no Tk; `DashboardApp` displays it)."""
+
+    def __init__(self, specs, workers: int = 2, max_faces: int = 1, synthetic: bool = False,
+                 realtime: bool = True):
+        self.feeds: List[Feed] = []
+        for i, spec in enumerate(specs):
+            source = open_source(spec, threaded=True, loop=True, realtime=realtime)
+            mesh = SyntheticMesh(max_faces, seed=i) if synthetic else create_face_mesh(max_num_faces=max_faces)
+            self.feeds.append(Feed(str(spec), source, mesh, max_faces))
+        self.scheduler = FairScheduler(self.feeds)
+        self.workers = max(1, workers)
+        self._threads: List[threading.Thread] = []
+        self.total = StageCounter("dashboard.infer", window=3.0)
+        self.t_start = time.perf_counter()
+
+    def start(self) -> "Dashboard":
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"face01-dash-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info("Dashboard: %s feeds, %s inference threads", len(self.feeds), self.workers)
+        return self
+
+    def _worker(self) -> None:
+        while True:
+            feed = self.scheduler.acquire()
+            if feed is None:
+                return
+            ms = 0.0
+            try:
+                ms = feed.analyse()
+            except Exception as e:
+                logger.exception("Dashboard: %s failed: %s", feed.name, e)
+            finally:
+                self.scheduler.release(feed, ms)
+            if ms:
+                self.total.tick()
+
+    def snapshot(self) -> dict:
+        elapsed = max(time.perf_counter() - self.t_start, 1e-9)
+        used = sum(f.used for f in self.feeds) or 1.0
+        feeds = [{
+            "feed": f.name,
+            "infer_fps": round(f.inferences.fps(), 1),
+            "capture_fps": round(f.source.frames_read / elapsed, 1),
+            "infer_total": f.inferences.total,
+            "dropped": f.source.dropped,
+            "cpu_share": round(f.used / used, 3),
+            "infer_ms": round(f.infer_ms, 2),
+        } for f in self.feeds]
+        return {"feeds": feeds, "aggregate_infer_fps": round(self.total.fps(), 1),
+                "inferences": self.total.total, "workers": self.workers}
+
+    def close(self) -> None:
+        self.scheduler.stop()
+        for t in self._threads:
+            t.join(timeout=2.0)
+        for f in self.feeds:
+            f.close()
+
+
+class DashboardApp:
+    """Tk grid of feed tiles with per-feed and aggregate FPS."""
+
+    TILE_SIZE = (480, 360)
+    OVERLAY_LEVEL = "contours"
+    REFRESH_MS = 30
+
+    def __init__(self, master, dashboard: Dashboard, cols: Optional[int] = None):
+        import tkinter as tk
+        from tkinter import ttk
+        from render import CachedVar, FrameRenderer
+
+        self.master = master
+        self.dashboard = dashboard
+        master.title(f"관상 분석 대시보드 ({len(dashboard.feeds)}개 입력)")
+        master.protocol("WM_DELETE_WINDOW", self.on_closing)
+        n = len(dashboard.feeds)
+        cols = cols or math.ceil(math.sqrt(n))
+        grid = ttk.Frame(master, padding=6)
+        grid.pack(fill="both", expand=True)
+        self.tiles = []
+        for i, feed in enumerate(dashboard.feeds):
+            cell = ttk.Frame(grid, padding=3)
+            cell.grid(row=i // cols, column=i % cols)
+            label = ttk.Label(cell, borderwidth=1, relief="groove")
+            label.pack()
+            caption = tk.StringVar(value=feed.name)
+            ttk.Label(cell, textvariable=caption).pack()
+            w, h = self.TILE_SIZE
+            self.tiles.append({"feed": feed, "renderer": FrameRenderer(label), "caption": CachedVar(caption),
+                               "overlay": OverlayRenderer(self.OVERLAY_LEVEL), "version": -1,
+                               "buf": np.empty((h, w, 3), dtype=np.uint8)})
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(master, textvariable=self.status_var, foreground="gray").pack(pady=4)
+        self.status = CachedVar(self.status_var)
+        self._last_stats = 0.0
+        self.update()
+
+    def update(self):
+        w, h = self.TILE_SIZE
+        for tile in self.tiles:
+            feed = tile["feed"]
+            if feed.version == tile["version"]:
+                continue
+            with feed.lock:
+                if feed.rgb is None:
+                    continue
+                tile["version"] = feed.version
+                # 타일 크기로 줄인 뒤 그 해상도에서 오버레이를 그립니다 (정규화 좌표).
+                cv2.resize(feed.rgb, (w, h), dst=tile["buf"], interpolation=cv2.INTER_AREA)
+                landmarks = feed.landmarks
+                analysis = feed.analysis
+            tile["overlay"].render(tile["buf"], landmarks)
+            tile["renderer"].show(tile["buf"])
+            tile["caption"].set(f"{feed.name} | {analysis}")
+        now = time.perf_counter()
+        if now - self._last_stats >= 1.0:
+            self._last_stats = now
+            snap = self.dashboard.snapshot()
+            per_feed = "  ".join(f"{f['feed']}: {f['infer_fps']:.1f}" for f in snap["feeds"])
+            self.status.set(f"전체 {snap['aggregate_infer_fps']:.1f} fps ({snap['workers']} 스레드)  |  {per_feed}")
+        self.master.after(self.REFRESH_MS, self.update)
+
+    def on_closing(self):
+        self.dashboard.close()
+        self.master.destroy()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Analyse several cameras / video files at once")
+    ap.add_argument("sources", nargs="+", help="camera indices, video files, image folders, stream URLs")
+    ap.add_argument("-j", "--workers", type=int, default=2, help="inference threads shared by all feeds")
+    ap.add_argument("--max-faces", type=int, default=1)
+    ap.add_argument("--cols", type=int, default=None, help="tiles per row")
+    ap.add_argument("--mesh", choices=("mediapipe", "synthetic"), default="mediapipe")
+    ap.add_argument("--no-realtime", action="store_true", help="read files as fast as possible instead of at their fps")
+    ap.add_argument("--headless", action="store_true", help="no window; print FPS statistics as JSON")
+    ap.add_argument("--seconds", type=float, default=10.0, help="--headless run time")
+    args = ap.parse_args(argv)
+
+    setup_file_logging()
+    dashboard = Dashboard(args.sources, workers=args.workers, max_faces=args.max_faces,
+                          synthetic=args.mesh == "synthetic", realtime=not args.no_realtime).start()
+    if args.headless:
+        try:
+            time.sleep(args.seconds)
+            print(json.dumps(dashboard.snapshot(), ensure_ascii=False, indent=2))
+        finally:
+            dashboard.close()
+        return 0
+
+    import tkinter as tk
+    root = tk.Tk()
+    DashboardApp(root, dashboard, cols=args.cols)
+    root.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -47,8 +47,9 @@ def check_and_rerun_in_correct_env():
                 pass
             sys.exit(1)
 
-# Check environment at startup
-check_and_rerun_in_correct_env()
+# Check environment at startup (only when run as a script; importing face01 has no side effects)
+if __name__ == "__main__":
+    check_and_rerun_in_correct_env()
 
 try:
     import cv2
@@ -56,191 +57,93 @@ except ModuleNotFoundError as e:
     print(f"Failed to import cv2: {e}", file=sys.stderr)
     sys.exit(1)
 
-import mediapipe as mp # Dlib 대신 MediaPipe 사용
-from PIL import Image, ImageTk
 import numpy as np
-import math
 import logging
-import os
+import threading
+import time
 from tkinter import filedialog
-from typing import Optional, Tuple
-
-# --- 1. MediaPipe 초기화 ---
-# MediaPipe Face Mesh 솔루션 초기화
-mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(
-    max_num_faces=1,             # 한 번에 감지할 최대 얼굴 수
-    refine_landmarks=True,       # 랜드마크 정밀도 개선
-    min_detection_confidence=0.5,# 최소 감지 신뢰도
-    min_tracking_confidence=0.5  # 최소 추적 신뢰도
+
+from pipeline import FramePipeline
+# 카메라/동영상/이미지/스트림 입력 (cv2.VideoCapture 호환, 카메라는 전용 스레드에서 읽음)
+from frame_sources import (
+    discover_cameras, list_available_cameras, load_camera_cache, open_camera, save_camera_cache, try_open_camera,
+)
+from scheduler import AdaptiveScheduler, LandmarkPredictor
+from roi import RoiTracker, downscale_for_inference
+from tracking import FaceTracker
+from result_cache import DEFAULT_CACHE_DIR, CachedResult, ResultCache, stat_key
+from async_logging import TELEMETRY_LOGGER, Lazy, log_frame
+from profiler import ProfileCapture, StageTimer, draw_overlay
+from render import CachedText, CachedVar, FrameRenderer
+from landmark_recording import LandmarkRecorder
+from overlay import OVERLAY_LEVELS, OverlayRenderer
+from inference_pool import InferencePool
+from presence import PresenceGate
+# 분석 함수와 FaceMesh(지연 생성)는 GUI 없이도 쓸 수 있도록 face_analysis 모듈에 있습니다.
+from face_analysis import (
+    FACE_MESH_SETTINGS, LOG_PATH, MAX_DECODE_BYTES, MAX_LANDMARKS, logger, setup_file_logging,
+    get_face_mesh, close_face_mesh,
+    read_image_rgb, read_image_reduced, landmarks_to_array, landmarks_to_pixels, draw_landmark_points,
+    get_landmark_coords, calculate_distance, analyze_physiognomy_mp, analyze_faces, measure_faces,
 )
+from metrics import MetricsEngine
+from features import default_engine
 
-# --- 로거 설정 (파일에 디버그 로그 기록) ---
-LOG_PATH = os.path.join(os.path.dirname(__file__), "face01_debug.log")
-logger = logging.getLogger("face01")
-logger.setLevel(logging.DEBUG)
-if not logger.handlers:
-    fh = logging.FileHandler(LOG_PATH, encoding="utf-8")
-    fh.setLevel(logging.DEBUG)
-    fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-    fh.setFormatter(fmt)
-    logger.addHandler(fh)
-
-logger.debug("Initialized MediaPipe FaceMesh with refine_landmarks=%s, max_num_faces=%s, min_detection_confidence=%s, min_tracking_confidence=%s",
-             True, 1, 0.5, 0.5)
-
-
-def try_open_camera(index: int = 0) -> Tuple[Optional[cv2.VideoCapture], str]:
-    """Try opening camera using several backends. Returns (cap, description).
-    If none succeed, returns (None, last_description).
-    """
-    backends = [None]
-    # Try common Windows backends if available
-    try:
-        backends.append(cv2.CAP_DSHOW)
-    except Exception:
-        pass
-    try:
-        backends.append(cv2.CAP_MSMF)
-    except Exception:
-        pass
-    last_desc = "none"
-    for b in backends:
-        try:
-            if b is None:
-                cap = cv2.VideoCapture(index)
-                desc = f"index={index} (default)"
-            else:
-                cap = cv2.VideoCapture(index, b)
-                desc = f"index={index} backend={b}"
-            ok = cap.isOpened()
-            logger.debug("try_open_camera: tried %s -> isOpened=%s", desc, ok)
-            if ok:
-                return cap, desc
-            else:
-                try:
-                    cap.release()
-                except Exception:
-                    pass
-            last_desc = desc
-        except Exception as e:
-            logger.exception("try_open_camera exception for backend %s: %s", b, e)
-    return None, last_desc
 
+telemetry = logging.getLogger(TELEMETRY_LOGGER)
+
+
+def __getattr__(name):
+    # 이전 버전과의 호환: `face01.face_mesh`는 처음 접근할 때 모델을 만듭니다.
+    if name == "face_mesh":
+        return get_face_mesh()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def list_available_cameras(max_index: int = 5):
-    """Return a list of camera indices that can be opened."""
-    available = []
-    for i in range(0, max_index + 1):
-        try:
-            cap = None
-            if hasattr(cv2, 'CAP_DSHOW'):
-                cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)
-            else:
-                cap = cv2.VideoCapture(i)
-            ok = cap.isOpened()
-            if ok:
-                available.append(i)
-            try:
-                cap.release()
-            except Exception:
-                pass
-        except Exception:
-            pass
-    logger.debug("list_available_cameras -> %s", available)
-    return available
-
-# --- 2. 관상 분석 함수 ---
-# MediaPipe Face Mesh는 기본 468개(0-467) 랜드마크를 제공합니다.
-# `refine_landmarks=True` 설정 시 눈 관련 추가 랜드마크(홍채 등)로 총 478개가 될 수 있습니다.
-# 주요 특징점 인덱스 (MediaPipe Face Mesh 기준, 대략적인 위치)
-LEFT_EYE_INNER = 33
-LEFT_EYE_OUTER = 133
-NOSE_TIP = 1
-MOUTH_UPPER = 13
-MOUTH_LOWER = 14
-CHIN_CENTER = 199
-
-def get_landmark_coords(landmarks, index, width, height):
-    """MediaPipe 랜드마크 객체에서 픽셀 좌표를 계산합니다."""
-    # 랜드마크 좌표는 0.0에서 1.0 사이의 정규화된 값입니다.
-    try:
-        if not landmarks:
-            return None
-        lm_list = landmarks.landmark
-        if index < 0 or index >= len(lm_list):
-            logger.debug("get_landmark_coords: index %s out of range (len=%s)", index, len(lm_list))
-            return None
-        lm = lm_list[index]
-        x = int(lm.x * width)
-        y = int(lm.y * height)
-        return x, y
-    except Exception as e:
-        logger.exception("get_landmark_coords error: %s", e)
-        return None
-
-def calculate_distance(p1_x, p1_y, p2_x, p2_y):
-    """두 점 사이의 유클리드 거리를 계산합니다."""
-    return math.sqrt((p1_x - p2_x)**2 + (p1_y - p2_y)**2)
-
-def analyze_physiognomy_mp(landmarks, frame_width, frame_height):
-    """
-    MediaPipe Face Mesh 랜드마크를 기반으로 관상 정보를 분석하고 문자열을 반환합니다.
-    """
-    # 기본 468개 이상의 랜드마크가 있어야 정상 처리합니다.
-    # (refine_landmarks=True일 때는 478개가 될 수 있으므로 엄격한 등호 검사는 제거)
-    if not landmarks or len(landmarks.landmark) < 468:
-        logger.debug("analyze_physiognomy_mp: insufficient landmarks (%s)",
-                     0 if not landmarks else len(landmarks.landmark))
-        return "얼굴 랜드마크를 찾지 못했습니다."
-    
-    analysis_results = []
-    
-    # 픽셀 좌표 얻기 (안전하게 None 체크)
-    coords = {}
-    for name, idx in (('nose_tip', NOSE_TIP), ('mouth_upper', MOUTH_UPPER), ('mouth_lower', MOUTH_LOWER),
-                      ('left_eye_inner', LEFT_EYE_INNER), ('left_eye_outer', LEFT_EYE_OUTER)):
-        val = get_landmark_coords(landmarks, idx, frame_width, frame_height)
-        if val is None:
-            logger.debug("analyze_physiognomy_mp: missing landmark %s (index %s)", name, idx)
-            return "필요한 얼굴 랜드마크가 충분하지 않아 분석할 수 없습니다."
-        coords[name] = val
-
-    nose_tip_x, nose_tip_y = coords['nose_tip']
-    mouth_upper_x, mouth_upper_y = coords['mouth_upper']
-    mouth_lower_x, mouth_lower_y = coords['mouth_lower']
-    left_eye_inner_x, left_eye_inner_y = coords['left_eye_inner']
-    left_eye_outer_x, left_eye_outer_y = coords['left_eye_outer']
-    
-    # 1. 인중 길이 (코 끝 ~ 윗입술)
-    philtrum_length = calculate_distance(nose_tip_x, nose_tip_y, mouth_upper_x, mouth_upper_y)
-    analysis_results.append(f"🗣️ 인중 길이 (추정): {int(philtrum_length)} 픽셀")
-    if philtrum_length > 30:
-        analysis_results.append(" - 인중이 길어 건강하고 안정적인 삶을 추구할 수 있습니다.")
-    else:
-        analysis_results.append(" - 인중이 보통이어서 솔직하고 활동적인 성향이 있을 수 있습니다.")
-
-    # 2. 입술 두께 (윗입술 중앙 ~ 아랫입술 중앙)
-    lip_thickness = calculate_distance(mouth_upper_x, mouth_upper_y, mouth_lower_x, mouth_lower_y)
-    analysis_results.append(f"👄 입술 두께 (추정): {int(lip_thickness)} 픽셀")
-    if lip_thickness > 15:
-        analysis_results.append(" - 입술이 도톰하여 인정이 많고 식복이 있을 수 있습니다.")
-    else:
-        analysis_results.append(" - 입술이 얇거나 보통이어서 이성적이고 섬세한 경향이 있을 수 있습니다.")
-
-    # 3. 눈의 폭 (왼쪽 눈 안쪽 끝 ~ 바깥쪽 끝)
-    eye_width = calculate_distance(left_eye_inner_x, left_eye_inner_y, left_eye_outer_x, left_eye_outer_y)
-    analysis_results.append(f"👁️ 눈 폭 (추정): {int(eye_width)} 픽셀")
-    if eye_width > 60:
-        analysis_results.append(" - 눈이 커서 감정 표현이 풍부하고 호기심이 많을 수 있습니다.")
-    else:
-        analysis_results.append(" - 눈이 작거나 보통이어서 신중하고 집중력이 강할 수 있습니다.")
-    
-    # 최종 결과 반환
-    return "✅ 관상 분석 결과 (MediaPipe 예시):\n" + "\n".join(analysis_results)
 
 # --- 3. GUI 클래스 정의 (Tkinter) ---
 class PhysiognomyApp:
+    # 프레임당 허용하는 평균 추론 시간(ms). 초과하면 추론 빈도를 낮춥니다.
+    INFERENCE_BUDGET_MS = 25.0
+    # 얼굴 주변 ROI만 잘라서 추론 (ROI_SIZE 정사각형으로 축소)
+    ROI_MODE = True
+    ROI_SIZE = 256
+    # 불러온 사진은 긴 변을 이 크기로 줄인 뒤 추론합니다.
+    STILL_MAX_SIDE = 1280
+    # 큰 사진을 디코딩할 때 허용하는 최대 픽셀 버퍼 (바이트)
+    STILL_MAX_DECODE_BYTES = MAX_DECODE_BYTES
+    # 불러온 사진의 표시/캐시용 미리보기 최대 크기
+    PREVIEW_MAX_SIDE = 960
+    # 사진 분석 결과 캐시 (None 이면 사용 안 함)
+    RESULT_CACHE_DIR = DEFAULT_CACHE_DIR
+    # 동시에 분석할 최대 얼굴 수 (키오스크처럼 여러 명이 서는 곳에서는 2 이상)
+    MAX_FACES = 1
+    # 얼굴별 랜드마크 EMA 가중치 (1.0 = 스무딩 없음)
+    FACE_SMOOTHING = 0.6
+    # 분석 수치 평활화: 이동 통계 창(측정 횟수), EMA 가중치, 임계값 대비 히스테리시스 폭
+    METRICS_WINDOW = 30
+    METRICS_ALPHA = 0.3
+    METRICS_HYSTERESIS = 0.1
+    # FaceMesh 워커 프로세스 수 (0 = 이 프로세스에서 추론). 1 이상이면 공유 메모리로 프레임을 넘기고
+    # 도착한 최신 결과를 씁니다 (ROI 자르기와 적응형 추론 간격은 사용하지 않음).
+    INFERENCE_WORKERS = 0
+    # 랜드마크 표시: none / keypoints / contours / points(전체 점) / mesh, 불투명도(1.0 = 섞지 않음)
+    OVERLAY_LEVEL = "contours"
+    OVERLAY_ALPHA = 0.7
+    # 얼굴이 없을 때는 작은 썸네일의 움직임(+Haar 검출)으로 FaceMesh 실행 여부를 정하고,
+    # IDLE_AFTER_S 초 동안 얼굴도 움직임도 없으면 IDLE_POLL_S 초마다 한 프레임만 처리합니다.
+    PRESENCE_GATE = True
+    IDLE_AFTER_S = 5.0
+    IDLE_POLL_S = 0.5
+    # 유휴 상태에서의 Tk 화면 갱신 주기 (ms)
+    IDLE_DELAY_MS = 100
+    # 영상 표시 방식: "paste" (PIL Tk 확장으로 제자리 복사) 또는 "ppm" (Tk 내장 디코더)
+    RENDER_MODE = "paste"
+    # cProfile 캡처 프레임 수
+    PROFILE_FRAMES = 300
+    # 카메라 검색: 0..CAMERA_PROBE_MAX_INDEX 를 모든 백엔드로 동시에 확인, 검사당 제한 시간(초)
+    CAMERA_PROBE_MAX_INDEX = 6
+    CAMERA_PROBE_TIMEOUT = 3.0
+
     def __init__(self, master):
         self.master = master
         master.title("웹캠 관상 분석 프로그램 (MediaPipe Ver.)")
@@ -254,32 +157,14 @@ class PhysiognomyApp:
         except Exception:
             pass
 
-        # 카메라 목록 확인 및 선택 UI
-        cameras = list_available_cameras(4)
+        # 카메라는 창이 뜬 뒤 백그라운드에서 찾고 엽니다 (_start_camera_discovery).
+        # 지난 실행에서 찾은 카메라 목록(인덱스별로 동작한 백엔드)이 있으면 콤보박스에 먼저 채웁니다.
         self.cap = None
-        if cameras:
-            # 기본으로 첫 카메라 선택해서 오픈
-            selected_idx = cameras[0]
-            self.cap, cap_desc = try_open_camera(selected_idx)
-            if self.cap is None or not self.cap.isOpened():
-                logger.warning("Could not open default camera %s, cameras list=%s", selected_idx, cameras)
-            else:
-                logger.info("Camera opened successfully: %s", cap_desc)
-        else:
-            logger.warning("No available cameras detected: %s", cameras)
-        
+        self._cap_index = None
         self.width = 640
         self.height = 480
-        if self.cap is not None:
-            try:
-                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
-                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
-            except Exception:
-                pass
-        logger.debug("Camera opened: %s", False if self.cap is None else self.cap.isOpened())
-        logger.debug("Requested frame size: %sx%s", self.width, self.height)
-        logger.debug("Camera opened: %s", self.cap.isOpened())
-        logger.debug("Requested frame size: %sx%s", self.width, self.height)
+        self.cameras = load_camera_cache() or {}
+        logger.debug("Cached cameras: %s", self.cameras)
 
         # GUI 레이아웃 설정
         main_frame = ttk.Frame(master, padding="10")
@@ -299,6 +184,9 @@ class PhysiognomyApp:
                                             borderwidth=2, relief="solid")
         self.analysis_text_widget.pack(pady=5, padx=5, fill="both", expand=True)
         self.analysis_text_widget.insert(tk.END, "MediaPipe를 사용하여 얼굴을 인식합니다.")
+        # 영상은 하나의 PhotoImage를 재사용해 제자리 갱신, 텍스트는 바뀔 때만 다시 씁니다.
+        self.renderer = FrameRenderer(self.video_label, mode=self.RENDER_MODE)
+        self.analysis_view = CachedText(self.analysis_text_widget, "MediaPipe를 사용하여 얼굴을 인식합니다.")
         
         self.btn_quit = ttk.Button(analysis_panel, text="프로그램 종료", command=self.on_closing)
         self.btn_quit.pack(pady=20)
@@ -307,7 +195,7 @@ class PhysiognomyApp:
         cam_controls.pack(pady=5)
         ttk.Label(cam_controls, text="카메라 선택:").grid(row=0, column=0, sticky="w")
         self.cam_var = tk.StringVar()
-        cam_list = [str(c) for c in list_available_cameras(6)]
+        cam_list = [str(c) for c in self.cameras]
         self.cam_combo = ttk.Combobox(cam_controls, textvariable=self.cam_var, values=cam_list, width=8)
         if cam_list:
             self.cam_combo.set(cam_list[0])
@@ -317,89 +205,390 @@ class PhysiognomyApp:
 
         self.btn_load_image = ttk.Button(cam_controls, text="이미지 불러오기", command=self.load_image)
         self.btn_load_image.grid(row=1, column=0, columnspan=3, pady=6)
+        ttk.Label(cam_controls, text="랜드마크 표시:").grid(row=2, column=0, sticky="w")
+        self.overlay_level_var = tk.StringVar(value=self.OVERLAY_LEVEL)
+        overlay_combo = ttk.Combobox(cam_controls, textvariable=self.overlay_level_var, values=OVERLAY_LEVELS,
+                                     width=10, state="readonly")
+        overlay_combo.grid(row=2, column=1, columnspan=2, padx=5, sticky="w")
+        overlay_combo.bind("<<ComboboxSelected>>", lambda _e: self.set_overlay_level(self.overlay_level_var.get()))
         # 상태 레이블: 카메라 연결/랜드마크 수를 표시
         self.status_var = tk.StringVar(value="카메라 상태: 확인 중...")
         self.status_label = ttk.Label(analysis_panel, textvariable=self.status_var, foreground="blue")
         self.status_label.pack(pady=6)
+        self.status = CachedVar(self.status_var)
+        # 파이프라인 단계별 FPS / 큐 깊이 표시
+        self.perf_var = tk.StringVar(value="")
+        ttk.Label(analysis_panel, textvariable=self.perf_var, foreground="gray").pack(pady=2)
+        # 성능 계측: 영상 위 오버레이, CSV/JSON 내보내기, cProfile 캡처
+        perf_controls = ttk.Frame(analysis_panel)
+        perf_controls.pack(pady=2)
+        self.overlay_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(perf_controls, text="성능 오버레이", variable=self.overlay_var).grid(row=0, column=0, padx=3)
+        ttk.Button(perf_controls, text="타이밍 저장", command=self.export_timings).grid(row=0, column=1, padx=3)
+        ttk.Button(perf_controls, text=f"cProfile {self.PROFILE_FRAMES}프레임",
+                   command=self.start_profile_capture).grid(row=0, column=2, padx=3)
+        # 랜드마크 녹화: 나중에 MediaPipe 없이 재생/재분석 (landmark_recording.py)
+        self.btn_record = ttk.Button(perf_controls, text="랜드마크 녹화", command=self.toggle_recording)
+        self.btn_record.grid(row=1, column=0, columnspan=3, pady=3)
         
         # 실시간 업데이트 루프 시작
         self.delay = 15 
         # 디버그 플래그: 파일에 감지 상태를 기록합니다.
         self.DEBUG = True
+        # 캡처/추론은 백그라운드 스레드에서, Tk 스레드는 결과 표시만 담당합니다.
+        self._init_processing()
+        if self.INFERENCE_WORKERS > 0:
+            self.inference_pool = InferencePool(self.INFERENCE_WORKERS, max_faces=self.MAX_FACES).start()
+        self.result_cache = ResultCache(self.RESULT_CACHE_DIR) if self.RESULT_CACHE_DIR else None
+        self.profile_capture = ProfileCapture()
+        self._overlay_lines = []
+        self.pipeline = FramePipeline(lambda pkt: self.profile_capture.run(self._process_packet, pkt),
+                                      queue_size=1, timer=self.timer,
+                                      poll_interval=(lambda: self.presence.poll_interval) if self.presence else None)
+        self.pipeline.start()
+        self._start_camera_discovery()
+        self._last_stats_log = self._last_stats_shown = time.perf_counter()
         self.update_video()
 
+    def _init_processing(self):
+        """Per-frame worker state used by `_process_packet` (no Tk widgets involved)."""
+        # 프레임마다 재사용하는 랜드마크 버퍼 (처리 중/큐 대기/표시 중 프레임이 서로 덮어쓰지 않도록 여러 개)
+        self._lm_buffers = [np.empty((self.MAX_FACES, MAX_LANDMARKS, 3), dtype=np.float32) for _ in range(4)]
+        self._lm_slot = 0
+        self.tracker = FaceTracker(smoothing=self.FACE_SMOOTHING)
+        self._face_ids = []
+        # 수준별로 미리 계산한 그리기 묶음으로 랜드마크를 한 번에 그립니다.
+        self.overlay = OverlayRenderer(self.OVERLAY_LEVEL, alpha=self.OVERLAY_ALPHA)
+        # 사진(Tk 스레드)용 렌더러: 영상 스레드와 버퍼를 공유하지 않고, 수준별 계획은 재사용합니다.
+        self._still_overlay = OverlayRenderer(self.OVERLAY_LEVEL, alpha=self.OVERLAY_ALPHA)
+        # 지연 예산에 맞춰 추론 간격을 자동 조절하고, 건너뛴 프레임은 랜드마크를 보간합니다.
+        self.scheduler = AdaptiveScheduler(budget_ms=self.INFERENCE_BUDGET_MS)
+        self.predictor = LandmarkPredictor(mode="linear")
+        self.roi = RoiTracker(roi_size=self.ROI_SIZE)
+        # 빈 화면에서 FaceMesh 를 건너뛰는 얼굴 존재 게이트 + 유휴 폴링
+        self.presence = PresenceGate(idle_after=self.IDLE_AFTER_S,
+                                     idle_interval=self.IDLE_POLL_S) if self.PRESENCE_GATE else None
+        # 얼굴별 측정값 EMA/이동 통계 + 임계값 히스테리시스 (분석 문구가 프레임마다 뒤바뀌지 않도록)
+        self.metrics = MetricsEngine(window=self.METRICS_WINDOW, alpha=self.METRICS_ALPHA,
+                                     hysteresis=self.METRICS_HYSTERESIS)
+        self._analysis_key = None
+        self._analysis_text = None
+        self.features = default_engine()
+        self._last_features = None
+        # 멀티프로세스 추론 (INFERENCE_WORKERS > 0 일 때 __init__ 에서 시작)
+        self.inference_pool = None
+        # 추론한 프레임의 랜드마크를 기록하는 LandmarkRecorder (녹화 중일 때만)
+        self.recorder = None
+        # 단계별 타이밍 (롤링 p50/p95/p99)
+        self.timer = StageTimer()
+
+    @classmethod
+    def headless(cls, debug: bool = False):
+        """Worker-only instance for benchmarks and replay: `_process_packet` without a Tk window or camera."""
+        app = cls.__new__(cls)
+        app.DEBUG = debug
+        app._init_processing()
+        return app
+
+    def _process_packet(self, pkt):
+        """Worker-thread stage: FaceMesh (or prediction), landmark drawing and analysis on `pkt.rgb`."""
+        timer = self.timer
+        rgb_frame = pkt.rgb
+        if rgb_frame is None:
+            # 캡처 단계를 거치지 않은 패킷 (BGR 프레임만 있는 경우)
+            with timer.stage("cvtColor"):
+                rgb_frame = pkt.rgb = cv2.cvtColor(pkt.frame, cv2.COLOR_BGR2RGB)
+        self._lm_slot = (self._lm_slot + 1) % len(self._lm_buffers)
+        buf = self._lm_buffers[self._lm_slot]
+
+        batch = None  # (F, N, 3) 모든 얼굴의 랜드마크
+        fh, fw = rgb_frame.shape[:2]
+        pool = self.inference_pool
+        use_roi = self.ROI_MODE and self.MAX_FACES == 1 and pool is None
+        t_observed = pkt.t_capture  # 랜드마크가 관측된 프레임의 시각
+        gate = self.presence
+        if gate is not None:
+            # 얼굴이 없는 동안에는 썸네일 움직임/검출로 FaceMesh 를 돌릴 프레임만 통과시킵니다.
+            with timer.stage("presence"):
+                likely = gate.check(rgb_frame, pkt.t_capture)
+            pkt.extra["presence"] = gate.state
+        else:
+            likely = True
+        if pool is not None:
+            # 워커 프로세스: 프레임을 공유 메모리 슬롯에 넣고 (모두 바쁘면 버림), 도착한 최신 결과를 씁니다.
+            if likely:
+                with timer.stage("pool.submit"):
+                    pool.submit(rgb_frame, pkt.seq, t=pkt.t_capture)
+            res = pool.latest()
+            inferred = res is not None
+            if inferred:
+                timer.add("face_mesh.process", res.ms)
+                t_observed = res.t
+                if res.landmarks is not None:
+                    with timer.stage("landmarks.convert"):
+                        f, n = res.landmarks.shape[:2]
+                        buf[:f, :n] = res.landmarks
+                        batch = buf[:f, :n]
+                if gate is not None:
+                    gate.observe(batch is not None, res.t)
+        else:
+            # 얼굴을 찾는 중에 게이트를 통과한 프레임은 추론 간격과 상관없이 바로 추론합니다.
+            inferred = likely and self.scheduler.should_infer(force=gate is not None and gate.state != "active")
+            if inferred:
+                batch = self._infer_local(rgb_frame, buf, use_roi)
+                if gate is not None:
+                    gate.observe(batch is not None, pkt.t_capture)
+        pkt.extra["inferred"] = inferred
+        if inferred:
+            recorder = self.recorder
+            if recorder is not None:
+                # FaceMesh 출력 그대로 (추적/스무딩 전) 기록합니다.
+                with timer.stage("record"):
+                    recorder.write(t_observed, batch, fw, fh, seq=pkt.seq)
+            if use_roi:
+                self.roi.update(None if batch is None else batch[0], fw, fh)
+            # 얼굴 ID 부여 + 모든 얼굴을 한 번에 스무딩
+            prev_ids = self._face_ids
+            with timer.stage("track"):
+                # 재사용 랜드마크 버퍼 안에서 바로 스무딩합니다.
+                self._face_ids, batch = self.tracker.update(batch, out=batch)
+            if self._face_ids != prev_ids:
+                self._last_features = None  # 다른 얼굴의 특징을 보간 프레임에 이어 쓰지 않도록
+            self.predictor.update(batch, t_observed, key=tuple(self._face_ids))
+        else:
+            # 추론을 건너뛴 프레임: 직전 랜드마크를 유지/보간해서 사용
+            batch = self.predictor.predict(pkt.t_capture, out=buf)
+
+        if batch is None or not len(batch):
+            self._last_features = None
+        else:
+            # 특징점 그리기 (실제 프레임 크기 사용, 모든 얼굴을 한 번에)
+            ids = self._face_ids[:len(batch)]
+            with timer.stage("draw"):
+                self.overlay.render(rgb_frame, batch, fw, fh)
+                if self.MAX_FACES > 1:
+                    self._draw_face_ids(rgb_frame, ids, batch, fw, fh)
+
+            # 관상 분석 실행 (모든 얼굴을 한 번에 측정)
+            with timer.stage("analysis"):
+                pkt.landmarks = batch[0]
+                pkt.faces = list(zip(ids, batch))
+                pkt.analysis = self._update_analysis(ids, batch, fw, fh, pkt.extra["inferred"])
+            # 눈 사이 거리로 정규화한 특징 전체를 한 번에 계산 (텔레메트리를 기록할 때만,
+            # 추론한 프레임만 새로 계산하고 보간 프레임은 직전 값)
+            if telemetry.isEnabledFor(logging.DEBUG):
+                with timer.stage("features"):
+                    if pkt.extra["inferred"] or self._last_features is None:
+                        if batch.shape[1] >= self.features.min_landmarks:
+                            self._last_features = self.features.compute(batch, fw, fh)
+                    pkt.features = self._last_features
+
+        # 프레임 단위 텔레메트리 (JSON lines, 비활성화 시 비용 없음)
+        log_frame(telemetry, seq=pkt.seq, inf=int(pkt.extra["inferred"]), faces=len(pkt.faces),
+                  lat=round((time.perf_counter() - pkt.t_capture) * 1000.0, 2),
+                  itv=self.scheduler.interval,
+                  feat=None if pkt.features is None else
+                  dict(zip(map(str, self._face_ids), self.features.as_dicts(pkt.features))))
+
+    def _infer_local(self, rgb_frame, buf, use_roi):
+        """FaceMesh in this process; returns the (F, N, 3) batch (a view of `buf`) or None."""
+        timer = self.timer
+        # ROI 모드: 직전 얼굴 주변만 잘라(축소해) 추론, 추적을 잃으면 전체 프레임
+        with timer.stage("roi.prepare"):
+            inp, transform = self.roi.prepare(rgb_frame) if use_roi else (rgb_frame, None)
+        t0 = time.perf_counter()
+        results = get_face_mesh(max_num_faces=self.MAX_FACES).process(inp) # MediaPipe 분석 실행
+        process_ms = (time.perf_counter() - t0) * 1000.0
+        timer.add("face_mesh.process", process_ms)
+        self.scheduler.record(process_ms)
+        if not (results and results.multi_face_landmarks):
+            return None
+        faces = results.multi_face_landmarks[:self.MAX_FACES]
+        # 얼굴별 랜드마크를 재사용 버퍼의 (F, N, 3) 배열로 한 번만 변환합니다.
+        # (ReplayMesh 처럼 (N, 3) 배열을 돌려주는 모델도 같은 버퍼로 복사됩니다.)
+        with timer.stage("landmarks.convert"):
+            for i, landmarks in enumerate(faces):
+                n = landmarks_to_array(landmarks, out=buf[i]).shape[0]
+            batch = buf[:len(faces), :n]
+            if transform is not None:
+                self.roi.reproject(batch[0], transform)
+        if self.DEBUG and logger.isEnabledFor(logging.DEBUG):
+            # 로그는 백그라운드 스레드에서 기록되고 호출 위치별로 속도 제한됩니다.
+            # 샘플 좌표 목록은 실제로 기록될 때만 (writer 스레드에서) 만들어집니다.
+            logger.debug("Face landmarks detected: %s (faces=%s)", n, len(faces))
+            logger.debug("Sample landmarks (normalized): %s",
+                         Lazy(lambda pts=batch[0, :3, :2].copy(): np.round(pts, 3).tolist()))
+        return batch
+
+    def _update_analysis(self, ids, batch, fw, fh, measured):
+        """Smoothed analysis text; the string is rebuilt only when a class or shown value changes."""
+        if batch.shape[1] < 468:
+            return "얼굴 랜드마크를 찾지 못했습니다."
+        # 추론한 프레임의 측정값만 통계에 넣고, 보간한 프레임은 직전 결과를 그대로 씁니다.
+        texts = self.metrics.texts(ids)
+        changed = False
+        if measured or None in texts:
+            texts, changed = self.metrics.update(ids, measure_faces(batch, fw, fh))
+        key = tuple(ids)
+        if changed or key != self._analysis_key:
+            self._analysis_key = key
+            self._analysis_text = self._format_faces(ids, texts)
+        return self._analysis_text
+
+    @staticmethod
+    def _draw_face_ids(rgb, ids, batch, fw, fh):
+        """Label each face with its track ID at the top-left of its landmark box."""
+        tops = batch[:, :, :2].min(axis=1) * (fw, fh)
+        for face_id, (x, y) in zip(ids, tops.astype(int).tolist()):
+            cv2.putText(rgb, f"#{face_id}", (x, max(y - 6, 12)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+
+    @staticmethod
+    def _format_faces(ids, texts):
+        """한 얼굴이면 기존 형식 그대로, 여러 얼굴이면 얼굴 ID별로 구분해서 표시합니다."""
+        if len(texts) == 1:
+            return texts[0]
+        return "\n\n".join(f"👤 얼굴 #{face_id}\n{text}" for face_id, text in zip(ids, texts))
+
     def update_video(self):
-        """카메라에서 프레임을 읽고, 얼굴을 인식하여 특징점을 표시한 후 GUI에 업데이트합니다."""
-        # 안전하게 카메라에서 프레임 읽기
-        frame = None
-        ret = False
-        if self.cap is not None and self.cap.isOpened():
-            try:
-                ret, frame = self.cap.read()
-            except Exception:
-                ret = False
-
-        current_analysis_text = "얼굴을 찾지 못했습니다."
-
-        if ret and frame is not None:
-            # 1. MediaPipe 처리
-            frame = cv2.flip(frame, 1) # 좌우 반전 (거울 모드)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = face_mesh.process(rgb_frame) # MediaPipe 분석 실행
-
-            if results and results.multi_face_landmarks:
-                # 첫 번째 감지된 얼굴만 사용
-                landmarks = results.multi_face_landmarks[0]
-                if self.DEBUG:
-                    try:
-                        cnt = len(landmarks.landmark)
-                        logger.debug("Face landmarks detected: %s", cnt)
-                        coords_sample = [(round(lm.x,3), round(lm.y,3)) for lm in landmarks.landmark[:3]]
-                        logger.debug("Sample landmarks (normalized): %s", coords_sample)
-                    except Exception as e:
-                        logger.exception("Error logging landmarks: %s", e)
-
-                # 2. 특징점 그리기 (실제 프레임 크기 사용)
-                fh, fw = rgb_frame.shape[:2]
-                for lm in landmarks.landmark:
-                    x = int(lm.x * fw)
-                    y = int(lm.y * fh)
-                    cv2.circle(rgb_frame, (x, y), 1, (0, 255, 0), -1)
-
-                # 3. 관상 분석 실행 (픽셀 계산에 실제 프레임 크기를 전달)
-                current_analysis_text = analyze_physiognomy_mp(landmarks, fw, fh)
+        """파이프라인의 최신 결과를 GUI에 표시합니다 (Tk 스레드에서 실행)."""
+        pkt = self.pipeline.latest_result()
+        idle = self.presence is not None and self.presence.idle
+
+        if pkt is not None:
+            current_analysis_text = pkt.analysis or "얼굴을 찾지 못했습니다."
+            if pkt.landmarks is not None:
                 # 상태 표시 업데이트
-                try:
-                    self.status_var.set(f"카메라: 연결됨  랜드마크: {len(landmarks.landmark)}")
-                except Exception:
-                    self.status_var.set("카메라: 연결됨  랜드마크: ?")
-
-            # 분석 결과를 GUI 텍스트 위젯에 업데이트
-            self.analysis_text_widget.delete(1.0, tk.END)
-            self.analysis_text_widget.insert(tk.END, current_analysis_text)
-
-            # OpenCV 프레임을 Tkinter에서 표시할 수 있는 이미지로 변환
-            img = Image.fromarray(rgb_frame)
-            imgtk = ImageTk.PhotoImage(image=img)
-            self.video_label.imgtk = imgtk
-            self.video_label.configure(image=imgtk)
+                self.status.set(f"카메라: 연결됨  랜드마크: {len(pkt.landmarks)}  얼굴: {len(pkt.faces)}")
+            elif idle:
+                self.status.set("카메라: 연결됨  대기 중 (얼굴이 없어 절전)")
+
+            # 분석 결과를 GUI 텍스트 위젯에 업데이트 (내용이 바뀐 경우에만)
+            with self.timer.stage("tk.text"):
+                self.analysis_view.set(current_analysis_text)
+
+            # 성능 오버레이 (단계별 p50/p95/p99)
+            if self.overlay_var.get():
+                draw_overlay(pkt.rgb, self._overlay_lines)
+
+            # 프레임을 화면의 PhotoImage에 제자리로 복사 (새 이미지/라벨 재설정 없음)
+            with self.timer.stage("tk.photoimage"):
+                self.renderer.show(pkt.rgb)
+        elif not self.pipeline.capture_opened():
+            # 카메라 프레임이 없을 때는 빈 회색 이미지로 표시 (캐시됨, 이미 표시 중이면 건너뜀)
+            self.renderer.show_blank(self.width, self.height)
+            searching = not self._discovery_done.is_set()
+            self.status.set("카메라: 검색 중..." if searching else "카메라: 연결되지 않음")
+
+        # 단계별 FPS/큐 상태를 표시하고 주기적으로 기록합니다.
+        now = time.perf_counter()
+        if now - self._last_stats_shown >= (2.0 if idle else 0.5):
+            self._last_stats_shown = now
+            st = self.pipeline.snapshot()
+            sc = self.scheduler.snapshot()
+            self.perf_var.set(f"캡처 {st['capture_fps']} / 추론 {st['inference_fps']} / 표시 {st['display_fps']} fps  "
+                              f"큐 {st['frame_q']}·{st['result_q']} (버림 {st['frame_q_dropped']}·{st['result_q_dropped']})\n"
+                              f"추론 간격 {sc['interval']}프레임  스킵 {sc['skip_ratio']:.0%}  "
+                              f"추론 {sc['process_ms'] or 0:.0f}/{sc['budget_ms']:.0f} ms")
+            # 오버레이용 백분위 문자열은 0.5초마다만 다시 계산합니다.
+            self._overlay_lines = self.timer.format_lines() if self.overlay_var.get() else []
+        if now - self._last_stats_log >= 5.0:
+            self._last_stats_log = now
+            logger.info("Pipeline stats: %s scheduler: %s presence: %s", self.pipeline.snapshot(),
+                        self.scheduler.snapshot(), self.presence.snapshot() if self.presence else None)
+
+        # 다음 업데이트 예약 (유휴 상태에서는 드물게)
+        self.master.after(self.IDLE_DELAY_MS if idle else self.delay, self.update_video)
+
+    def export_timings(self):
+        """Save the per-stage timing summary as CSV or JSON (by file extension)."""
+        path = filedialog.asksaveasfilename(defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv"), ("JSON", "*.json")])
+        if not path:
+            return
+        if path.lower().endswith(".json"):
+            self.timer.export_json(path)
         else:
-            # 카메라 프레임이 없을 때는 빈 회색 이미지로 표시 및 상태 업데이트
-            blank = Image.new('RGB', (self.width, self.height), (120,120,120))
-            imgtk = ImageTk.PhotoImage(image=blank)
-            self.video_label.imgtk = imgtk
-            self.video_label.configure(image=imgtk)
-            # 카메라가 열려 있지 않거나 프레임을 못 받아왔을 때 상태 표시
-            try:
-                if self.cap is None or not self.cap.isOpened():
-                    self.status_var.set("카메라: 연결되지 않음")
+            self.timer.export_csv(path)
+        logger.info("export_timings: wrote %s", path)
+
+    def start_profile_capture(self):
+        """cProfile the next PROFILE_FRAMES worker frames; the .prof file goes next to the log."""
+        path = os.path.join(os.path.dirname(LOG_PATH), time.strftime("face01_profile_%Y%m%d_%H%M%S.prof"))
+        self.profile_capture.start(self.PROFILE_FRAMES, path)
+        logger.info("start_profile_capture: %s frames -> %s", self.PROFILE_FRAMES, path)
+        self.status.set(f"cProfile 캡처 중 ({self.PROFILE_FRAMES}프레임) → {os.path.basename(path)}")
+
+    def set_overlay_level(self, level: str):
+        """Switch the landmark overlay level; the worker picks it up on its next frame."""
+        self.overlay.level = level
+        logger.info("set_overlay_level: %s", level)
+
+    def toggle_recording(self):
+        """Start/stop recording inferred landmarks to a .lmr file next to the log."""
+        recorder = self.recorder
+        if recorder is None:
+            path = os.path.join(os.path.dirname(LOG_PATH), time.strftime("face01_%Y%m%d_%H%M%S.lmr"))
+            self.recorder = LandmarkRecorder(path)
+            logger.info("toggle_recording: recording landmarks -> %s", path)
+            self.btn_record.configure(text="녹화 중지")
+            self.status.set(f"랜드마크 녹화 중 → {os.path.basename(path)}")
+            return
+        self.recorder = None
+        recorder.close()
+        logger.info("toggle_recording: %s frames -> %s", recorder.frames, recorder.path)
+        self.btn_record.configure(text="랜드마크 녹화")
+        self.status.set(f"녹화 저장: {os.path.basename(recorder.path)} ({recorder.frames}프레임)")
+
+    def _start_camera_discovery(self):
+        """Open the default camera and re-probe all indices on a background thread."""
+        self._discovery_done = threading.Event()
+        threading.Thread(target=self._discover_and_open, name="face01-camdiscovery", daemon=True).start()
+        self.master.after(100, self._poll_camera_discovery)
+
+    def _discover_and_open(self):
+        cached = dict(self.cameras)
+        try:
+            # 캐시된 첫 카메라는 알려진 백엔드로 바로 열어 화면이 빨리 나오게 합니다.
+            if cached:
+                self._open_default_camera(cached)
+            # 이미 연 카메라는 다시 열면 실패하는 드라이버가 있으므로 검사에서 제외합니다.
+            known = {self._cap_index: cached[self._cap_index]} if self.cap is not None else None
+            cameras = discover_cameras(self.CAMERA_PROBE_MAX_INDEX, timeout=self.CAMERA_PROBE_TIMEOUT, known=known)
+            save_camera_cache(cameras)
+            self.cameras = cameras
+            if self.cap is None:
+                if cameras:
+                    self._open_default_camera(cameras)
                 else:
-                    self.status_var.set("카메라: 연결됨(프레임 없음)")
-            except Exception:
-                self.status_var.set("카메라: 상태 알 수 없음")
+                    logger.warning("No available cameras detected: %s", cameras)
+        except Exception as e:
+            logger.exception("camera discovery failed: %s", e)
+        finally:
+            self._discovery_done.set()
+
+    def _open_default_camera(self, cameras):
+        # 기본으로 첫 카메라 선택해서 오픈
+        index, backend = next(iter(cameras.items()))
+        cap, desc = open_camera(index, self.width, self.height, backend=backend)
+        if cap is None:
+            logger.warning("Could not open default camera %s, cameras list=%s", index, list(cameras))
+            return
+        logger.info("Camera opened successfully: %s", desc)
+        logger.debug("Requested frame size: %sx%s", self.width, self.height)
+        self.cap, self._cap_index = cap, index
+        self.pipeline.set_capture(cap)
 
-        # 다음 업데이트 예약
-        self.master.after(self.delay, self.update_video)
+    def _poll_camera_discovery(self):
+        """Tk thread: fill the combobox once discovery has finished."""
+        if not self._discovery_done.is_set():
+            self.master.after(100, self._poll_camera_discovery)
+            return
+        cam_list = [str(c) for c in self.cameras]
+        self.cam_combo.configure(values=cam_list)
+        if self.cap is not None:
+            self.cam_var.set(str(self._cap_index))
+        elif cam_list and not self.cam_var.get():
+            self.cam_combo.set(cam_list[0])
 
     def select_camera(self):
         """Reopen camera from combobox selection."""
@@ -409,13 +598,11 @@ class PhysiognomyApp:
         except Exception:
             messagebox.showwarning("카메라 선택", "유효한 카메라 인덱스를 선택하세요.")
             return
-        # close previous
-        if self.cap is not None:
-            try:
-                self.cap.release()
-            except Exception:
-                pass
-        self.cap, desc = try_open_camera(idx)
+        # close previous (the pipeline releases the old device when swapping)
+        self.pipeline.set_capture(None)
+        self.cap, desc = open_camera(idx, self.width, self.height, backend=self.cameras.get(idx))
+        self._cap_index = idx
+        self.pipeline.set_capture(self.cap)
         if self.cap is None or not self.cap.isOpened():
             messagebox.showerror("카메라 오류", f"카메라를 열 수 없습니다: {desc}")
             logger.error("select_camera failed: %s", desc)
@@ -427,63 +614,95 @@ class PhysiognomyApp:
         path = filedialog.askopenfilename(filetypes=[("Image files","*.jpg *.jpeg *.png *.bmp"), ("All files","*.*")])
         if not path:
             return
-        # 일부 Windows/OpenCV 빌드에서는 한글(유니코드) 경로에서 cv2.imread가 실패합니다.
-        # 안정적으로 열기 위해 먼저 PIL로 시도하고, 실패하면 numpy+cv2.imdecode로 fallback 합니다.
-        try:
-            pil_img = Image.open(path).convert('RGB')
-            rgb = np.array(pil_img)
-        except Exception as e:
-            logger.exception("load_image: PIL failed to open image: %s", e)
+        # 같은 파일(경로·크기·수정 시각 + 설정)을 이미 분석했다면 디코딩/추론 없이 캐시에서 표시합니다.
+        # Tk 스레드에서 파일 전체를 해시하지 않도록 stat 한 번으로 키를 만듭니다.
+        key = None
+        if self.result_cache is not None:
             try:
-                # cv2.imread가 유니코드 경로에서 실패하면 fromfile+imdecode 방식 사용
-                data = np.fromfile(path, dtype=np.uint8)
-                img_bgr = cv2.imdecode(data, cv2.IMREAD_COLOR)
-                if img_bgr is None:
-                    raise ValueError('cv2.imdecode returned None')
-                rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
-            except Exception as e2:
-                logger.exception("load_image: cv2 fallback also failed: %s", e2)
-                messagebox.showerror("이미지 오류", f"이미지를 읽을 수 없습니다.\n{e2}")
+                key = stat_key(path, self._still_settings())
+                entry = self.result_cache.get(key)
+            except OSError as e:
+                logger.warning("load_image: cannot hash %s for cache: %s", path, e)
+                entry = None
+            if entry is not None and entry.preview:
+                preview = cv2.cvtColor(cv2.imdecode(np.frombuffer(entry.preview, np.uint8), cv2.IMREAD_COLOR),
+                                       cv2.COLOR_BGR2RGB)
+                ids = list(range(1, len(entry.analyses) + 1))
+                text = self._format_faces(ids, entry.analyses) if entry.analyses else "얼굴을 찾지 못했습니다."
+                logger.info("load_image: cache hit for %s", path)
+                self._show_still(preview, text)
                 return
-        results = face_mesh.process(rgb)
+        # 큰 사진은 디코딩 단계에서부터 STILL_MAX_SIDE 크기의 대리 이미지로 줄여 읽습니다
+        # (원본 해상도 버퍼는 만들지 않고, 디코딩 버퍼는 STILL_MAX_DECODE_BYTES 이하).
+        try:
+            with self.timer.stage("still.decode"):
+                image = read_image_reduced(path, self.STILL_MAX_SIDE, self.STILL_MAX_DECODE_BYTES)
+        except Exception as e2:
+            messagebox.showerror("이미지 오류", f"이미지를 읽을 수 없습니다.\n{e2}")
+            return
+        rgb = image.rgb
+        w, h = image.width, image.height  # 분석 수치는 원본 픽셀 단위
+        logger.info("load_image: %s %sx%s decoded as %sx%s", path, w, h, rgb.shape[1], rgb.shape[0])
+        with self.pipeline.mesh_lock, self.timer.stage("still.process"):
+            results = get_face_mesh(max_num_faces=self.MAX_FACES).process(rgb)
         analysis_text = "얼굴을 찾지 못했습니다."
+        batch = np.zeros((0, MAX_LANDMARKS, 3), dtype=np.float32)
+        analyses = []
+        # 표시용 미리보기 (창을 넘지 않도록 축소) — 랜드마크는 미리보기에만 그리고, 캐시에도 JPEG로 저장합니다.
+        preview = downscale_for_inference(rgb, self.PREVIEW_MAX_SIDE)
         if results and results.multi_face_landmarks:
-            lm = results.multi_face_landmarks[0]
-            # use actual image size
-            h, w = rgb.shape[:2]
-            analysis_text = analyze_physiognomy_mp(lm, w, h)
-            # draw landmarks for display
-            for lm_pt in lm.landmark:
-                x = int(lm_pt.x * w)
-                y = int(lm_pt.y * h)
-                cv2.circle(rgb, (x, y), 1, (0,255,0), -1)
+            batch = np.stack([landmarks_to_array(lm) for lm in results.multi_face_landmarks[:self.MAX_FACES]])
+            ids = list(range(1, len(batch) + 1))
+            # 정규화 좌표는 대리 이미지와 원본에서 같으므로 원본 크기로 측정합니다.
+            analyses = analyze_faces(batch, w, h)
+            analysis_text = self._format_faces(ids, analyses)
+            with self.timer.stage("still.draw"):
+                # 영상 스레드의 렌더러와 버퍼를 공유하지 않도록 사진 전용 렌더러를 현재 설정으로 씁니다.
+                still = self._still_overlay
+                still.level, still.alpha = self.overlay.level, self.overlay.alpha
+                still.render(preview, batch)
+                if len(batch) > 1:
+                    self._draw_face_ids(preview, ids, batch, preview.shape[1], preview.shape[0])
+        if key is not None:
+            ok, jpg = cv2.imencode(".jpg", cv2.cvtColor(preview, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, 90])
+            self.result_cache.put(key, CachedResult(batch, analyses, w, h, jpg.tobytes() if ok else None))
+        self._show_still(preview, analysis_text)
+
+    def _still_settings(self) -> dict:
+        """Everything that changes a still-image result; part of the cache key."""
+        return dict(FACE_MESH_SETTINGS, max_num_faces=self.MAX_FACES, still_max_side=self.STILL_MAX_SIDE,
+                    preview_max_side=self.PREVIEW_MAX_SIDE, overlay=self.overlay.level,
+                    overlay_alpha=self.overlay.alpha, mode="gui")
+
+    def _show_still(self, rgb, analysis_text):
         # show in GUI
-        img = Image.fromarray(rgb)
-        imgtk = ImageTk.PhotoImage(image=img)
-        self.video_label.imgtk = imgtk
-        self.video_label.configure(image=imgtk)
-        self.analysis_text_widget.delete(1.0, tk.END)
-        self.analysis_text_widget.insert(tk.END, analysis_text)
+        with self.timer.stage("still.photoimage"):
+            self.renderer.show(rgb)
+        with self.timer.stage("still.text"):
+            self.analysis_view.set(analysis_text)
 
     def on_closing(self):
         """GUI 창이 닫힐 때 카메라와 창을 정리합니다."""
+        self.profile_capture.stop()
         try:
-            if self.cap and self.cap.isOpened():
-                try:
-                    self.cap.release()
-                except Exception:
-                    pass
+            # 캡처/추론 스레드를 멈추고 카메라를 해제합니다.
+            self.pipeline.stop()
         except Exception:
             pass
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.inference_pool is not None:
+            self.inference_pool.close()
         # MediaPipe 객체 해제 (선택 사항)
         try:
-            face_mesh.close()
+            close_face_mesh()
         except Exception:
             pass
         self.master.destroy()
 
 # --- 4. 메인 실행 ---
 if __name__ == "__main__":
+    setup_file_logging()
     root = tk.Tk()
     app = PhysiognomyApp(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,368 @@
+"""
+Lightweight physiognomy analysis library: landmark conversion, distance
+helpers and `analyze_physiognomy_mp`, importable without Tk, OpenCV or
+MediaPipe. The FaceMesh model is built lazily on the first `get_face_mesh()`
+call, and the `face01_debug.log` file handler is only attached by
+`setup_file_logging()`.
+"""
+import itertools
+import logging
+import math
+import operator
+import os
+import threading
+import types
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+# --- 로거 (파일 핸들러는 setup_file_logging()에서 붙입니다) ---
+LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face01_debug.log")
+TELEMETRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face01_telemetry.jsonl")
+logger = logging.getLogger("face01")
+logger.addHandler(logging.NullHandler())
+_file_logging_ready = False
+
+
+def setup_file_logging(path: str = LOG_PATH, level: int = logging.DEBUG, asynchronous: bool = True,
+                       telemetry_path: Optional[str] = TELEMETRY_PATH) -> logging.Logger:
+    """Attach the `face01_debug.log` file handler once; safe to call repeatedly.
+
+    With `asynchronous=True` the file is written on a background thread, DEBUG/INFO
+    records are rate-limited per call site, and frame telemetry (logger
+    `face01.telemetry`) goes to a compact JSON-lines file at `telemetry_path`.
+    """
+    global _file_logging_ready
+    if _file_logging_ready:
+        return logger
+    _file_logging_ready = True
+    logger.setLevel(level)
+    fh = logging.FileHandler(path, encoding="utf-8")
+    fh.setLevel(level)
+    fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+    fh.setFormatter(fmt)
+    if not asynchronous:
+        logger.addHandler(fh)
+        return logger
+
+    from async_logging import TELEMETRY_LOGGER, CompactJsonFormatter, RateLimitFilter, start_queue_logging
+    start_queue_logging(logger, [fh], rate_filter=RateLimitFilter(rate=2.0, burst=10))
+    telemetry = logging.getLogger(TELEMETRY_LOGGER)
+    telemetry.propagate = False  # 텔레메트리는 디버그 로그에 섞지 않습니다.
+    if telemetry_path:
+        telemetry.setLevel(logging.DEBUG)
+        th = logging.FileHandler(telemetry_path, encoding="utf-8")
+        th.setFormatter(CompactJsonFormatter())
+        start_queue_logging(telemetry, [th])
+    else:
+        telemetry.setLevel(logging.CRITICAL + 1)
+    return logger
+
+
+# --- 1. MediaPipe FaceMesh (지연 생성) ---
+FACE_MESH_SETTINGS = dict(
+    max_num_faces=1,             # 한 번에 감지할 최대 얼굴 수
+    refine_landmarks=True,       # 랜드마크 정밀도 개선
+    min_detection_confidence=0.5,# 최소 감지 신뢰도
+    min_tracking_confidence=0.5, # 최소 추적 신뢰도
+)
+_face_mesh = None
+_face_mesh_settings = None
+_face_mesh_lock = threading.Lock()
+
+
+def create_face_mesh(**overrides):
+    """Build a new FaceMesh with the default settings updated by `overrides`."""
+    import mediapipe as mp  # Dlib 대신 MediaPipe 사용 (무거운 import 이므로 필요할 때만)
+
+    settings = dict(FACE_MESH_SETTINGS, **overrides)
+    mesh = mp.solutions.face_mesh.FaceMesh(**settings)
+    logger.debug("Initialized MediaPipe FaceMesh with %s", settings)
+    return mesh
+
+
+def get_face_mesh(**overrides):
+    """Shared FaceMesh instance, built on first use.
+
+    Passing settings that differ from the current instance (e.g. a new
+    `max_num_faces`) closes it and builds a replacement.
+    """
+    global _face_mesh, _face_mesh_settings
+    settings = dict(FACE_MESH_SETTINGS, **overrides)
+    if _face_mesh is None or (overrides and settings != _face_mesh_settings):
+        with _face_mesh_lock:
+            if _face_mesh is None or (overrides and settings != _face_mesh_settings):
+                if _face_mesh is not None:
+                    _face_mesh.close()
+                _face_mesh = create_face_mesh(**overrides)
+                _face_mesh_settings = settings
+    return _face_mesh
+
+
+def close_face_mesh() -> None:
+    """Release the shared FaceMesh if it was ever built."""
+    global _face_mesh
+    with _face_mesh_lock:
+        mesh, _face_mesh = _face_mesh, None
+    if mesh is not None:
+        mesh.close()
+
+
+class SyntheticMesh:
+    """Stand-in for FaceMesh (benchmarks, load tests): seeded landmark clouds with per-call jitter."""
+
+    def __init__(self, max_num_faces: int = 1, seed: int = 0):
+        self.rng = np.random.default_rng(seed)
+        self.max_num_faces = max_num_faces
+        base = self.rng.random((max_num_faces, MAX_LANDMARKS, 3)).astype(np.float32) * 0.25
+        base[:, :, 0] += 0.1 + 0.8 * np.arange(max_num_faces)[:, None] / max(max_num_faces, 1)
+        base[:, :, 1] += 0.35
+        self.base = base
+
+    def process(self, rgb):
+        pts = self.base + self.rng.normal(0, 0.002, size=self.base.shape).astype(np.float32)
+        faces = [types.SimpleNamespace(landmark=[types.SimpleNamespace(x=float(x), y=float(y), z=float(z))
+                                                 for x, y, z in face])
+                 for face in pts]
+        return types.SimpleNamespace(multi_face_landmarks=faces)
+
+    def close(self):
+        pass
+
+
+def read_image_rgb(path) -> np.ndarray:
+    """Decode an image file into an RGB uint8 array; raises if it cannot be read."""
+    # 일부 Windows/OpenCV 빌드에서는 한글(유니코드) 경로에서 cv2.imread가 실패합니다.
+    # 안정적으로 열기 위해 먼저 PIL로 시도하고, 실패하면 numpy+cv2.imdecode로 fallback 합니다.
+    from PIL import Image
+    import cv2
+
+    try:
+        pil_img = Image.open(path).convert('RGB')
+        return np.array(pil_img)
+    except Exception as e:
+        logger.exception("read_image_rgb: PIL failed to open image: %s", e)
+        try:
+            # cv2.imread가 유니코드 경로에서 실패하면 fromfile+imdecode 방식 사용
+            data = np.fromfile(path, dtype=np.uint8)
+            img_bgr = cv2.imdecode(data, cv2.IMREAD_COLOR)
+            if img_bgr is None:
+                raise ValueError('cv2.imdecode returned None')
+            return cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+        except Exception as e2:
+            logger.exception("read_image_rgb: cv2 fallback also failed: %s", e2)
+            raise
+
+
+# 큰 사진에서 한 번에 디코딩할 수 있는 픽셀 버퍼의 상한 (RGB 바이트)
+MAX_DECODE_BYTES = 512 * 1024 * 1024
+
+
+class ReducedImage(NamedTuple):
+    rgb: np.ndarray  # 긴 변이 max_side 이하인 RGB 대리 이미지
+    width: int       # 원본 크기 (분석 수치는 이 크기의 픽셀 단위)
+    height: int
+
+
+def read_image_reduced(path, max_side: int = 1280, max_bytes: int = MAX_DECODE_BYTES) -> ReducedImage:
+    """Decode an image directly at a reduced size; the full-resolution pixels are never held for JPEGs.
+
+    JPEGs use PIL's draft mode (DCT scaling by 1/2, 1/4 or 1/8 inside the
+    decoder) at the smallest scale that still covers `max_side`; other formats
+    are decoded at full size. The decoded buffer must fit in `max_bytes`,
+    otherwise ValueError is raised before decoding (files PIL cannot open fall
+    back to an unchecked `cv2.imdecode`). The result is then resized
+    so its longer side is at most `max_side`. Normalized landmarks found on the
+    proxy are valid for the original, so measure with `width`/`height`.
+    """
+    from PIL import Image
+    import cv2
+
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            if img.format == "JPEG" and max_side and max(width, height) > max_side:
+                scale = max_side / float(max(width, height))
+                img.draft("RGB", (max(1, math.ceil(width * scale)), max(1, math.ceil(height * scale))))
+            dw, dh = img.size
+            if dw * dh * 3 > max_bytes:
+                raise ValueError(f"image {width}x{height} needs {dw * dh * 3 / 2**20:.0f} MB to decode "
+                                 f"(limit {max_bytes / 2**20:.0f} MB)")
+            # asarray 는 PIL 의 바이트를 그대로 감싸므로 (읽기 전용) 복사는 아래 축소/복사 한 번뿐입니다.
+            rgb = np.asarray(img if img.mode == "RGB" else img.convert("RGB"))
+    except ValueError:
+        raise
+    except Exception as e:
+        # PIL이 열지 못하는 형식: OpenCV로 한 번만 디코딩 (유니코드 경로 대비 fromfile+imdecode)
+        logger.info("read_image_reduced: PIL failed (%s), using cv2.imdecode", e)
+        bgr = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if bgr is None:
+            raise ValueError(f"cannot decode image {path}")
+        height, width = bgr.shape[:2]
+        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=bgr)
+    h, w = rgb.shape[:2]
+    if max_side and max(h, w) > max_side:
+        s = max_side / float(max(h, w))
+        rgb = cv2.resize(rgb, (max(1, int(round(w * s))), max(1, int(round(h * s)))), interpolation=cv2.INTER_AREA)
+    elif not rgb.flags.writeable:
+        rgb = rgb.copy()  # 미리보기에 그림을 그리므로 쓰기 가능한 배열로
+    return ReducedImage(rgb, width, height)
+
+# --- 2. 관상 분석 함수 ---
+# MediaPipe Face Mesh는 기본 468개(0-467) 랜드마크를 제공합니다.
+# `refine_landmarks=True` 설정 시 눈 관련 추가 랜드마크(홍채 등)로 총 478개가 될 수 있습니다.
+# 주요 특징점 인덱스 (MediaPipe Face Mesh 기준, 대략적인 위치)
+LEFT_EYE_INNER = 33
+LEFT_EYE_OUTER = 133
+NOSE_TIP = 1
+MOUTH_UPPER = 13
+MOUTH_LOWER = 14
+CHIN_CENTER = 199
+
+# 분석에 쓰는 거리 측정 쌍 (인중, 입술 두께, 눈 폭) — 한 번에 gather 합니다.
+MEASURE_PAIRS = np.array([(NOSE_TIP, MOUTH_UPPER), (MOUTH_UPPER, MOUTH_LOWER),
+                          (LEFT_EYE_INNER, LEFT_EYE_OUTER)], dtype=np.intp)
+# 분류 기준 (픽셀): 인중 길이, 입술 두께, 눈 폭 — MEASURE_PAIRS 순서와 같습니다.
+FEATURE_THRESHOLDS = (30, 15, 60)
+MAX_LANDMARKS = 478
+LANDMARK_COLOR = (0, 255, 0)
+# cv2.circle(radius=1, filled)과 같은 모양의 3x3 십자 스텐실
+_DOT_STENCIL = np.array([(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)], dtype=np.int32)
+_XYZ = operator.attrgetter("x", "y", "z")
+
+
+def landmarks_to_array(landmarks, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+    """Convert a NormalizedLandmarkList into an (N, 3) float32 array of normalized x, y, z.
+
+    Pass a preallocated `out` (at least N rows) to reuse memory across frames;
+    the returned array is a view of its first N rows. ndarray input (e.g. replayed
+    landmarks) is copied into `out` when given, otherwise returned as is.
+    """
+    if landmarks is None:
+        return None
+    if isinstance(landmarks, np.ndarray):
+        if out is None or out.shape[0] < landmarks.shape[0]:
+            return landmarks
+        view = out[:landmarks.shape[0]]
+        view[:] = landmarks
+        return view
+    lm_list = landmarks.landmark
+    n = len(lm_list)
+    if out is None or out.shape[0] < n:
+        out = np.empty((max(n, MAX_LANDMARKS), 3), dtype=np.float32)
+    view = out[:n]
+    # 좌표 튜플 목록을 만들지 않고 한 번에 읽어 들입니다 (임시 배열 하나).
+    view[:] = np.fromiter(itertools.chain.from_iterable(map(_XYZ, lm_list)), dtype=np.float32,
+                          count=3 * n).reshape(n, 3)
+    return view
+
+
+def landmarks_to_pixels(arr: np.ndarray, width: int, height: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Scale normalized (N, 3) landmarks to (N, 2) int32 pixel coordinates (truncated like int())."""
+    if out is None or out.shape[0] < arr.shape[0]:
+        out = np.empty((arr.shape[0], 2), dtype=np.int32)
+    view = out[:arr.shape[0]]
+    np.multiply(arr[:, :2], (width, height), out=view, dtype=np.float64, casting="unsafe")
+    return view
+
+
+def draw_landmark_points(image: np.ndarray, pixels: np.ndarray, color=LANDMARK_COLOR) -> None:
+    """Draw every landmark as a small dot with one fancy-indexing write instead of N cv2.circle calls."""
+    h, w = image.shape[:2]
+    pts = (pixels[:, None, :] + _DOT_STENCIL[None, :, :]).reshape(-1, 2)
+    keep = (pts[:, 0] >= 0) & (pts[:, 0] < w) & (pts[:, 1] >= 0) & (pts[:, 1] < h)
+    pts = pts[keep]
+    image[pts[:, 1], pts[:, 0]] = color
+
+
+def get_landmark_coords(landmarks, index, width, height):
+    """MediaPipe 랜드마크 객체(또는 (N, 3) 배열)에서 픽셀 좌표를 계산합니다."""
+    # 랜드마크 좌표는 0.0에서 1.0 사이의 정규화된 값입니다.
+    try:
+        if landmarks is None or (not isinstance(landmarks, np.ndarray) and not landmarks):
+            return None
+        n = len(landmarks) if isinstance(landmarks, np.ndarray) else len(landmarks.landmark)
+        if index < 0 or index >= n:
+            logger.debug("get_landmark_coords: index %s out of range (len=%s)", index, n)
+            return None
+        if isinstance(landmarks, np.ndarray):
+            lm_x, lm_y = float(landmarks[index, 0]), float(landmarks[index, 1])
+        else:
+            lm = landmarks.landmark[index]
+            lm_x, lm_y = lm.x, lm.y
+        x = int(lm_x * width)
+        y = int(lm_y * height)
+        return x, y
+    except Exception as e:
+        logger.exception("get_landmark_coords error: %s", e)
+        return None
+
+def calculate_distance(p1_x, p1_y, p2_x, p2_y):
+    """두 점 사이의 유클리드 거리를 계산합니다."""
+    return math.sqrt((p1_x - p2_x)**2 + (p1_y - p2_y)**2)
+
+def measure_faces(batch: np.ndarray, frame_width, frame_height) -> np.ndarray:
+    """Pixel distances (philtrum, lip thickness, eye width) for an (F, N, 3) batch -> (F, 3)."""
+    # int() 와 같은 방식으로 픽셀 좌표를 자른 뒤 거리를 계산합니다.
+    pts = np.trunc(batch[:, MEASURE_PAIRS, :2] * np.array((frame_width, frame_height), dtype=np.float64))
+    d = pts[:, :, 0] - pts[:, :, 1]
+    return np.hypot(d[..., 0], d[..., 1])
+
+
+def format_analysis(philtrum_length, lip_thickness, eye_width, classes=None) -> str:
+    """측정값으로 관상 분석 문자열을 만듭니다.
+    `classes`를 주면 (기준 초과 여부 3개) 임계값 비교 대신 그 분류를 사용합니다 (metrics 의 히스테리시스).
+    """
+    if classes is None:
+        classes = (philtrum_length > FEATURE_THRESHOLDS[0], lip_thickness > FEATURE_THRESHOLDS[1],
+                   eye_width > FEATURE_THRESHOLDS[2])
+    long_philtrum, thick_lips, wide_eyes = classes
+    analysis_results = []
+
+    # 1. 인중 길이 (코 끝 ~ 윗입술)
+    analysis_results.append(f"🗣️ 인중 길이 (추정): {int(philtrum_length)} 픽셀")
+    if long_philtrum:
+        analysis_results.append(" - 인중이 길어 건강하고 안정적인 삶을 추구할 수 있습니다.")
+    else:
+        analysis_results.append(" - 인중이 보통이어서 솔직하고 활동적인 성향이 있을 수 있습니다.")
+
+    # 2. 입술 두께 (윗입술 중앙 ~ 아랫입술 중앙)
+    analysis_results.append(f"👄 입술 두께 (추정): {int(lip_thickness)} 픽셀")
+    if thick_lips:
+        analysis_results.append(" - 입술이 도톰하여 인정이 많고 식복이 있을 수 있습니다.")
+    else:
+        analysis_results.append(" - 입술이 얇거나 보통이어서 이성적이고 섬세한 경향이 있을 수 있습니다.")
+
+    # 3. 눈의 폭 (왼쪽 눈 안쪽 끝 ~ 바깥쪽 끝)
+    analysis_results.append(f"👁️ 눈 폭 (추정): {int(eye_width)} 픽셀")
+    if wide_eyes:
+        analysis_results.append(" - 눈이 커서 감정 표현이 풍부하고 호기심이 많을 수 있습니다.")
+    else:
+        analysis_results.append(" - 눈이 작거나 보통이어서 신중하고 집중력이 강할 수 있습니다.")
+    
+    # 최종 결과 반환
+    return "✅ 관상 분석 결과 (MediaPipe 예시):\n" + "\n".join(analysis_results)
+
+
+def analyze_physiognomy_mp(landmarks, frame_width, frame_height):
+    """
+    MediaPipe Face Mesh 랜드마크를 기반으로 관상 정보를 분석하고 문자열을 반환합니다.
+    `landmarks`는 NormalizedLandmarkList 또는 `landmarks_to_array`의 (N, 3) 배열입니다.
+    """
+    arr = landmarks_to_array(landmarks)
+    # 기본 468개 이상의 랜드마크가 있어야 정상 처리합니다.
+    # (refine_landmarks=True일 때는 478개가 될 수 있으므로 엄격한 등호 검사는 제거)
+    if arr is None or arr.shape[0] < 468:
+        logger.debug("analyze_physiognomy_mp: insufficient landmarks (%s)",
+                     0 if arr is None else arr.shape[0])
+        return "얼굴 랜드마크를 찾지 못했습니다."
+    return format_analysis(*measure_faces(arr[None], frame_width, frame_height)[0].tolist())
+
+
+def analyze_faces(batch: np.ndarray, frame_width, frame_height) -> List[str]:
+    """Analyze every face of an (F, N, 3) batch with one vectorized measurement pass."""
+    if batch is None or batch.shape[0] == 0:
+        return []
+    if batch.shape[1] < 468:
+        return ["얼굴 랜드마크를 찾지 못했습니다."] * batch.shape[0]
+    return [format_analysis(*row) for row in measure_faces(batch, frame_width, frame_height).tolist()]
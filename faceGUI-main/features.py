@@ -0,0 +1,134 @@
+"""
+Declarative, scale-invariant landmark features.
+
+Each entry of `FEATURE_TABLE` names a distance between two landmarks or an
+angle at the middle landmark of a triple (MediaPipe Face Mesh indices).
+Distances are divided by the inter-ocular distance (between the two eye
+centres), so they do not depend on how far the person sits from the camera
+or on the frame resolution; angles are in degrees. `FeatureEngine.compute`
+evaluates the whole table in one gather over the landmark array, for one
+face (N, 3), a batch (F, N, 3) or a sequence of batches (T, F, N, 3), so
+adding rows to the table adds no Python work per frame.
+
+    engine = FeatureEngine()
+    feats = engine.compute(batch, width, height)   # (F, len(engine.names))
+    engine.as_dicts(feats)                         # [{"philtrum": 0.41, ...}, ...]
+"""
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+
+class Feature(NamedTuple):
+    name: str
+    indices: Tuple[int, ...]  # 2개 = 거리, 3개 = 가운데 점에서의 각도
+    label: str = ""
+
+
+# 눈 중심 = 양 눈꼬리의 중점 (refine_landmarks 없이도 있는 468개 안의 점만 사용)
+LEFT_EYE_CORNERS = (33, 133)
+RIGHT_EYE_CORNERS = (362, 263)
+
+FEATURE_TABLE: Tuple[Feature, ...] = (
+    # 기존 분석 항목 (face_analysis.MEASURE_PAIRS 와 같은 쌍)
+    Feature("philtrum", (1, 13), "인중 길이"),
+    Feature("lip_thickness", (13, 14), "입술 두께"),
+    Feature("eye_width", (33, 133), "눈 폭"),
+    # 눈
+    Feature("eye_width_right", (362, 263), "오른쪽 눈 폭"),
+    Feature("eye_height_left", (159, 145), "왼쪽 눈 높이"),
+    Feature("eye_height_right", (386, 374), "오른쪽 눈 높이"),
+    Feature("inner_canthal", (133, 362), "눈 사이 거리"),
+    Feature("outer_canthal", (33, 263), "양 눈꼬리 거리"),
+    # 눈썹
+    Feature("brow_eye_left", (105, 159), "왼쪽 눈썹-눈 거리"),
+    Feature("brow_eye_right", (334, 386), "오른쪽 눈썹-눈 거리"),
+    Feature("brow_gap", (107, 336), "미간"),
+    # 코
+    Feature("nose_length", (168, 1), "코 길이"),
+    Feature("nose_width", (98, 327), "코 폭"),
+    Feature("nose_to_chin", (1, 152), "코끝-턱 거리"),
+    # 입
+    Feature("mouth_width", (61, 291), "입 폭"),
+    Feature("upper_lip", (0, 13), "윗입술 두께"),
+    Feature("lower_lip", (14, 17), "아랫입술 두께"),
+    Feature("mouth_to_chin", (17, 152), "입-턱 거리"),
+    # 얼굴 윤곽
+    Feature("face_width", (234, 454), "얼굴 폭"),
+    Feature("face_height", (10, 152), "얼굴 길이"),
+    Feature("forehead", (10, 168), "이마 높이"),
+    Feature("jaw_width", (172, 397), "턱 폭"),
+    Feature("cheek_width", (123, 352), "광대 폭"),
+    # 각도 (도)
+    Feature("jaw_angle", (172, 152, 397), "턱 각도"),
+    Feature("nose_tip_angle", (98, 1, 327), "코끝 각도"),
+    Feature("mouth_corner_angle", (61, 14, 291), "입꼬리 각도"),
+    Feature("brow_arch_left", (46, 105, 107), "왼쪽 눈썹 아치"),
+    Feature("brow_arch_right", (276, 334, 336), "오른쪽 눈썹 아치"),
+)
+
+
+class FeatureEngine:
+    """Evaluates a feature table in one vectorized pass."""
+
+    def __init__(self, table: Sequence[Feature] = FEATURE_TABLE, normalize: bool = True):
+        dists = [f for f in table if len(f.indices) == 2]
+        angles = [f for f in table if len(f.indices) == 3]
+        if len(dists) + len(angles) != len(table):
+            raise ValueError("feature indices must be pairs (distance) or triples (angle)")
+        # 출력 순서: 거리 다음 각도 (테이블 순서는 각 그룹 안에서 유지)
+        self.features = tuple(dists + angles)
+        self.names: List[str] = [f.name for f in self.features]
+        self.normalize = normalize
+        self._pairs = np.array([f.indices for f in dists], dtype=np.intp).reshape(-1, 2)
+        self._triples = np.array([f.indices for f in angles], dtype=np.intp).reshape(-1, 3)
+        self._eyes = np.array([LEFT_EYE_CORNERS, RIGHT_EYE_CORNERS], dtype=np.intp)
+        used = np.concatenate([self._pairs.ravel(), self._triples.ravel(), self._eyes.ravel()])
+        self.min_landmarks = int(used.max()) + 1 if used.size else 0
+
+    def compute(self, landmarks: np.ndarray, width: float = 1.0, height: float = 1.0) -> np.ndarray:
+        """(..., N, 3) normalized landmarks -> (..., n_features) float32.
+
+        `width`/`height` only fix the aspect ratio of the normalized x/y
+        coordinates; with `normalize=False` distances are in pixels.
+        """
+        arr = np.asarray(landmarks)
+        if arr.shape[-2] < self.min_landmarks:
+            raise ValueError(f"need at least {self.min_landmarks} landmarks, got {arr.shape[-2]}")
+        scale = np.array((width, height), dtype=np.float32)
+        lead = arr.shape[:-2]
+        out = np.empty(lead + (len(self.features),), dtype=np.float32)
+        k = self._pairs.shape[0]
+
+        if k:
+            p = arr[..., self._pairs, :2] * scale               # (..., K, 2, 2)
+            d = p[..., 0, :] - p[..., 1, :]
+            out[..., :k] = np.sqrt(np.einsum("...ij,...ij->...i", d, d))
+            if self.normalize:
+                e = arr[..., self._eyes, :2].mean(axis=-2) * scale  # (..., 2, 2) 두 눈 중심
+                iod = np.linalg.norm(e[..., 0, :] - e[..., 1, :], axis=-1)
+                out[..., :k] /= np.maximum(iod, 1e-6)[..., None]
+        if self._triples.shape[0]:
+            t = arr[..., self._triples, :2] * scale             # (..., M, 3, 2)
+            u = t[..., 0, :] - t[..., 1, :]
+            v = t[..., 2, :] - t[..., 1, :]
+            cos = np.einsum("...ij,...ij->...i", u, v) / np.maximum(
+                np.linalg.norm(u, axis=-1) * np.linalg.norm(v, axis=-1), 1e-12)
+            out[..., k:] = np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+        return out
+
+    def as_dicts(self, values: np.ndarray, ndigits: int = 4) -> List[Dict[str, float]]:
+        """(F, n_features) -> one {name: value} dict per face (for JSON output)."""
+        rows = np.atleast_2d(values).astype(np.float64).round(ndigits).tolist()
+        return [dict(zip(self.names, row)) for row in rows]
+
+
+_default_engine = None
+
+
+def default_engine() -> FeatureEngine:
+    """Shared engine for `FEATURE_TABLE` (index arrays are built once)."""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = FeatureEngine()
+    return _default_engine
@@ -0,0 +1,631 @@
+"""
+Frame sources for the GUI, headless scripts, benchmarks and batch tools.
+
+Every source follows the small subset of the `cv2.VideoCapture` interface the
+rest of the code uses (`isOpened`, `read`, `release`, `set`, `get`), so a
+source can be handed to `FramePipeline.set_capture` in place of a capture
+device. `read(out)` fills a caller-provided array when its shape matches,
+instead of allocating a new frame.
+
+Backends: `CameraSource` (local webcam, tries the Windows backends too),
+`VideoFileSource`, `ImageSequenceSource`, `StreamSource` (RTSP/HTTP/UDP via
+FFmpeg) and `SyntheticSource` (seeded frames for tests and benchmarks).
+`ThreadedSource` wraps any of them with a reader thread that decodes into a
+ring of preallocated buffers; `read()` then returns the newest frame without
+copying it. `PacedSource` plays a file at its own frame rate, so a video can
+stand in for a live camera. `open_source(spec)` picks the backend from a string.
+"""
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger("face01")
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".webp", ".tif", ".tiff")
+STREAM_SCHEMES = ("rtsp://", "rtsps://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+CAMERA_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".face01_cache", "cameras.json")
+
+
+class FrameSource:
+    """Base class: a `cv2.VideoCapture`-compatible source of BGR frames."""
+
+    name = "source"
+
+    def isOpened(self) -> bool:
+        return False
+
+    def read(self, out: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """Next frame as (ok, bgr). Fills `out` in place when its shape and dtype match."""
+        return False, None
+
+    def release(self) -> None:
+        pass
+
+    def set(self, prop: int, value) -> bool:
+        return False
+
+    def get(self, prop: int) -> float:
+        return 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+
+def _into(out: Optional[np.ndarray], frame: np.ndarray) -> np.ndarray:
+    """Copy `frame` into `out` if compatible, otherwise return a fresh copy."""
+    if out is not None and out.shape == frame.shape and out.dtype == frame.dtype:
+        np.copyto(out, frame)
+        return out
+    return frame.copy()
+
+
+# --- cv2.VideoCapture backends ------------------------------------------
+
+class CaptureSource(FrameSource):
+    """Thin wrapper over a `cv2.VideoCapture`; `read(out)` decodes into `out` directly."""
+
+    def __init__(self, cap: Optional[cv2.VideoCapture], name: str = "capture"):
+        self.cap = cap
+        self.name = name
+
+    def isOpened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def read(self, out=None):
+        if self.cap is None:
+            return False, None
+        return self.cap.read(out) if out is not None else self.cap.read()
+
+    def grab(self) -> bool:
+        return self.cap is not None and self.cap.grab()
+
+    def retrieve(self, out=None):
+        if self.cap is None:
+            return False, None
+        return self.cap.retrieve(out) if out is not None else self.cap.retrieve()
+
+    def release(self) -> None:
+        if self.cap is not None:
+            try:
+                self.cap.release()
+            except Exception:
+                pass
+
+    def set(self, prop, value) -> bool:
+        return self.cap is not None and self.cap.set(prop, value)
+
+    def get(self, prop) -> float:
+        return self.cap.get(prop) if self.cap is not None else 0.0
+
+
+def try_open_camera(index: int = 0) -> Tuple[Optional[cv2.VideoCapture], str]:
+    """Try opening camera using several backends. Returns (cap, description).
+    If none succeed, returns (None, last_description).
+    """
+    backends = [None]
+    # Try common Windows backends if available
+    try:
+        backends.append(cv2.CAP_DSHOW)
+    except Exception:
+        pass
+    try:
+        backends.append(cv2.CAP_MSMF)
+    except Exception:
+        pass
+    last_desc = "none"
+    for b in backends:
+        try:
+            if b is None:
+                cap = cv2.VideoCapture(index)
+                desc = f"index={index} (default)"
+            else:
+                cap = cv2.VideoCapture(index, b)
+                desc = f"index={index} backend={b}"
+            ok = cap.isOpened()
+            logger.debug("try_open_camera: tried %s -> isOpened=%s", desc, ok)
+            if ok:
+                return cap, desc
+            else:
+                try:
+                    cap.release()
+                except Exception:
+                    pass
+            last_desc = desc
+        except Exception as e:
+            logger.exception("try_open_camera exception for backend %s: %s", b, e)
+    return None, last_desc
+
+
+def list_available_cameras(max_index: int = 5):
+    """Return a list of camera indices that can be opened."""
+    available = []
+    for i in range(0, max_index + 1):
+        try:
+            cap = None
+            if hasattr(cv2, 'CAP_DSHOW'):
+                cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)
+            else:
+                cap = cv2.VideoCapture(i)
+            ok = cap.isOpened()
+            if ok:
+                available.append(i)
+            try:
+                cap.release()
+            except Exception:
+                pass
+        except Exception:
+            pass
+    logger.debug("list_available_cameras -> %s", available)
+    return available
+
+
+def camera_backends() -> list:
+    """Backends worth probing here, in order of preference (CAP_ANY = OpenCV's default)."""
+    backends = [cv2.CAP_ANY]
+    for name in ("CAP_DSHOW", "CAP_MSMF"):
+        if hasattr(cv2, name):
+            backends.append(getattr(cv2, name))
+    return backends
+
+
+def _probe_camera(index: int, backend: int) -> bool:
+    cap = cv2.VideoCapture(index, backend)
+    try:
+        return cap.isOpened()
+    finally:
+        try:
+            cap.release()
+        except Exception:
+            pass
+
+
+def discover_cameras(max_index: int = 5, backends: Optional[Iterable[int]] = None, timeout: float = 3.0,
+                     known: Optional[Dict[int, int]] = None) -> Dict[int, int]:
+    """Probe every (index, backend) pair in parallel; returns {index: first working backend}.
+
+    Each probe runs on its own daemon thread, so a driver that hangs is simply
+    abandoned after `timeout` seconds instead of blocking the caller. Indices in
+    `known` (e.g. a camera that is already open and would fail a second open)
+    are reported as is without probing.
+    """
+    backends = list(backends) if backends is not None else camera_backends()
+    known = dict(known or {})
+    results = {}
+    lock = threading.Lock()
+
+    def probe(index, backend):
+        try:
+            ok = _probe_camera(index, backend)
+        except Exception as e:
+            logger.debug("discover_cameras: index=%s backend=%s raised %s", index, backend, e)
+            ok = False
+        with lock:
+            results[(index, backend)] = ok
+
+    threads = []
+    for index in range(0, max_index + 1):
+        if index in known:
+            continue
+        for backend in backends:
+            t = threading.Thread(target=probe, args=(index, backend), name="face01-camprobe", daemon=True)
+            t.start()
+            threads.append(t)
+    deadline = time.monotonic() + timeout
+    for t in threads:
+        t.join(max(0.0, deadline - time.monotonic()))
+
+    found = dict(known)
+    with lock:
+        for index in range(0, max_index + 1):
+            if index in found:
+                continue
+            for backend in backends:
+                if results.get((index, backend)):
+                    found[index] = backend
+                    break
+    timed_out = sum(t.is_alive() for t in threads)
+    logger.debug("discover_cameras -> %s (%s probes, %s timed out)", found, len(threads), timed_out)
+    return dict(sorted(found.items()))
+
+
+def _camera_cache_key() -> str:
+    import platform
+    return f"{platform.system()}-{platform.node()}-cv2-{cv2.__version__}"
+
+
+def load_camera_cache(path: str = CAMERA_CACHE_PATH) -> Optional[Dict[int, int]]:
+    """Cameras found on a previous run on this machine ({index: backend}), or None."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("key") != _camera_cache_key():
+            return None
+        return {int(k): int(v) for k, v in data["cameras"].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_camera_cache(cameras: Dict[int, int], path: str = CAMERA_CACHE_PATH) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": _camera_cache_key(), "saved": time.time(),
+                       "cameras": {str(k): v for k, v in cameras.items()}}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("save_camera_cache: cannot write %s: %s", path, e)
+
+
+class CameraSource(CaptureSource):
+    """Local webcam. With a known `backend` (e.g. from the discovery cache) only that
+    backend is tried first; otherwise `try_open_camera` tries default, DirectShow and MSMF."""
+
+    def __init__(self, index: int = 0, width: Optional[int] = None, height: Optional[int] = None,
+                 backend: Optional[int] = None):
+        cap, desc = None, "none"
+        if backend is not None:
+            cap = cv2.VideoCapture(index, backend)
+            desc = f"index={index} backend={backend}"
+            if not cap.isOpened():
+                logger.debug("CameraSource: cached backend failed for %s, trying all", desc)
+                cap.release()
+                cap = None
+        if cap is None:
+            cap, desc = try_open_camera(index)
+        super().__init__(cap, name=f"camera {desc}")
+        self.index = index
+        self.description = desc
+        if self.isOpened():
+            try:
+                if width:
+                    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+                if height:
+                    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            except Exception:
+                pass
+
+
+class VideoFileSource(CaptureSource):
+    """Frames of a video file; with `loop=True` it rewinds at the end."""
+
+    def __init__(self, path: str, loop: bool = False):
+        super().__init__(cv2.VideoCapture(str(path)), name=str(path))
+        self.path = str(path)
+        self.loop = loop
+
+    @property
+    def frame_count(self) -> int:
+        return int(self.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+
+    def seek(self, frame_idx: int) -> None:
+        self.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+
+    def read(self, out=None):
+        ret, frame = super().read(out)
+        if not ret and self.loop:
+            self.seek(0)
+            ret, frame = super().read(out)
+        return ret, frame
+
+
+class StreamSource(CaptureSource):
+    """RTSP / HTTP / UDP stream through FFmpeg; reopens the stream after read failures.
+
+    `isOpened()` is the capture's own state until the first frame arrives, so
+    an unreachable URL reports as not opened. After that a dropped stream
+    still counts as open while `read()` keeps reconnecting.
+    """
+
+    def __init__(self, url: str, reconnect_delay: float = 1.0):
+        super().__init__(None, name=url)
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self._next_reconnect = 0.0
+        self._streaming = False   # 프레임을 한 번이라도 받았는지
+        self._open()
+
+    def _open(self) -> None:
+        self.release()
+        try:
+            self.cap = cv2.VideoCapture(self.url, cv2.CAP_FFMPEG)
+            # 네트워크 스트림은 버퍼가 쌓이면 지연이 커지므로 최소로 둡니다 (지원하는 백엔드만).
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        except Exception as e:
+            logger.warning("StreamSource: cannot open %s: %s", self.url, e)
+            self.cap = None
+
+    def isOpened(self) -> bool:
+        # 한 번 연결된 뒤의 일시적인 끊김은 열린 것으로 보고 read()에서 재연결합니다.
+        return self._streaming or super().isOpened()
+
+    def read(self, out=None):
+        if super().isOpened():
+            ret, frame = super().read(out)
+            if ret:
+                self._streaming = True
+                return ret, frame
+        now = time.monotonic()
+        if now >= self._next_reconnect:
+            self._next_reconnect = now + self.reconnect_delay
+            logger.info("StreamSource: reconnecting %s", self.url)
+            self._open()
+        return False, None
+
+
+# --- file / synthetic backends --------------------------------------------
+
+class ImageSequenceSource(FrameSource):
+    """Still images as frames, in order; `preload=True` decodes them all once up front."""
+
+    def __init__(self, paths, loop: bool = True, preload: bool = False):
+        self.paths = [str(p) for p in paths]
+        self.loop = loop
+        self.name = f"{len(self.paths)} images"
+        self._i = 0
+        self._frames = [self._decode(p) for p in self.paths] if preload else None
+
+    @staticmethod
+    def _decode(path: str) -> Optional[np.ndarray]:
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is None:
+            # 비 ASCII 경로 등 imread가 실패하는 경우
+            from face_analysis import read_image_rgb
+            frame = np.ascontiguousarray(read_image_rgb(path)[:, :, ::-1])
+        return frame
+
+    def isOpened(self) -> bool:
+        return bool(self.paths) and (self.loop or self._i < len(self.paths))
+
+    def read(self, out=None):
+        if not self.isOpened():
+            return False, None
+        k = self._i % len(self.paths)
+        self._i += 1
+        if self._frames is not None:
+            return True, _into(out, self._frames[k])
+        try:
+            frame = self._decode(self.paths[k])
+        except Exception as e:
+            logger.warning("ImageSequenceSource: cannot read %s: %s", self.paths[k], e)
+            return False, None
+        if out is not None and out.shape == frame.shape:
+            np.copyto(out, frame)
+            return True, out
+        return True, frame
+
+
+class SyntheticSource(FrameSource):
+    """Seeded noise frames with a moving bright ellipse; identical on every machine."""
+
+    def __init__(self, width: int = 640, height: int = 480, seed: int = 0, period: int = 60):
+        rng = np.random.default_rng(seed)
+        self.name = f"synthetic {width}x{height}"
+        self.frames = []
+        for i in range(period):
+            frame = rng.integers(0, 64, size=(height, width, 3), dtype=np.uint8)
+            cx = int(width * (0.3 + 0.4 * i / period))
+            cv2.ellipse(frame, (cx, height // 2), (width // 8, height // 5), 0, 0, 360, (180, 190, 220), -1)
+            self.frames.append(frame)
+        self._i = 0
+
+    def isOpened(self) -> bool:
+        return True
+
+    def read(self, out=None):
+        frame = self.frames[self._i % len(self.frames)]
+        self._i += 1
+        return True, _into(out, frame)
+
+
+class PacedSource(FrameSource):
+    """Deliver frames of `source` no faster than `fps` (real-time playback of files)."""
+
+    def __init__(self, source: FrameSource, fps: Optional[float] = None):
+        self.source = source
+        self.name = f"paced {source.name}"
+        self.fps = fps or source.get(cv2.CAP_PROP_FPS) or 30.0
+        self._next = None
+
+    def isOpened(self) -> bool:
+        return self.source.isOpened()
+
+    def read(self, out=None):
+        now = time.perf_counter()
+        if self._next is not None and now < self._next:
+            time.sleep(self._next - now)
+            now = self._next
+        # 늦어진 만큼을 몰아서 따라잡지 않도록 다음 시각은 현재 기준으로 잡습니다.
+        self._next = max(now, self._next or now) + 1.0 / self.fps
+        return self.source.read(out)
+
+    def release(self) -> None:
+        self.source.release()
+
+    def set(self, prop, value) -> bool:
+        return self.source.set(prop, value)
+
+    def get(self, prop) -> float:
+        return self.source.get(prop)
+
+
+# --- threaded reader -----------------------------------------------------
+
+class ThreadedSource(FrameSource):
+    """Read `source` on a dedicated thread into a ring of preallocated buffers.
+
+    `read()` returns the newest frame that has not been returned yet, as a view
+    of a ring buffer (no copy). The buffer stays untouched until the following
+    `read()` call, so process or copy it before asking for the next frame.
+    Frames the consumer was too slow to take are overwritten and counted in
+    `dropped` (latest-frame-wins, like the pipeline queues).
+
+    With `poll_interval > 0` (idle mode) only one frame per interval is
+    decoded; sources with `grab()` keep grabbing in between so the
+    camera stays streaming and the next frame is fresh.
+    """
+
+    def __init__(self, source: FrameSource, buffers: int = 3):
+        self.source = source
+        self.name = f"threaded {source.name}"
+        self._n = max(3, int(buffers))   # 읽는 중 / 최신 / 사용자가 들고 있는 버퍼
+        self._ring = [None] * self._n
+        self._latest = -1   # 가장 최근에 채워진 슬롯
+        self._held = -1     # 마지막으로 read()가 돌려준 슬롯 (덮어쓰지 않음)
+        self._seq = 0       # 채워진 프레임 수
+        self._returned = 0  # read()가 마지막으로 돌려준 프레임 번호
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self.frames_read = 0
+        self.dropped = 0
+        self.poll_interval = 0.0
+        self._next_poll = 0.0
+        self._thread = threading.Thread(target=self._loop, name="face01-reader", daemon=True)
+        self._thread.start()
+
+    def _next_slot(self) -> int:
+        for k in range(1, self._n + 1):
+            slot = (self._latest + k) % self._n
+            if slot != self._held and slot != self._latest:
+                return slot
+        return 0
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            if not self.source.isOpened():
+                time.sleep(0.05)
+                continue
+            interval = self.poll_interval
+            if interval > 0:
+                wait = self._next_poll - time.perf_counter()
+                if wait > 0:
+                    # 유휴 폴링: 디코딩 없이 grab 만 하거나 잠시 쉬고, 간격이 바뀌면 바로 반영합니다.
+                    grab = getattr(self.source, "grab", None)
+                    if grab is None or not grab():
+                        self._stop.wait(min(wait, 0.05))
+                    continue
+                self._next_poll = time.perf_counter() + interval
+            with self._cond:
+                slot = self._next_slot()
+            buf = self._ring[slot]
+            try:
+                ret, frame = self.source.read(buf)
+            except Exception as e:
+                logger.debug("ThreadedSource: read failed on %s: %s", self.source.name, e)
+                ret, frame = False, None
+            if not ret or frame is None:
+                time.sleep(0.01)
+                continue
+            with self._cond:
+                # 첫 프레임이나 해상도 변경 시에는 소스가 새로 만든 배열을 링 버퍼로 채택합니다.
+                self._ring[slot] = frame
+                if self._seq > self._returned and self._latest >= 0:
+                    self.dropped += 1
+                self._latest = slot
+                self._seq += 1
+                self.frames_read += 1
+                self._cond.notify_all()
+
+    def isOpened(self) -> bool:
+        return not self._stop.is_set() and self.source.isOpened()
+
+    def read(self, out=None, timeout: float = 1.0):
+        """Wait up to `timeout` s for a new frame; returns the ring buffer itself unless `out` is given."""
+        with self._cond:
+            if self._seq <= self._returned:
+                self._cond.wait_for(lambda: self._seq > self._returned or self._stop.is_set(), timeout)
+            if self._seq <= self._returned:
+                return False, None
+            self._returned = self._seq
+            self._held = self._latest
+            frame = self._ring[self._latest]
+        if out is not None:
+            return True, _into(out, frame)
+        return True, frame
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray]]:
+        """(frame number, newest frame) without waiting; the frame is not marked as returned."""
+        with self._cond:
+            return self._seq, (self._ring[self._latest] if self._latest >= 0 else None)
+
+    def release(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self.source.release()
+
+    def set(self, prop, value) -> bool:
+        return self.source.set(prop, value)
+
+    def get(self, prop) -> float:
+        return self.source.get(prop)
+
+
+# --- factory -------------------------------------------------------------
+
+def open_camera(index: int = 0, width: Optional[int] = None, height: Optional[int] = None,
+                threaded: bool = True, backend: Optional[int] = None) -> Tuple[Optional[FrameSource], str]:
+    """Open a webcam; returns (source, description) or (None, description) on failure."""
+    cam = CameraSource(index, width, height, backend=backend)
+    if not cam.isOpened():
+        return None, cam.description
+    return (ThreadedSource(cam) if threaded else cam), cam.description
+
+
+def open_source(spec, threaded: Optional[bool] = None, loop: bool = False, **kwargs) -> FrameSource:
+    """Open a source from a spec string.
+
+    An int or digit string is a camera index; rtsp://, http(s):// and similar
+    URLs are streams; 'synthetic[:WxH]' gives seeded frames; a directory, glob
+    or image file gives an image sequence; anything else is a video file.
+    Cameras and streams get a reader thread by default, files do not (so
+    every frame is delivered, in order). `realtime=True` plays files at their
+    frame rate (`fps=` overrides it), like a camera.
+    """
+    spec_s = str(spec)
+    if isinstance(spec, int) or spec_s.isdigit():
+        source = CameraSource(int(spec_s), kwargs.get("width"), kwargs.get("height"))
+        live = True
+    elif spec_s.lower().startswith(STREAM_SCHEMES):
+        source = StreamSource(spec_s)
+        live = True
+    elif spec_s.startswith("synthetic"):
+        size = spec_s.partition(":")[2] or "640x480"
+        w, h = (int(v) for v in size.lower().split("x"))
+        source = SyntheticSource(w, h)
+        live = False
+    elif os.path.isdir(spec_s):
+        paths = sorted(str(p) for p in Path(spec_s).iterdir() if p.suffix.lower() in IMAGE_EXTS)
+        source = ImageSequenceSource(paths, loop=loop, preload=kwargs.get("preload", False))
+        live = False
+    elif any(c in spec_s for c in "*?["):
+        paths = sorted(p for p in glob.glob(spec_s, recursive=True) if p.lower().endswith(IMAGE_EXTS))
+        source = ImageSequenceSource(paths, loop=loop, preload=kwargs.get("preload", False))
+        live = False
+    elif spec_s.lower().endswith(IMAGE_EXTS):
+        source = ImageSequenceSource([spec_s], loop=loop, preload=kwargs.get("preload", False))
+        live = False
+    else:
+        source = VideoFileSource(spec_s, loop=loop)
+        live = False
+    if kwargs.get("realtime") and not live:
+        source = PacedSource(source, kwargs.get("fps"))
+    if threaded is None:
+        threaded = live
+    return ThreadedSource(source) if threaded else source
@@ -0,0 +1,41 @@
+"""
+Headless test: after warm-up the live preview's frame path creates no frame
+buffers and allocates nothing frame-sized, at two resolutions. No camera,
+display or MediaPipe needed (frames are synthetic and the model is
+`bench_alloc.ArrayMesh`, which hands out reused landmark arrays).
+
+Checked per resolution:
+- no `FrameBufferPool` allocation after warm-up, on the capture path and
+  on the full frame (`_process_packet`: inference, tracking, overlay, analysis),
+- capture -> pooled RGB -> display stays under 1024 bytes per frame
+  (the per-frame `FramePacket` object),
+- the full frame stays under 1% of one BGR frame.
+
+    python headless_test_alloc.py
+"""
+import sys
+
+import bench_alloc
+
+SOURCES = ("synthetic:640x480", "synthetic:1280x720")
+
+
+def main() -> int:
+    failed = 0
+    for source in SOURCES:
+        report = bench_alloc.run(source, frames=120, warmup=30)
+        pooled, full = report["pooled"], report["full_frame"]
+        print(f"{source}: capture path {pooled['max_bytes']} B/frame, full frame {full['max_bytes']} B/frame "
+              f"(frame {report['frame_bytes']} B), buffers created {pooled['buffer_allocations']}"
+              f"/{full['buffer_allocations']}")
+        assert pooled["buffer_allocations"] == 0, pooled
+        assert full["buffer_allocations"] == 0, full
+        for msg in bench_alloc.check(report, max_bytes=1024, max_frame_fraction=0.01):
+            print("FAIL:", msg)
+            failed += 1
+    print("Headless allocation test", "failed." if failed else "passed.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Headless test: `Dashboard` runs several video feeds at once and shares the
+inference threads fairly. No camera, display or MediaPipe needed: short clips
+are written with `cv2.VideoWriter` into a temporary folder and FaceMesh is
+`SyntheticMesh`.
+
+Checked, with the files paced to their frame rate and read as fast as possible:
+- every feed keeps producing analysed frames (its `version` advances between
+  two snapshots and it has inferences and captured frames),
+- the per-feed inference FPS are within `MAX_FPS_SPREAD` of each other,
+- the aggregate FPS and inference count are reported and match the feeds.
+
+    python headless_test_dashboard.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from dashboard import Dashboard
+
+CLIPS = ((320, 240), (320, 240), (640, 480))
+CLIP_FRAMES, CLIP_FPS = 45, 30.0
+SECONDS = 3.0
+MAX_FPS_SPREAD = 1.5   # 가장 빠른 피드 FPS / 가장 느린 피드 FPS
+
+
+def write_clips(directory) -> list:
+    paths = []
+    for i, (w, h) in enumerate(CLIPS):
+        path = os.path.join(directory, f"feed{i}.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), CLIP_FPS, (w, h))
+        if not writer.isOpened():
+            raise SystemExit(f"cannot write {path} (no MJPG encoder in this OpenCV build)")
+        frame = np.empty((h, w, 3), dtype=np.uint8)
+        for n in range(CLIP_FRAMES):
+            frame[:] = (40 + i * 30, 80, 120)
+            cv2.circle(frame, (w // 4 + n * w // (2 * CLIP_FRAMES), h // 2), h // 5, (200, 190, 170), -1)
+            writer.write(frame)
+        writer.release()
+        paths.append(path)
+    return paths
+
+
+def run(paths, realtime: bool) -> list:
+    failures = []
+    mode = "realtime" if realtime else "no-realtime"
+    dashboard = Dashboard(paths, workers=2, synthetic=True, realtime=realtime).start()
+    try:
+        time.sleep(SECONDS / 2)
+        versions = [f.version for f in dashboard.feeds]
+        time.sleep(SECONDS / 2)
+        progressed = [f.version > v for f, v in zip(dashboard.feeds, versions)]
+    finally:
+        dashboard.close()
+    # 추론 스레드가 모두 끝난 뒤에 읽어야 피드별 합계와 전체 합계가 맞습니다.
+    snap = dashboard.snapshot()
+    feeds = snap["feeds"]
+    for f, moved in zip(feeds, progressed):
+        print(f"{mode} {os.path.basename(f['feed'])}: {f['infer_fps']} infer fps, {f['capture_fps']} capture fps, "
+              f"{f['infer_total']} inferences, cpu share {f['cpu_share']}")
+        if not (moved and f["infer_total"] > 0 and f["capture_fps"] > 0):
+            failures.append(f"{mode}: {f['feed']} stopped progressing ({f})")
+    fps = [f["infer_fps"] for f in feeds]
+    if min(fps) <= 0 or max(fps) / min(fps) > MAX_FPS_SPREAD:
+        failures.append(f"{mode}: per-feed inference FPS {fps} differ by more than {MAX_FPS_SPREAD}x")
+    total = sum(f["infer_total"] for f in feeds)
+    print(f"{mode} total: {snap['aggregate_infer_fps']} infer fps, {snap['inferences']} inferences "
+          f"({snap['workers']} workers)")
+    if snap["aggregate_infer_fps"] <= 0 or snap["inferences"] != total:
+        failures.append(f"{mode}: aggregate {snap['aggregate_infer_fps']} fps / {snap['inferences']} inferences "
+                        f"do not match the feeds ({total})")
+    return failures
+
+
+def main() -> int:
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_clips(directory)
+        for realtime in (True, False):
+            failures += run(paths, realtime)
+    for msg in failures:
+        print("FAIL:", msg)
+    print("Headless dashboard test", "failed." if failures else "passed.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
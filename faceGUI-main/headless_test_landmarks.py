@@ -2,19 +2,24 @@
 Headless test: capture a few frames from webcam, run MediaPipe face_mesh.process,
 log detected landmark counts to `face01_debug.log` and print a short status to stdout.
 This script is safe to run non-interactively and exits after a few frames.
+An optional argument selects another frame source (camera index, video, image, RTSP URL):
+    python headless_test_landmarks.py [source]
 """
+import sys
 import time
 import cv2
 import mediapipe as mp
 from pathlib import Path
 
+from frame_sources import open_source
+
 LOG_FILE = Path(__file__).parent / "face01_debug.log"
 print("Writing logs to:", LOG_FILE)
 
 mp_face_mesh = mp.solutions.face_mesh
 with mp_face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=1,
                            min_detection_confidence=0.5, min_tracking_confidence=0.5) as face_mesh:
-    cap = cv2.VideoCapture(0)
+    cap = open_source(sys.argv[1] if len(sys.argv) > 1 else 0)
     if not cap.isOpened():
         print("ERROR: cannot open camera")
         raise SystemExit(1)
@@ -0,0 +1,145 @@
+"""
+Headless test: `PresenceGate` state machine on synthetic frames with a
+scripted clock. No camera, display, MediaPipe or Haar cascade needed: the
+gate gets a stand-in detector (`BrightBlobDetector`) with OpenCV's
+`detectMultiScale` signature, so the detector-confirmed path is exercised
+too, and a second run checks motion-only mode (`detector=False`).
+
+Checked:
+- while searching FaceMesh runs only every `recheck_interval` seconds,
+- after `idle_after` seconds the gate goes idle, asks for `idle_interval`
+  polling and runs FaceMesh only every `idle_recheck_interval` seconds,
+- motion ends idle mode on the first moving frame; with the detector it
+  lets FaceMesh run only if the detector finds a face there,
+- a found face keeps the gate open on every frame (active), losing it
+  goes back to searching.
+
+    python headless_test_presence.py
+"""
+import sys
+
+import cv2
+import numpy as np
+
+from presence import PresenceGate
+
+W, H, FPS = 320, 240, 30.0
+RECHECK, IDLE_RECHECK, IDLE_AFTER, IDLE_INTERVAL = 1.0, 3.0, 5.0, 0.5
+
+
+class Scene:
+    """Static room with sensor noise; `face_x` adds a bright face-sized blob, `blob_x` a dark box."""
+
+    def __init__(self):
+        self.rng = np.random.default_rng(0)
+        y, x = np.mgrid[0:H, 0:W]
+        self.room = np.dstack([60 + x * 80 // W, 70 + y * 60 // H, 90 + (x + y) * 40 // (W + H)]).astype(np.uint8)
+
+    def frame(self, face_x=None, blob_x=None) -> np.ndarray:
+        rgb = cv2.add(self.room, self.rng.integers(0, 4, self.room.shape, dtype=np.uint8))
+        if face_x is not None:
+            cv2.ellipse(rgb, (int(face_x), H // 2), (W // 8, H // 5), 0, 0, 360, (255, 255, 255), -1)
+        if blob_x is not None:
+            cv2.rectangle(rgb, (int(blob_x), H // 4), (int(blob_x) + W // 5, H - 20), (10, 10, 10), -1)
+        return rgb
+
+
+class BrightBlobDetector:
+    """`detectMultiScale` stand-in: a "face" is a large patch of near-white pixels on the thumbnail."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def detectMultiScale(self, gray, **kwargs):
+        self.calls += 1
+        if np.count_nonzero(gray >= 240) > gray.size // 50:
+            return [(0, 0, gray.shape[1], gray.shape[0])]
+        return ()
+
+
+def run(gate, scene, start, seconds, step, found=False, **draw):
+    """Feed frames every `step` s; returns (times FaceMesh was allowed, last t). Moving draws slide by 4 px."""
+    allowed = []
+    n = int(round(seconds / step))
+    for i in range(n):
+        t = start + i * step
+        args = {k: v + 4 * i for k, v in draw.items()}
+        if gate.check(scene.frame(**args), t):
+            allowed.append(round(t, 3))
+            gate.observe(found, t)
+    return allowed, start + n * step
+
+
+def expect(failures, cond, msg):
+    print(("ok   " if cond else "FAIL ") + msg)
+    if not cond:
+        failures.append(msg)
+
+
+def test_detector(failures):
+    scene, det = Scene(), BrightBlobDetector()
+    gate = PresenceGate(recheck_interval=RECHECK, idle_recheck_interval=IDLE_RECHECK, idle_after=IDLE_AFTER,
+                        idle_interval=IDLE_INTERVAL, detector=det)
+    expect(failures, gate.snapshot()["detector"], "injected detector is used")
+
+    # 빈 방: 1초마다 한 번만 FaceMesh
+    allowed, t = run(gate, scene, 0.0, 4.9, 1 / FPS)
+    expect(failures, len(allowed) == 5 and all(b - a >= RECHECK - 1e-6 for a, b in zip(allowed, allowed[1:])),
+           f"searching: FaceMesh every {RECHECK:.0f} s on an empty scene {allowed}")
+    expect(failures, gate.state == "searching" and gate.poll_interval == 0.0, "searching: every frame is polled")
+
+    # idle_after 가 지나면 대기 상태
+    allowed, t = run(gate, scene, t, 0.3, 1 / FPS)
+    expect(failures, gate.idle and gate.poll_interval == IDLE_INTERVAL,
+           f"idle after {IDLE_AFTER:.0f} s without motion, polling every {IDLE_INTERVAL} s ({gate.snapshot()})")
+    allowed, t = run(gate, scene, t, 9.0, IDLE_INTERVAL)
+    gaps = [b - a for a, b in zip(allowed, allowed[1:])]
+    expect(failures, gate.idle and len(allowed) >= 2 and all(g >= IDLE_RECHECK - 1e-6 for g in gaps)
+           and all(g <= IDLE_RECHECK + IDLE_INTERVAL + 1e-6 for g in gaps),
+           f"idle: FaceMesh every {IDLE_RECHECK:.0f} s {allowed}")
+
+    # 얼굴 없는 움직임: 대기 해제, 검출기가 얼굴을 찾지 못하면 FaceMesh 생략
+    calls = det.calls
+    allowed, t2 = run(gate, scene, t, IDLE_INTERVAL, IDLE_INTERVAL, blob_x=40)
+    expect(failures, not gate.idle and gate.poll_interval == 0.0, "motion wakes the gate on the first polled frame")
+    allowed, t = run(gate, scene, t2, 0.5, 1 / FPS, blob_x=44)
+    expect(failures, det.calls - calls == 16 and len(allowed) <= 1,
+           f"motion without a face: detector ran {det.calls - calls}x, FaceMesh only on the recheck {allowed}")
+
+    # 얼굴 등장: 검출기가 찾은 첫 프레임에서 FaceMesh, 이후 active 동안 매 프레임
+    first, t = run(gate, scene, t, 1 / FPS, 1 / FPS, found=True, face_x=W // 3)
+    expect(failures, len(first) == 1 and gate.state == "active", "face: FaceMesh runs on the first frame the detector confirms")
+    calls = det.calls
+    allowed, t = run(gate, scene, t, 1.0, 1 / FPS, found=True, face_x=W // 3)
+    expect(failures, len(allowed) == int(FPS) and det.calls == calls,
+           f"active: FaceMesh on every frame, no detector calls ({len(allowed)} frames)")
+
+    # 얼굴을 놓치면 다시 searching
+    gate.observe(False, t)
+    expect(failures, gate.state == "searching", "face lost: back to searching")
+    allowed, t = run(gate, scene, t, 2.5, 1 / FPS)
+    expect(failures, len(allowed) == 2 and not gate.idle, f"searching again: FaceMesh every {RECHECK:.0f} s {allowed}")
+
+
+def test_motion_only(failures):
+    scene = Scene()
+    gate = PresenceGate(recheck_interval=RECHECK, idle_recheck_interval=IDLE_RECHECK, idle_after=IDLE_AFTER,
+                        idle_interval=IDLE_INTERVAL, detector=False)
+    expect(failures, not gate.snapshot()["detector"], "detector=False: motion only")
+    allowed, t = run(gate, scene, 0.0, IDLE_AFTER + 0.5, 1 / FPS)
+    expect(failures, gate.idle, "motion only: idle on an empty scene")
+    allowed, t = run(gate, scene, t, 0.5, 1 / FPS, blob_x=40)
+    expect(failures, len(allowed) == 15 and not gate.idle,
+           f"motion only: FaceMesh on every moving frame ({len(allowed)}/15)")
+
+
+def main() -> int:
+    failures = []
+    test_detector(failures)
+    test_motion_only(failures)
+    print("Headless presence gate test", "failed." if failures else "passed.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
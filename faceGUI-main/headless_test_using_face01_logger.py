@@ -1,19 +1,23 @@
 """
-Import `face01` to initialize its file logger, then run a headless loop capturing a few frames
+Attach the face01 file logger (via the lightweight `face_analysis` module, so the GUI
+and the FaceMesh global are not loaded), then run a headless loop capturing a few frames
 and logging detected landmark counts via `face01.logger` (so logs go to face01_debug.log).
+An optional argument selects another frame source (camera index, video, image, RTSP URL).
 """
+import sys
 import time
 import cv2
 import mediapipe as mp
-import face01
+import face_analysis
+from frame_sources import open_source
 
-logger = face01.logger
+logger = face_analysis.setup_file_logging()
 logger.info("Starting headless test (using face01.logger)")
 
 mp_face_mesh = mp.solutions.face_mesh
 with mp_face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=1,
                            min_detection_confidence=0.5, min_tracking_confidence=0.5) as face_mesh:
-    cap = cv2.VideoCapture(0)
+    cap = open_source(sys.argv[1] if len(sys.argv) > 1 else 0)
     if not cap.isOpened():
         logger.error("Cannot open camera in headless test")
         raise SystemExit(1)
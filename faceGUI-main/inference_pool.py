@@ -0,0 +1,245 @@
+"""
+Multi-process FaceMesh inference over shared-memory ring buffers.
+
+One FaceMesh instance is bound to one core, however many threads feed it.
+`InferencePool` runs N worker processes, each with its own FaceMesh, and
+moves pixels and landmarks through one `multiprocessing.shared_memory` block:
+
+    frames     slots x max_frame_bytes uint8      (written by the caller, read by a worker)
+    landmarks  slots x max_faces x 478 x 3 f32    (written by a worker, read by the caller)
+
+Only small tuples (slot, seq, key, shape, timings) travel through the
+queues; frame arrays are never pickled. A slot is owned by the caller until
+`submit` copies a frame into it, by a worker until its result is queued, and
+freed again when `poll` copies the landmarks out. When every slot is busy,
+`submit` drops the new frame (the workers are saturated; a later frame will
+be fresher anyway).
+
+Results carry the caller's sequence number and stream key, so they can be
+consumed either newest-first per key (`latest`, for live preview: stale
+results that arrive after a newer one are discarded) or, with
+`ordered=True`, strictly in submission order (`poll`, for recording or analysis).
+
+    pool = InferencePool(workers=4, max_faces=1)
+    pool.start()
+    pool.submit(rgb, seq)            # False if dropped
+    res = pool.latest()              # PoolResult or None
+    pool.close()
+"""
+import logging
+import multiprocessing as mp
+import queue
+import time
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Dict, List, NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+from face_analysis import MAX_LANDMARKS
+
+logger = logging.getLogger("face01")
+
+
+class PoolResult(NamedTuple):
+    seq: int
+    key: int
+    t: float                          # 호출 측이 submit 에 넘긴 시각 (프레임 캡처 시각)
+    landmarks: Optional[np.ndarray]   # (F, N, 3) float32 사본, 얼굴이 없으면 None
+    width: int
+    height: int
+    ms: float                         # 워커에서의 추론 시간
+
+
+def _layout(slots: int, max_frame_bytes: int, max_faces: int):
+    frames = slots * max_frame_bytes
+    lm_shape = (slots, max_faces, MAX_LANDMARKS, 3)
+    return frames, lm_shape, frames + int(np.prod(lm_shape)) * 4
+
+
+def _worker_main(shm_name, slots, max_frame_bytes, max_faces, mesh_settings, synthetic, tasks, results):
+    """Worker process: FaceMesh on frames in shared memory, landmarks written back in place."""
+    from face_analysis import SyntheticMesh, create_face_mesh, landmarks_to_array
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frame_bytes, lm_shape, _ = _layout(slots, max_frame_bytes, max_faces)
+    frames = np.ndarray((slots, max_frame_bytes), dtype=np.uint8, buffer=shm.buf)
+    lms = np.ndarray(lm_shape, dtype=np.float32, buffer=shm.buf, offset=frame_bytes)
+    if synthetic:
+        mesh = SyntheticMesh(max_faces, seed=mp.current_process().pid or 0)
+    else:
+        mesh = create_face_mesh(**dict(mesh_settings, max_num_faces=max_faces))
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            slot, seq, key, t, h, w = task
+            frame = frames[slot, :h * w * 3].reshape(h, w, 3)
+            t0 = time.perf_counter()
+            faces = points = 0
+            try:
+                out = mesh.process(frame)
+                found = out.multi_face_landmarks[:max_faces] if out and out.multi_face_landmarks else []
+                for i, landmarks in enumerate(found):
+                    points = landmarks_to_array(landmarks, out=lms[slot, i]).shape[0]
+                faces = len(found)
+                error = None
+            except Exception as e:
+                error = str(e)
+            results.put((slot, seq, key, t, h, w, faces, points, (time.perf_counter() - t0) * 1000.0, error))
+    finally:
+        mesh.close()
+        del frames, lms
+        shm.close()
+
+
+class InferencePool:
+    """N FaceMesh worker processes fed through a shared-memory frame ring.
+
+    workers: processes (each holds one FaceMesh).
+    slots: frames in flight; default 2 per worker (one running, one queued).
+    max_frame_bytes: slot capacity; larger frames are downscaled to fit
+        (normalized landmarks do not depend on the inference resolution).
+    synthetic: SyntheticMesh instead of FaceMesh (benchmarks without mediapipe).
+    ordered: track submission order for `poll`; otherwise use `latest`.
+    """
+
+    def __init__(self, workers: int = 2, max_faces: int = 1, slots: Optional[int] = None,
+                 max_frame_bytes: int = 1920 * 1080 * 3, mesh_settings: Optional[dict] = None,
+                 synthetic: bool = False, ordered: bool = False):
+        self.workers = max(1, workers)
+        self.max_faces = max_faces
+        self.slots = slots or self.workers * 2
+        self.max_frame_bytes = max_frame_bytes
+        self.mesh_settings = dict(mesh_settings or {})
+        self.synthetic = synthetic
+        self.ordered = ordered
+        self.submitted = self.dropped = self.completed = self.stale = self.errors = 0
+        self._shm = None
+        self._procs: List[mp.Process] = []
+        self._free = deque(range(self.slots))
+        self._latest: Dict[int, PoolResult] = {}
+        self._delivered: Dict[int, int] = {}   # key -> 마지막으로 돌려준 seq
+        self._order = deque()                  # ordered 모드: 제출 순서의 (key, seq)
+        self._ready: Dict[tuple, PoolResult] = {}  # ordered 모드: 도착했지만 아직 차례가 아닌 결과
+
+    def start(self) -> "InferencePool":
+        if self._shm is not None:
+            return self
+        if not self.mesh_settings:
+            from face_analysis import FACE_MESH_SETTINGS
+            self.mesh_settings = dict(FACE_MESH_SETTINGS)
+        frame_bytes, lm_shape, total = _layout(self.slots, self.max_frame_bytes, self.max_faces)
+        self._shm = shared_memory.SharedMemory(create=True, size=total)
+        self._frames = np.ndarray((self.slots, self.max_frame_bytes), dtype=np.uint8, buffer=self._shm.buf)
+        self._lms = np.ndarray(lm_shape, dtype=np.float32, buffer=self._shm.buf, offset=frame_bytes)
+        # Windows 와 같은 방식(spawn)으로 시작해 Tk/스레드 상태를 물려받지 않게 합니다.
+        ctx = mp.get_context("spawn")
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        for i in range(self.workers):
+            p = ctx.Process(target=_worker_main, name=f"face01-infer-{i}", daemon=True,
+                            args=(self._shm.name, self.slots, self.max_frame_bytes, self.max_faces,
+                                  self.mesh_settings, self.synthetic, self._tasks, self._results))
+            p.start()
+            self._procs.append(p)
+        logger.info("InferencePool: %s workers, %s slots, %.1f MB shared", self.workers, self.slots, total / 2**20)
+        return self
+
+    @property
+    def in_flight(self) -> int:
+        return self.slots - len(self._free)
+
+    def submit(self, rgb: np.ndarray, seq: int, key: int = 0, t: Optional[float] = None) -> bool:
+        """Copy `rgb` into a free slot and queue it; returns False if all slots are busy (frame dropped)."""
+        if not self._free:
+            self.dropped += 1
+            return False
+        h, w = rgb.shape[:2]
+        if h * w * 3 > self.max_frame_bytes:
+            s = (self.max_frame_bytes / float(h * w * 3)) ** 0.5
+            w, h = max(1, int(w * s)), max(1, int(h * s))
+            slot = self._free.popleft()
+            cv2.resize(rgb, (w, h), dst=self._frames[slot, :h * w * 3].reshape(h, w, 3),
+                       interpolation=cv2.INTER_AREA)
+        else:
+            slot = self._free.popleft()
+            np.copyto(self._frames[slot, :h * w * 3].reshape(h, w, 3), rgb)
+        self._tasks.put((slot, seq, key, time.perf_counter() if t is None else t, h, w))
+        if self.ordered:
+            self._order.append((key, seq))
+        self.submitted += 1
+        return True
+
+    def _drain(self, timeout: float = 0.0) -> List[PoolResult]:
+        out = []
+        block = timeout > 0
+        while True:
+            try:
+                msg = self._results.get(block, timeout) if block else self._results.get_nowait()
+            except queue.Empty:
+                return out
+            block = False
+            slot, seq, key, t, h, w, faces, points, ms, error = msg
+            landmarks = self._lms[slot, :faces, :points].copy() if faces else None
+            self._free.append(slot)
+            if error:
+                self.errors += 1
+                logger.warning("InferencePool: worker error on seq %s: %s", seq, error)
+            self.completed += 1
+            out.append(PoolResult(seq, key, t, landmarks, w, h, ms))
+
+    def latest(self, key: int = 0, timeout: float = 0.0) -> Optional[PoolResult]:
+        """Newest result for `key` that is newer than the last one returned, else None."""
+        for res in self._drain(timeout):
+            cur = self._latest.get(res.key)
+            if cur is None or res.seq > cur.seq:
+                if cur is not None:
+                    self.stale += 1
+                self._latest[res.key] = res
+            else:
+                self.stale += 1
+        res = self._latest.pop(key, None)
+        if res is None or res.seq <= self._delivered.get(key, -1):
+            if res is not None:
+                self.stale += 1
+            return None
+        self._delivered[key] = res.seq
+        return res
+
+    def poll(self, timeout: float = 0.0) -> List[PoolResult]:
+        """All results that are next in submission order (a result waits for earlier ones)."""
+        for res in self._drain(timeout):
+            self._ready[(res.key, res.seq)] = res
+        out = []
+        while self._order and self._order[0] in self._ready:
+            out.append(self._ready.pop(self._order.popleft()))
+        return out
+
+    def snapshot(self) -> dict:
+        return {"workers": self.workers, "in_flight": self.in_flight, "submitted": self.submitted,
+                "completed": self.completed, "dropped": self.dropped, "stale": self.stale, "errors": self.errors}
+
+    def close(self, timeout: float = 2.0) -> None:
+        if self._shm is None:
+            return
+        for _ in self._procs:
+            self._tasks.put(None)
+        deadline = time.perf_counter() + timeout
+        for p in self._procs:
+            p.join(max(0.0, deadline - time.perf_counter()))
+            if p.is_alive():
+                p.terminate()
+        self._procs.clear()
+        self._frames = self._lms = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,349 @@
+"""
+Record FaceMesh output once, replay it without MediaPipe.
+
+A recording is two append-only files:
+
+    session.lmr       64-byte header, then one raw landmark block per frame
+                      (faces x points x 3, float16 or float32, little-endian)
+    session.lmr.idx   one fixed-size index row per frame:
+                      t (float64 s), offset (int64), seq (int64), faces, points, width, height (uint16)
+
+Each frame's block is written before its index row, so a recorder killed
+mid-write leaves at most one unindexed tail that readers ignore. Both files
+are opened with `np.memmap`, so replaying hours of landmarks costs page
+faults, not parsing.
+
+    with LandmarkRecorder("session.lmr") as rec:
+        rec.write(t, batch, width, height)              # batch: (F, N, 3) or None
+
+    rec = LandmarkRecording("session.lmr")
+    for frame in replay(rec, speed=0):                  # 0 = as fast as possible
+        analyze_faces(frame.landmarks, frame.width, frame.height)
+
+`ReplayMesh` stands in for FaceMesh (`process()` returns the next recorded
+frame), so `bench_pipeline.py --mesh replay:session.lmr` and the live
+pipeline can run on recorded landmarks.
+
+CLI:
+    python landmark_recording.py record session.mp4 -o session.lmr
+    python landmark_recording.py replay session.lmr [--draw] [-o analyses.jsonl]
+    python landmark_recording.py info session.lmr
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import types
+from typing import Iterator, NamedTuple, Optional
+
+import numpy as np
+
+from face_analysis import MAX_LANDMARKS, analyze_faces
+from overlay import OVERLAY_LEVELS, OverlayRenderer
+
+logger = logging.getLogger("face01")
+
+MAGIC = b"FACELMR1"
+HEADER_SIZE = 64
+_HEADER = np.dtype([("magic", "S8"), ("itemsize", "<u4"), ("points", "<u4")])
+INDEX_DTYPE = np.dtype([("t", "<f8"), ("offset", "<i8"), ("seq", "<i8"), ("faces", "<u2"),
+                        ("points", "<u2"), ("width", "<u2"), ("height", "<u2")])
+_DTYPES = {2: np.dtype("<f2"), 4: np.dtype("<f4")}
+
+
+def index_path(path: str) -> str:
+    return path + ".idx"
+
+
+class RecordedFrame(NamedTuple):
+    t: float
+    landmarks: np.ndarray  # (F, N, 3), 녹화 dtype 그대로 (memmap 뷰)
+    width: int
+    height: int
+    seq: int
+
+
+class LandmarkRecorder:
+    """Append frames to a recording; reopening an existing file appends to it.
+
+    dtype: "float16" halves the file size (about 1e-3 of the frame, well below a
+    pixel at camera resolutions); "float32" stores FaceMesh output exactly.
+    Safe to call from one writer thread while another thread calls `close`.
+    """
+
+    def __init__(self, path: str, dtype: str = "float16", points: int = MAX_LANDMARKS,
+                 flush_every: int = 30):
+        self.path = path
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        if self.dtype.itemsize not in _DTYPES:
+            raise ValueError(f"unsupported landmark dtype {dtype!r} (float16 or float32)")
+        self.points = points
+        self.flush_every = max(1, flush_every)
+        self.frames = 0
+        self._lock = threading.Lock()
+        existing = os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE
+        if existing:
+            head = np.fromfile(path, dtype=_HEADER, count=1)[0]
+            if head["magic"] != MAGIC:
+                raise ValueError(f"{path} is not a landmark recording")
+            # 이어쓰기: 기존 파일의 형식을 따릅니다.
+            self.dtype = _DTYPES[int(head["itemsize"])]
+            self.points = int(head["points"])
+            self._trim_tail()
+        self._data = open(path, "ab")
+        self._index = open(index_path(path), "ab")
+        if not existing:
+            header = np.zeros(1, dtype=_HEADER)
+            header[0] = (MAGIC, self.dtype.itemsize, self.points)
+            self._data.write(header.tobytes().ljust(HEADER_SIZE, b"\0"))
+        self._offset = self._data.tell()
+
+    def _trim_tail(self) -> None:
+        """Drop a partial index row and data past the last indexed frame (crash leftovers)."""
+        idx_path = index_path(self.path)
+        n = os.path.getsize(idx_path) // INDEX_DTYPE.itemsize if os.path.exists(idx_path) else 0
+        end = HEADER_SIZE
+        if n:
+            last = np.fromfile(idx_path, dtype=INDEX_DTYPE, count=1, offset=(n - 1) * INDEX_DTYPE.itemsize)[0]
+            end = int(last["offset"]) + int(last["faces"]) * int(last["points"]) * 3 * self.dtype.itemsize
+        with open(idx_path, "ab") as f:
+            f.truncate(n * INDEX_DTYPE.itemsize)
+        with open(self.path, "r+b") as f:
+            f.truncate(end)
+
+    def write(self, t: float, landmarks: Optional[np.ndarray], width: int, height: int, seq: int = -1) -> None:
+        """Append one frame; `landmarks` is (F, N, 3) normalized (None or F=0 for no face)."""
+        if landmarks is None:
+            block = np.zeros((0, self.points, 3), dtype=self.dtype)
+        else:
+            block = np.ascontiguousarray(landmarks, dtype=self.dtype)
+            if block.ndim == 2:
+                block = block[None]
+        row = np.zeros(1, dtype=INDEX_DTYPE)
+        with self._lock:
+            if self._data is None:
+                return
+            row[0] = (t, self._offset, seq, block.shape[0], block.shape[1], width, height)
+            self._data.write(block.tobytes())
+            self._offset += block.nbytes
+            self._index.write(row.tobytes())
+            self.frames += 1
+            if self.frames % self.flush_every == 0:
+                self._data.flush()
+                self._index.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._data is not None:
+                self._data.flush()
+                self._index.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._data is None:
+                return
+            # 데이터를 먼저 닫아야 인덱스가 가리키는 블록이 항상 디스크에 있습니다.
+            self._data.close()
+            self._index.close()
+            self._data = self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkRecording:
+    """Memory-mapped, random-access reader of a recording."""
+
+    def __init__(self, path: str):
+        self.path = path
+        size = os.path.getsize(path)
+        if size < HEADER_SIZE:
+            raise ValueError(f"{path} is too short to be a landmark recording")
+        head = np.fromfile(path, dtype=_HEADER, count=1)[0]
+        if head["magic"] != MAGIC:
+            raise ValueError(f"{path} is not a landmark recording")
+        self.dtype = _DTYPES[int(head["itemsize"])]
+        self.points = int(head["points"])
+        self._data = np.memmap(path, dtype=np.uint8, mode="r")
+        idx_path = index_path(path)
+        n = os.path.getsize(idx_path) // INDEX_DTYPE.itemsize if os.path.exists(idx_path) else 0
+        index = np.memmap(idx_path, dtype=INDEX_DTYPE, mode="r", shape=(n,)) if n else np.zeros(0, INDEX_DTYPE)
+        # 기록 중인 파일: 데이터가 아직 다 쓰이지 않은 마지막 행은 건너뜁니다.
+        ends = index["offset"] + index["faces"].astype(np.int64) * index["points"] * 3 * self.dtype.itemsize
+        self.index = index[:int(np.count_nonzero(ends <= size))]
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.index["t"]
+
+    @property
+    def duration(self) -> float:
+        return float(self.index["t"][-1] - self.index["t"][0]) if len(self) > 1 else 0.0
+
+    def __getitem__(self, i: int) -> RecordedFrame:
+        row = self.index[i]
+        faces, points = int(row["faces"]), int(row["points"])
+        count = faces * points * 3
+        start = int(row["offset"])
+        arr = self._data[start:start + count * self.dtype.itemsize].view(self.dtype).reshape(faces, points, 3)
+        return RecordedFrame(float(row["t"]), arr, int(row["width"]), int(row["height"]), int(row["seq"]))
+
+    def frame_at(self, t: float) -> int:
+        """Index of the last frame recorded at or before `t`."""
+        return max(int(np.searchsorted(self.timestamps, t, side="right")) - 1, 0)
+
+    def __iter__(self) -> Iterator[RecordedFrame]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def info(self) -> dict:
+        faces = self.index["faces"]
+        return {"path": self.path, "frames": len(self), "dtype": self.dtype.name, "points": self.points,
+                "duration_s": round(self.duration, 3), "frames_with_face": int((faces > 0).sum()),
+                "max_faces": int(faces.max()) if len(self) else 0,
+                "bytes": int(self._data.size + len(self) * INDEX_DTYPE.itemsize)}
+
+
+def replay(recording: LandmarkRecording, speed: float = 1.0, start: int = 0,
+           stop: Optional[int] = None) -> Iterator[RecordedFrame]:
+    """Yield frames paced by their timestamps divided by `speed` (0 = no pacing)."""
+    stop = len(recording) if stop is None else min(stop, len(recording))
+    if start >= stop:
+        return
+    t0_rec = recording.timestamps[start]
+    t0 = time.perf_counter()
+    for i in range(start, stop):
+        frame = recording[i]
+        if speed > 0:
+            wait = (frame.t - t0_rec) / speed - (time.perf_counter() - t0)
+            if wait > 0:
+                time.sleep(wait)
+        yield frame
+
+
+class ReplayMesh:
+    """FaceMesh stand-in: each `process()` returns the next recorded frame's faces as (N, 3) arrays."""
+
+    def __init__(self, recording: LandmarkRecording, loop: bool = True):
+        self.recording = recording
+        self.loop = loop
+        self.pos = 0
+
+    def process(self, rgb):
+        if self.pos >= len(self.recording):
+            if not self.loop or not len(self.recording):
+                return types.SimpleNamespace(multi_face_landmarks=None)
+            self.pos = 0
+        frame = self.recording[self.pos]
+        self.pos += 1
+        faces = [face.astype(np.float32) for face in frame.landmarks]
+        return types.SimpleNamespace(multi_face_landmarks=faces or None)
+
+    def close(self):
+        pass
+
+
+# --- CLI ---------------------------------------------------------------------
+
+def record_video(src: str, out: str, dtype: str = "float16", max_faces: int = 1, stride: int = 1) -> int:
+    """Run FaceMesh once over a video/image source and record every analyzed frame."""
+    import cv2
+    from face_analysis import create_face_mesh, landmarks_to_array
+    from frame_sources import open_source
+
+    mesh = create_face_mesh(max_num_faces=max_faces)
+    source = open_source(src, threaded=False)
+    fps = source.get(cv2.CAP_PROP_FPS) or 30.0
+    frame = rgb = None
+    idx = 0
+    with LandmarkRecorder(out, dtype=dtype) as rec:
+        while True:
+            ok, frame = source.read(frame)
+            if not ok:
+                break
+            if idx % stride == 0:
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+                results = mesh.process(rgb)
+                batch = None
+                if results and results.multi_face_landmarks:
+                    batch = np.stack([landmarks_to_array(lm) for lm in results.multi_face_landmarks])
+                h, w = rgb.shape[:2]
+                rec.write(idx / fps, batch, w, h, seq=idx)
+            idx += 1
+        frames = rec.frames
+    source.release()
+    mesh.close()
+    return frames
+
+
+def replay_analysis(path: str, speed: float = 0.0, draw: bool = False, out=None, overlay: str = "points") -> dict:
+    """Analyze (and optionally draw at `overlay` level) every recorded frame; returns throughput numbers."""
+    recording = LandmarkRecording(path)
+    renderer = OverlayRenderer(overlay)
+    canvas = None
+    frames = faces = 0
+    t0 = time.perf_counter()
+    for frame in replay(recording, speed=speed):
+        batch = frame.landmarks.astype(np.float32)
+        analyses = analyze_faces(batch, frame.width, frame.height)
+        if draw and len(batch):
+            if canvas is None or canvas.shape[:2] != (frame.height, frame.width):
+                canvas = np.zeros((frame.height, frame.width, 3), dtype=np.uint8)
+            renderer.render(canvas, batch)
+        if out is not None:
+            out.write(json.dumps({"t": round(frame.t, 4), "seq": frame.seq, "analyses": analyses},
+                                 ensure_ascii=False) + "\n")
+        frames += 1
+        faces += len(batch)
+    elapsed = time.perf_counter() - t0
+    return {"frames": frames, "faces": faces, "elapsed_s": round(elapsed, 3),
+            "fps": round(frames / elapsed, 1) if elapsed > 0 else 0.0,
+            "speedup": round(recording.duration / elapsed, 1) if elapsed > 0 else 0.0}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Record / replay FaceMesh landmark streams")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("record", help="run FaceMesh over a video and record the landmarks")
+    p.add_argument("source", help="video file, image folder/glob or camera index")
+    p.add_argument("-o", "--output", required=True)
+    p.add_argument("--dtype", choices=("float16", "float32"), default="float16")
+    p.add_argument("--max-faces", type=int, default=1)
+    p.add_argument("--stride", type=int, default=1)
+    p = sub.add_parser("replay", help="analyze a recording without MediaPipe")
+    p.add_argument("recording")
+    p.add_argument("--speed", type=float, default=0.0, help="1 = real time, 0 = as fast as possible")
+    p.add_argument("--draw", action="store_true", help="also draw the landmarks (drawing benchmark)")
+    p.add_argument("--overlay", choices=OVERLAY_LEVELS, default="points", help="overlay level for --draw")
+    p.add_argument("-o", "--output", help="write per-frame analyses as JSONL")
+    p = sub.add_parser("info", help="print recording metadata")
+    p.add_argument("recording")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "record":
+        n = record_video(args.source, args.output, args.dtype, args.max_faces, max(1, args.stride))
+        print(json.dumps(LandmarkRecording(args.output).info(), ensure_ascii=False))
+        return 0 if n else 1
+    if args.cmd == "replay":
+        out = open(args.output, "w", encoding="utf-8") if args.output else None
+        try:
+            print(json.dumps(replay_analysis(args.recording, args.speed, args.draw, out, args.overlay), ensure_ascii=False))
+        finally:
+            if out is not None:
+                out.close()
+        return 0
+    print(json.dumps(LandmarkRecording(args.recording).info(), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Load generator for server.py.
+
+    python loadtest_client.py --mode http --concurrency 16 --duration 20 --image image.png
+    python loadtest_client.py --mode ws --concurrency 4 --fps 30
+
+http: `concurrency` closed-loop clients POST the image back to back (503 answers
+are counted as rejections and retried after a short pause; 422 and any other
+status count as errors, and only 200/422 replies are decoded).
+ws: `concurrency` WebSocket streams send frames at --fps (0 = as fast as
+replies come back) and read replies concurrently, like a camera would.
+
+Reports client-side throughput and latency percentiles, then the server's
+/metrics. Requires aiohttp.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import numpy as np
+
+from server import decode_result
+
+
+def _percentiles(samples):
+    if not samples:
+        return {}
+    arr = np.asarray(samples)
+    return {"count": int(arr.size), "mean": round(float(arr.mean()), 2),
+            "p50": round(float(np.percentile(arr, 50)), 2), "p95": round(float(np.percentile(arr, 95)), 2),
+            "p99": round(float(np.percentile(arr, 99)), 2), "max": round(float(arr.max()), 2)}
+
+
+async def _http_client(session, url, blob, stop_at, stats):
+    while time.perf_counter() < stop_at:
+        t0 = time.perf_counter()
+        async with session.post(url + "/analyze", data=blob) as resp:
+            body = await resp.read()
+            if resp.status == 503:
+                stats["rejected"] += 1
+                await asyncio.sleep(0.01)
+                continue
+        stats["latency"].append((time.perf_counter() - t0) * 1000.0)
+        if resp.status not in (200, 422):
+            # 400 "empty body" 등 결과 형식이 아닌 응답은 디코딩하지 않습니다.
+            stats["errors"] += 1
+            continue
+        header, _ = decode_result(body)
+        stats["faces"] += header["faces"]
+        stats["errors" if resp.status != 200 else "ok"] += 1
+
+
+async def _ws_client(session, url, blob, stop_at, fps, stats):
+    sent = {}
+    async with session.ws_connect(url.replace("http", "ws", 1) + "/stream", max_msg_size=0) as ws:
+        async def reader():
+            async for msg in ws:
+                header, _ = decode_result(msg.data)
+                t_sent = sent.pop(header.get("seq"), None)
+                if t_sent is not None:
+                    stats["latency"].append((time.perf_counter() - t_sent) * 1000.0)
+                stats["faces"] += header["faces"]
+                stats["errors" if "error" in header else "ok"] += 1
+                # 응답 전의 프레임은 서버에서 버려졌으므로 더 이상 기다리지 않습니다.
+                for seq in [s for s in sent if s < header.get("seq", 0)]:
+                    del sent[seq]
+
+        task = asyncio.create_task(reader())
+        seq = 0
+        period = 1.0 / fps if fps > 0 else 0.0
+        while time.perf_counter() < stop_at:
+            seq += 1
+            sent[seq] = time.perf_counter()
+            await ws.send_bytes(blob)
+            stats["sent"] += 1
+            await asyncio.sleep(period)
+        await asyncio.sleep(0.5)  # 마지막 응답 대기
+        await ws.close()
+        task.cancel()
+
+
+async def run(args) -> dict:
+    try:
+        import aiohttp
+    except ImportError:
+        raise SystemExit("load test needs aiohttp: pip install aiohttp")
+    with open(args.image, "rb") as f:
+        blob = f.read()
+    stats = {"latency": [], "ok": 0, "errors": 0, "rejected": 0, "faces": 0, "sent": 0}
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None)) as session:
+        t0 = time.perf_counter()
+        stop_at = t0 + args.duration
+        if args.mode == "http":
+            clients = [_http_client(session, args.url, blob, stop_at, stats) for _ in range(args.concurrency)]
+        else:
+            clients = [_ws_client(session, args.url, blob, stop_at, args.fps, stats) for _ in range(args.concurrency)]
+        await asyncio.gather(*clients)
+        elapsed = time.perf_counter() - t0
+        async with session.get(args.url + "/metrics") as resp:
+            server_metrics = await resp.json()
+    report = {
+        "mode": args.mode,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "ok": stats["ok"],
+        "errors": stats["errors"],
+        "rejected": stats["rejected"],
+        "throughput_per_s": round(stats["ok"] / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": _percentiles(stats["latency"]),
+        "server": server_metrics,
+    }
+    if args.mode == "ws":
+        report["sent"] = stats["sent"]
+    return report
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load test for the face analysis server")
+    ap.add_argument("--url", default="http://127.0.0.1:8765")
+    ap.add_argument("--mode", choices=("http", "ws"), default="http")
+    ap.add_argument("--image", default="image.png")
+    ap.add_argument("-c", "--concurrency", type=int, default=8)
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds")
+    ap.add_argument("--fps", type=float, default=30.0, help="ws mode: frames per second per stream (0 = unthrottled)")
+    ap.add_argument("--out", help="write the report as JSON")
+    args = ap.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
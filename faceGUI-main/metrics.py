@@ -0,0 +1,174 @@
+"""
+Incremental, temporally smoothed physiognomy metrics for the live preview.
+
+`measure_faces` gives raw pixel distances per frame; on a live feed they
+jitter by a few pixels, and a value sitting near a threshold (30 / 15 / 60 px)
+makes the classification, and with it the whole analysis text, flip from
+frame to frame. `MetricsEngine` keeps per-face running statistics (EMA plus
+rolling mean / variance over a fixed window, all O(1) per update), classifies
+the smoothed values with hysteresis bands around the thresholds, and rebuilds
+a face's text only when a class changes or a shown value drifts by at least
+`display_step` pixels.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from face_analysis import FEATURE_THRESHOLDS, format_analysis
+
+
+class RunningStats:
+    """EMA and rolling mean / variance of a feature vector over the last `window` samples.
+
+    The rolling moments use running sums over a ring buffer, so one update
+    costs the same regardless of the window size.
+    """
+
+    def __init__(self, n_features: int, window: int = 30, alpha: float = 0.3):
+        self.window = max(1, int(window))
+        self.alpha = alpha
+        self._ring = np.zeros((self.window, n_features), dtype=np.float64)
+        self._sum = np.zeros(n_features, dtype=np.float64)
+        self._sumsq = np.zeros(n_features, dtype=np.float64)
+        self._pos = 0
+        self.count = 0
+        self.ema: Optional[np.ndarray] = None
+
+    def update(self, values) -> np.ndarray:
+        """Add one sample; returns the updated EMA."""
+        x = np.asarray(values, dtype=np.float64)
+        if self.count >= self.window:
+            old = self._ring[self._pos]
+            self._sum -= old
+            self._sumsq -= old * old
+        self._ring[self._pos] = x
+        self._sum += x
+        self._sumsq += x * x
+        self._pos = (self._pos + 1) % self.window
+        self.count += 1
+        if self.ema is None:
+            self.ema = x.copy()
+        else:
+            self.ema += self.alpha * (x - self.ema)
+        return self.ema
+
+    @property
+    def n(self) -> int:
+        return min(self.count, self.window)
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self._sum / max(self.n, 1)
+
+    @property
+    def var(self) -> np.ndarray:
+        n = self.n
+        if n < 2:
+            return np.zeros_like(self._sum)
+        # 부동소수점 오차로 아주 작은 음수가 나올 수 있어 0으로 자릅니다.
+        return np.maximum(self._sumsq / n - (self._sum / n) ** 2, 0.0)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.var)
+
+
+class HysteresisClassifier:
+    """Per-feature above/below-threshold state that only flips outside a dead band.
+
+    A feature switches to "above" once it exceeds `threshold + margin` and back
+    to "below" once it drops under `threshold - margin`; inside the band the
+    previous class is kept.
+    """
+
+    def __init__(self, thresholds: Sequence[float], margins: Sequence[float]):
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.margins = np.broadcast_to(np.asarray(margins, dtype=np.float64), self.thresholds.shape)
+        self.state: Optional[np.ndarray] = None
+
+    def update(self, values) -> Tuple[np.ndarray, bool]:
+        """Returns (classes as bool array, whether any class changed)."""
+        x = np.asarray(values, dtype=np.float64)
+        if self.state is None:
+            self.state = x > self.thresholds
+            return self.state.copy(), True
+        new = np.where(x > self.thresholds + self.margins, True,
+                       np.where(x < self.thresholds - self.margins, False, self.state))
+        changed = bool((new != self.state).any())
+        self.state = new
+        return new.copy(), changed
+
+
+class FaceMetrics:
+    """Smoothed metrics, hysteresis classes and the cached analysis text of one face."""
+
+    def __init__(self, window: int, alpha: float, margins: Sequence[float], display_step: float = 2.0):
+        self.stats = RunningStats(len(FEATURE_THRESHOLDS), window, alpha)
+        self.classifier = HysteresisClassifier(FEATURE_THRESHOLDS, margins)
+        self.display_step = display_step
+        self.text: Optional[str] = None
+        self._shown: Optional[np.ndarray] = None  # values written into self.text
+        self.last_seen = 0
+
+    def update(self, values) -> bool:
+        """Feed one raw measurement; returns True if the text was rebuilt."""
+        ema = self.stats.update(values)
+        classes, changed = self.classifier.update(ema)
+        if not changed and self._shown is not None and (np.abs(ema - self._shown) < self.display_step).all():
+            return False
+        self._shown = ema.copy()
+        self.text = format_analysis(*ema.tolist(), classes=classes)
+        return True
+
+
+class MetricsEngine:
+    """Per-face-ID `FaceMetrics`, keyed by the tracker's stable IDs.
+
+    window: samples in the rolling mean / variance.
+    alpha: EMA weight of a new sample (1.0 = no smoothing).
+    hysteresis: dead-band half-width as a fraction of each threshold.
+    display_step: pixels a shown value must drift before the text is rebuilt.
+    max_age: updates a face may be absent before its state is dropped.
+    """
+
+    def __init__(self, window: int = 30, alpha: float = 0.3, hysteresis: float = 0.1,
+                 display_step: float = 2.0, max_age: int = 90):
+        self.window = window
+        self.alpha = alpha
+        self.display_step = display_step
+        self.margins = np.asarray(FEATURE_THRESHOLDS, dtype=np.float64) * hysteresis
+        self.max_age = max_age
+        self.faces: Dict[int, FaceMetrics] = {}
+        self._tick = 0
+
+    def update(self, ids: Sequence[int], values: np.ndarray) -> Tuple[List[str], bool]:
+        """Feed an (F, 3) measurement batch for faces `ids`; returns (texts, any text changed)."""
+        self._tick += 1
+        changed = False
+        texts = []
+        for face_id, row in zip(ids, values):
+            face = self.faces.get(face_id)
+            if face is None:
+                face = self.faces[face_id] = FaceMetrics(self.window, self.alpha, self.margins, self.display_step)
+            face.last_seen = self._tick
+            changed |= face.update(row)
+            texts.append(face.text)
+        stale = [k for k, f in self.faces.items() if self._tick - f.last_seen > self.max_age]
+        for k in stale:
+            del self.faces[k]
+        return texts, changed
+
+    def texts(self, ids: Sequence[int]) -> List[Optional[str]]:
+        """Last texts for `ids` without a new measurement (None for faces not seen yet)."""
+        return [f.text if f is not None else None for f in (self.faces.get(i) for i in ids)]
+
+    def summary(self, face_id: int) -> Optional[dict]:
+        face = self.faces.get(face_id)
+        if face is None:
+            return None
+        s = face.stats
+        return {"n": s.n, "ema": s.ema.tolist(), "mean": s.mean.tolist(), "std": s.std.tolist(),
+                "classes": face.classifier.state.tolist()}
+
+    def reset(self) -> None:
+        self.faces.clear()
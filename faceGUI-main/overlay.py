@@ -0,0 +1,224 @@
+"""
+Landmark overlay with selectable detail levels.
+
+    none       nothing is drawn
+    keypoints  ~20 anatomical anchor points (eye corners, nose, mouth, chin, ...)
+    contours   face oval, eyes, brows, lips (and irises with refine_landmarks) as polylines
+    points     every landmark as a dot (the original preview)
+    mesh       the full triangle mesh as line segments
+
+For each level and landmark count, `OverlayRenderer` precomputes which
+landmarks it needs and how they are connected, so a frame only gathers and
+scales those landmarks and issues one bulk draw call per primitive type
+(`cv2.polylines` with all polylines / segments of all faces, or a single
+fancy-indexing write for dots). Drawing cost follows the level, not the 478
+landmarks. Landmarks are gathered in draw order and scaled in reused
+buffers, so each polyline is a view of the pixel buffer and `contours`
+allocates no landmark-sized arrays per frame; the dot levels (stencil
+indices) and `mesh` (OpenCV's conversion of the segment array) still create
+small temporaries. With `alpha < 1` the primitives are drawn into a reused
+buffer covering only the faces' bounding box, and blended into the frame
+with one `cv2.addWeighted` over that box.
+"""
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from face_analysis import LANDMARK_COLOR, draw_landmark_points
+
+OVERLAY_LEVELS = ("none", "keypoints", "contours", "points", "mesh")
+
+KEYPOINTS = (
+    33, 133, 362, 263,        # 눈꼬리
+    159, 145, 386, 374,       # 눈 위/아래
+    105, 334,                 # 눈썹
+    168, 1, 98, 327,          # 코
+    61, 291, 0, 13, 14, 17,   # 입
+    10, 152, 234, 454,        # 이마, 턱, 얼굴 양옆
+)
+
+# (indices, closed) — MediaPipe FaceMesh 윤곽 연결(FACEMESH_CONTOURS)과 같은 경로
+CONTOURS: Tuple[Tuple[Tuple[int, ...], bool], ...] = (
+    ((10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288, 397, 365, 379, 378, 400, 377,
+      152, 148, 176, 149, 150, 136, 172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109), True),
+    ((61, 146, 91, 181, 84, 17, 314, 405, 321, 375, 291, 409, 270, 269, 267, 0, 37, 39, 40, 185), True),
+    ((78, 95, 88, 178, 87, 14, 317, 402, 318, 324, 308, 415, 310, 311, 312, 13, 82, 81, 80, 191), True),
+    ((33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246), True),
+    ((263, 249, 390, 373, 374, 380, 381, 382, 362, 398, 384, 385, 386, 387, 388, 466), True),
+    ((46, 53, 52, 65, 55), False),
+    ((70, 63, 105, 66, 107), False),
+    ((276, 283, 282, 295, 285), False),
+    ((300, 293, 334, 296, 336), False),
+    ((469, 470, 471, 472), True),   # 홍채 (refine_landmarks=True 일 때만)
+    ((474, 475, 476, 477), True),
+)
+
+
+def _mediapipe_tessellation() -> Optional[np.ndarray]:
+    try:
+        from mediapipe.python.solutions.face_mesh_connections import FACEMESH_TESSELATION
+    except Exception:
+        return None
+    return np.array(sorted(FACEMESH_TESSELATION), dtype=np.intp)
+
+
+def delaunay_edges(points: np.ndarray) -> np.ndarray:
+    """(N, 2) points -> (E, 2) unique index pairs of their Delaunay triangulation."""
+    pts = np.asarray(points, dtype=np.float32)
+    lo = pts.min(axis=0) - 1.0
+    hi = pts.max(axis=0) + 1.0
+    subdiv = cv2.Subdiv2D((float(lo[0]), float(lo[1]), float(hi[0] - lo[0]) + 1.0, float(hi[1] - lo[1]) + 1.0))
+    lookup = {}
+    for i, (x, y) in enumerate(pts.tolist()):
+        subdiv.insert((x, y))
+        lookup.setdefault((x, y), i)
+    edges = set()
+    for x0, y0, x1, y1 in subdiv.getEdgeList().tolist():
+        a = lookup.get((x0, y0))
+        b = lookup.get((x1, y1))
+        if a is not None and b is not None and a != b:
+            edges.add((min(a, b), max(a, b)))
+    return np.array(sorted(edges), dtype=np.intp).reshape(-1, 2)
+
+
+class _Plan:
+    """Precomputed draw batches of one level for one landmark count."""
+
+    __slots__ = ("kind", "idx", "closed", "open")
+
+    def __init__(self, kind: str, idx: Optional[np.ndarray] = None, closed=(), open_=()):
+        self.kind = kind        # "dots", "lines" 또는 "edges"
+        self.idx = idx          # 그리는 순서대로 모은 랜드마크 (중복 허용, None = 전부)
+        self.closed = closed    # idx 안에서 각 폴리라인이 차지하는 slice
+        self.open = open_
+
+
+class OverlayRenderer:
+    """Draw landmark overlays for an (F, N, 3) batch at a configurable level.
+
+    level: one of OVERLAY_LEVELS; can be changed between frames from another thread.
+    alpha: opacity; 1.0 draws straight into the frame, lower values blend once per frame.
+    """
+
+    def __init__(self, level: str = "points", alpha: float = 1.0, color=LANDMARK_COLOR, thickness: int = 1):
+        self.level = level
+        self.alpha = alpha
+        self.color = tuple(int(c) for c in color)
+        self.thickness = thickness
+        self._plans: Dict[Tuple[str, int], _Plan] = {}
+        self._tessellation = _mediapipe_tessellation()
+        self._px = np.empty((0, 2), dtype=np.int32)
+        self._xyz = np.empty(0, dtype=np.float32)
+        self._fxy = np.empty(0, dtype=np.float64)
+        self._scale = np.empty(0, dtype=np.float64)  # (w, h) 를 _fxy 와 같은 모양으로 반복 (브로드캐스트 없는 곱셈)
+        self._scale_wh = None
+        self._lines: Dict[Tuple[str, int, int], Tuple[list, list]] = {}  # _px 의 view 목록
+        self._buf = np.empty((0, 0, 3), dtype=np.uint8)
+
+    @property
+    def level(self) -> str:
+        return self._level
+
+    @level.setter
+    def level(self, value: str) -> None:
+        if value not in OVERLAY_LEVELS:
+            raise ValueError(f"overlay level must be one of {OVERLAY_LEVELS}, got {value!r}")
+        self._level = value
+
+    def _plan(self, level: str, batch: np.ndarray) -> _Plan:
+        n = batch.shape[1]
+        plan = self._plans.get((level, n))
+        if plan is not None:
+            return plan
+        if level == "keypoints":
+            plan = _Plan("dots", np.array([i for i in KEYPOINTS if i < n], dtype=np.intp))
+        elif level == "contours":
+            # 닫힌 폴리라인, 열린 폴리라인 순서로 이어 붙여 각 폴리라인이 연속된 구간이 되도록 합니다.
+            polys = [p for p, c in CONTOURS if c and max(p) < n] + [p for p, c in CONTOURS if not c and max(p) < n]
+            n_closed = sum(1 for p, c in CONTOURS if c and max(p) < n)
+            ends = np.cumsum([len(p) for p in polys]).tolist()
+            spans = [slice(e - len(p), e) for p, e in zip(polys, ends)]
+            plan = _Plan("lines", np.array([i for p in polys for i in p], dtype=np.intp),
+                         closed=spans[:n_closed], open_=spans[n_closed:])
+        elif level == "mesh":
+            edges = self._tessellation
+            if edges is None or edges.max() >= n:
+                # mediapipe 연결 정보가 없으면 첫 얼굴의 468개 점으로 한 번 삼각분할해 재사용합니다.
+                base = min(n, 468)
+                edges = delaunay_edges(batch[0, :base, :2])
+            plan = _Plan("edges", np.ascontiguousarray(edges, dtype=np.intp).ravel())
+        else:
+            plan = _Plan("dots")
+        self._plans[(level, n)] = plan
+        return plan
+
+    def render(self, rgb: np.ndarray, batch: Optional[np.ndarray], width: Optional[int] = None,
+               height: Optional[int] = None) -> None:
+        """Draw the overlay for `batch` (normalized landmarks) onto `rgb` in place."""
+        level = self._level
+        if level == "none" or batch is None or not len(batch):
+            return
+        h, w = rgb.shape[:2]
+        width = w if width is None else width
+        height = h if height is None else height
+        plan = self._plan(level, batch)
+        f = batch.shape[0]
+        m = batch.shape[1] if plan.idx is None else plan.idx.shape[0]
+        if self._px.shape[0] < f * m:
+            self._px = np.empty((f * m, 2), dtype=np.int32)
+            self._fxy = np.empty(f * m * 2, dtype=np.float64)
+            self._lines.clear()
+            self._scale_wh = None
+        if self._scale_wh != (width, height):
+            self._scale = np.tile(np.array((width, height), dtype=np.float64), self._px.shape[0])
+            self._scale_wh = (width, height)
+        px = self._px[:f * m].reshape(f, m, 2)
+        fxy = self._fxy[:f * m * 2].reshape(f, m, 2)
+        if plan.idx is None:
+            np.copyto(fxy, batch[:, :, :2])
+        else:
+            if self._xyz.shape[0] < f * m * 3:
+                self._xyz = np.empty(f * m * 3, dtype=np.float32)
+            xyz = self._xyz[:f * m * 3].reshape(f, m, 3)
+            np.take(batch, plan.idx, axis=1, out=xyz, mode="clip")  # 인덱스는 계획에서 검사됨
+            np.copyto(fxy, xyz[:, :, :2])
+        # 정규화 좌표 * (w, h) 를 float64 로 계산해 int() 처럼 버림 (버퍼를 새로 만들지 않도록 단계별로)
+        np.multiply(fxy, self._scale[:f * m * 2].reshape(f, m, 2), out=fxy)
+        np.copyto(px, fxy, casting="unsafe")
+
+        if self.alpha >= 1.0:
+            self._draw(rgb, level, plan, px)
+            return
+        # 얼굴들을 감싸는 영역만 버퍼에 복사해 그린 뒤 한 번에 섞습니다.
+        pad = self.thickness + 2
+        x0, y0 = np.maximum(px.reshape(-1, 2).min(axis=0) - pad, 0).tolist()
+        x1, y1 = px.reshape(-1, 2).max(axis=0).tolist()
+        x1, y1 = min(x1 + pad, w), min(y1 + pad, h)
+        if x1 <= x0 or y1 <= y0:
+            return
+        if self._buf.shape[0] < y1 - y0 or self._buf.shape[1] < x1 - x0:
+            self._buf = np.empty((max(y1 - y0, self._buf.shape[0]), max(x1 - x0, self._buf.shape[1]), 3), np.uint8)
+        roi = rgb[y0:y1, x0:x1]
+        layer = self._buf[:y1 - y0, :x1 - x0]
+        np.copyto(layer, roi)
+        px[:, :, 0] -= x0
+        px[:, :, 1] -= y0
+        self._draw(layer, level, plan, px)
+        cv2.addWeighted(layer, self.alpha, roi, 1.0 - self.alpha, 0.0, dst=roi)
+
+    def _draw(self, image: np.ndarray, level: str, plan: _Plan, px: np.ndarray) -> None:
+        if plan.kind == "dots":
+            draw_landmark_points(image, px.reshape(-1, 2), self.color)
+        elif plan.kind == "lines":
+            # 폴리라인 view 목록은 _px 버퍼가 바뀔 때까지 (수준, 점 수, 얼굴 수)별로 재사용합니다.
+            key = (level, px.shape[1], px.shape[0])
+            lines = self._lines.get(key)
+            if lines is None:
+                lines = self._lines[key] = tuple([face[s] for face in px for s in spans]
+                                                 for spans in (plan.closed, plan.open))
+            for polys, closed in zip(lines, (True, False)):
+                if polys:
+                    cv2.polylines(image, polys, closed, self.color, self.thickness)
+        else:
+            cv2.polylines(image, px.reshape(-1, 2, 2), False, self.color, self.thickness)
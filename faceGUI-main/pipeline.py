@@ -0,0 +1,368 @@
+"""
+Threaded capture -> inference -> Tk pipeline for the live preview.
+
+The capture thread and the FaceMesh worker run off the Tk thread and are joined
+by bounded latest-frame-wins queues: when a consumer falls behind, the oldest
+item is dropped instead of building a backlog. Every stage keeps FPS and
+queue-depth counters so `PipelineStats.snapshot()` shows where time is lost.
+
+The capture thread mirrors each frame and converts it to RGB in a single
+pass (`mirror_to_rgb`) into a buffer from `FrameBufferPool`. That buffer is
+the FaceMesh input and, once inference is done, the canvas the overlay is
+drawn on and the Tk thread displays. It goes back to the pool when its
+packet is dropped by a queue or replaced on screen, so in steady state no
+frame-sized array is allocated.
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Tuple
+
+import cv2
+import logging
+import numpy as np
+
+from frame_sources import ThreadedSource
+
+logger = logging.getLogger("face01")
+
+
+class LatestQueue:
+    """Bounded queue that drops the oldest item when full (latest-frame-wins)."""
+
+    def __init__(self, maxsize: int = 1, on_drop: Optional[Callable[[Any], None]] = None):
+        self.maxsize = max(1, int(maxsize))
+        self.on_drop = on_drop  # 버려지거나 비워진 항목을 받습니다 (버퍼 반환용)
+        self._items = deque()
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item) -> None:
+        dropped = []
+        with self._cond:
+            while len(self._items) >= self.maxsize:
+                dropped.append(self._items.popleft())
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+        self._release(dropped)
+
+    def get(self, timeout: Optional[float] = None):
+        """Block up to `timeout` seconds; returns None if nothing arrived."""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def get_nowait(self):
+        with self._cond:
+            return self._items.popleft() if self._items else None
+
+    def clear(self) -> None:
+        with self._cond:
+            dropped = list(self._items)
+            self._items.clear()
+        self._release(dropped)
+
+    def _release(self, items) -> None:
+        if self.on_drop is not None:
+            for item in items:
+                self.on_drop(item)
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+
+class StageCounter:
+    """FPS counter over a sliding time window, safe to update from any thread."""
+
+    def __init__(self, name: str, window: float = 2.0):
+        self.name = name
+        self.window = window
+        self._stamps = deque()
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def tick(self, now: Optional[float] = None) -> None:
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            self._stamps.append(now)
+            self.total += 1
+            while self._stamps and now - self._stamps[0] > self.window:
+                self._stamps.popleft()
+
+    def fps(self) -> float:
+        now = time.perf_counter()
+        with self._lock:
+            while self._stamps and now - self._stamps[0] > self.window:
+                self._stamps.popleft()
+            n = len(self._stamps)
+            if n < 2:
+                return 0.0
+            span = self._stamps[-1] - self._stamps[0]
+            return (n - 1) / span if span > 0 else 0.0
+
+
+def mirror_to_rgb(frame: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Mirror a BGR frame left-right and convert it to RGB in one pass, into `out` when given."""
+    if frame.ndim != 3 or frame.shape[2] != 3:
+        # 흑백/BGRA 카메라: 먼저 BGR 로 (드문 경우라 할당을 허용)
+        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR if frame.ndim == 2 else cv2.COLOR_BGRA2BGR)
+    frame = np.ascontiguousarray(frame)
+    h, w = frame.shape[:2]
+    if out is None:
+        out = np.empty((h, w, 3), dtype=np.uint8)
+    # 한 행의 바이트를 거꾸로 놓으면 픽셀 순서(좌우 반전)와 채널 순서(BGR -> RGB)가 함께 뒤집힙니다.
+    cv2.flip(frame.reshape(h, w * 3), 1, dst=out.reshape(h, w * 3))
+    return out
+
+
+class FrameBufferPool:
+    """Frame buffers that are handed out and returned explicitly instead of allocated per frame.
+
+    `acquire(shape)` returns a free buffer of that shape, allocating a new one
+    only while fewer than `capacity` exist (None when all are in use).
+    Buffers of an old shape are dropped after a resolution change.
+    `allocations` / `allocated_bytes` count every buffer ever created.
+    """
+
+    def __init__(self, capacity: int = 6):
+        self.capacity = capacity
+        self._free = []
+        self._count = 0
+        self._shape: Optional[Tuple[int, ...]] = None
+        self._lock = threading.Lock()
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.exhausted = 0
+
+    def acquire(self, shape: Tuple[int, ...]) -> Optional[np.ndarray]:
+        shape = tuple(shape)
+        with self._lock:
+            if shape != self._shape:
+                self._shape = shape
+                self._count -= len(self._free)
+                self._free.clear()
+            if self._free:
+                return self._free.pop()
+            if self._count >= self.capacity:
+                self.exhausted += 1
+                return None
+            self._count += 1
+            self.allocations += 1
+            self.allocated_bytes += int(np.prod(shape))
+        return np.empty(shape, dtype=np.uint8)
+
+    def release(self, buf: Optional[np.ndarray]) -> None:
+        if buf is None:
+            return
+        with self._lock:
+            if buf.shape == self._shape:
+                self._free.append(buf)
+            else:
+                self._count -= 1
+
+    @property
+    def in_use(self) -> int:
+        with self._lock:
+            return self._count - len(self._free)
+
+
+@dataclass
+class FramePacket:
+    """A captured frame travelling through the pipeline."""
+    seq: int
+    t_capture: float
+    frame: Any                      # BGR, already mirrored (None when the capture stage filled `rgb`)
+    rgb: Any = None                 # mirrored RGB: FaceMesh input, then drawn on for display
+    landmarks: Any = None           # first face's (N, 3) landmark array or None
+    faces: list = field(default_factory=list)  # [(track_id, (N, 3) array), ...] for every face
+    analysis: Optional[str] = None
+    features: Any = None            # (F, n_features) scale-free features (features.FEATURE_TABLE order)
+    t_infer_done: float = 0.0
+    extra: dict = field(default_factory=dict)
+
+
+class PipelineStats:
+    """Per-stage FPS plus queue depths/drops for the status bar and the log."""
+
+    def __init__(self):
+        self.capture = StageCounter("capture")
+        self.inference = StageCounter("inference")
+        self.display = StageCounter("display")
+
+    def snapshot(self, frame_q: "LatestQueue", result_q: "LatestQueue", buffers: "FrameBufferPool") -> dict:
+        return {
+            "capture_fps": round(self.capture.fps(), 1),
+            "inference_fps": round(self.inference.fps(), 1),
+            "display_fps": round(self.display.fps(), 1),
+            "frame_q": len(frame_q),
+            "frame_q_dropped": frame_q.dropped,
+            "result_q": len(result_q),
+            "result_q_dropped": result_q.dropped,
+            "buffers": buffers.in_use,
+            "buffer_alloc_mb": round(buffers.allocated_bytes / 2**20, 1),
+        }
+
+
+class FramePipeline:
+    """Capture thread + inference worker feeding a Tk-side consumer.
+
+    `process_fn(packet)` runs on the worker thread; it draws on `packet.rgb`
+    and fills `packet.landmarks` and `packet.analysis`. The Tk thread calls
+    `latest_result()` from its `after` loop and only has to display it; the
+    packet's buffer is recycled when the next result replaces it.
+
+    `poll_interval()`, if given, is asked before every capture; while it
+    returns a positive number of seconds (idle mode) only one frame per
+    interval is read and processed.
+    """
+
+    def __init__(self, process_fn: Callable[[FramePacket], None], queue_size: int = 1, timer=None,
+                 poll_interval: Optional[Callable[[], float]] = None):
+        self.process_fn = process_fn
+        self.timer = timer  # optional profiler.StageTimer for capture.read / capture.convert
+        self.poll_interval = poll_interval
+        self._next_poll = 0.0
+        # 변환 중 1 + 각 큐 + 추론 중 1 + 화면에 표시 중 1, 여유 1
+        self.buffers = FrameBufferPool(capacity=2 * max(1, int(queue_size)) + 4)
+        self.frame_q = LatestQueue(queue_size, on_drop=self.recycle)
+        self.result_q = LatestQueue(queue_size, on_drop=self.recycle)
+        self._shown: Optional[FramePacket] = None
+        self._raw = None  # 스레드 없는 소스가 읽어 들이는 BGR 버퍼 (재사용)
+        self.stats = PipelineStats()
+        # FaceMesh graphs are not re-entrant; other callers (load_image) take this lock too.
+        self.mesh_lock = threading.Lock()
+        self._cap = None
+        self._cap_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._seq = 0
+        self._threads = []
+
+    # --- capture source -------------------------------------------------
+    def set_capture(self, cap) -> None:
+        """Swap the capture device; the previous one is released here."""
+        with self._cap_lock:
+            old, self._cap = self._cap, cap
+        if old is not None and old is not cap:
+            try:
+                old.release()
+            except Exception:
+                pass
+        self.frame_q.clear()
+
+    def capture_opened(self) -> bool:
+        with self._cap_lock:
+            return self._cap is not None and self._cap.isOpened()
+
+    # --- lifecycle -------------------------------------------------------
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="face01-capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="face01-inference", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+        logger.debug("FramePipeline started (queue_size=%s)", self.frame_q.maxsize)
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        self.set_capture(None)
+        logger.debug("FramePipeline stopped")
+
+    # --- Tk side ---------------------------------------------------------
+    def latest_result(self) -> Optional[FramePacket]:
+        """Non-blocking: newest processed frame, or None if nothing new."""
+        pkt = self.result_q.get_nowait()
+        if pkt is not None:
+            self.stats.display.tick()
+            # 화면에 있던 이전 프레임의 버퍼는 이제 다시 쓸 수 있습니다.
+            self.recycle(self._shown)
+            self._shown = pkt
+        return pkt
+
+    def snapshot(self) -> dict:
+        return self.stats.snapshot(self.frame_q, self.result_q, self.buffers)
+
+    # --- buffers ---------------------------------------------------------
+    def make_packet(self, frame: np.ndarray, seq: int, t_capture: float) -> Optional[FramePacket]:
+        """Mirror + convert a captured BGR frame into a pooled buffer; None if every buffer is in use."""
+        h, w = frame.shape[:2]
+        buf = self.buffers.acquire((h, w, 3))
+        if buf is None:
+            return None
+        return FramePacket(seq, t_capture, None, mirror_to_rgb(frame, out=buf))
+
+    def recycle(self, pkt: Optional[FramePacket]) -> None:
+        """Return the packet's pooled buffer (packets built elsewhere are ignored)."""
+        if pkt is not None and pkt.frame is None:
+            self.buffers.release(pkt.rgb)
+            pkt.rgb = None
+
+    # --- worker loops ----------------------------------------------------
+    def _capture_loop(self) -> None:
+        while not self._stop.is_set():
+            with self._cap_lock:
+                cap = self._cap
+            if cap is None or not cap.isOpened():
+                time.sleep(0.05)
+                continue
+            interval = self.poll_interval() if self.poll_interval is not None else 0.0
+            if isinstance(cap, ThreadedSource):
+                cap.poll_interval = interval  # 리더 스레드가 프레임 사이를 grab 만 하며 기다립니다.
+            elif interval > 0:
+                wait = self._next_poll - time.perf_counter()
+                if wait > 0:
+                    self._stop.wait(min(wait, 0.05))
+                    continue
+                self._next_poll = time.perf_counter() + interval
+            t0 = time.perf_counter()
+            try:
+                # ThreadedSource 는 자기 링 버퍼를 빌려주고, 나머지 소스는 같은 버퍼에 다시 읽어 들입니다.
+                if isinstance(cap, ThreadedSource) or self._raw is None:
+                    ret, frame = cap.read()
+                else:
+                    ret, frame = cap.read(self._raw)
+            except Exception:
+                ret, frame = False, None
+            if not ret or frame is None:
+                time.sleep(0.01)
+                continue
+            if not isinstance(cap, ThreadedSource):
+                self._raw = frame
+            t1 = time.perf_counter()
+            self._seq += 1
+            pkt = self.make_packet(frame, self._seq, time.perf_counter())  # 좌우 반전 (거울 모드) + RGB
+            if self.timer is not None:
+                self.timer.add("capture.read", (t1 - t0) * 1000.0)
+                self.timer.add("capture.convert", (time.perf_counter() - t1) * 1000.0)
+            if pkt is None:
+                continue
+            self.frame_q.put(pkt)
+            self.stats.capture.tick()
+
+    def _inference_loop(self) -> None:
+        while not self._stop.is_set():
+            pkt = self.frame_q.get(timeout=0.1)
+            if pkt is None:
+                continue
+            try:
+                with self.mesh_lock:
+                    self.process_fn(pkt)
+            except Exception as e:
+                logger.exception("FramePipeline: process_fn failed on frame %s: %s", pkt.seq, e)
+                self.recycle(pkt)
+                continue
+            pkt.t_infer_done = time.perf_counter()
+            self.result_q.put(pkt)
+            self.stats.inference.tick()
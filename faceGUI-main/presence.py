@@ -0,0 +1,164 @@
+"""
+Cheap face-presence gate in front of FaceMesh, and idle polling for an empty scene.
+
+While FaceMesh keeps finding a face the gate stays open and costs nothing.
+Once the face is gone, every frame is shrunk to a small grayscale thumbnail
+(reused buffers) and compared with the previous one. FaceMesh (478 refined
+landmarks) only runs again when:
+
+- enough of the thumbnail changed (motion) and, if OpenCV's bundled Haar
+  frontal-face cascade is available, it finds a face on the thumbnail, or
+- `recheck_interval` seconds (`idle_recheck_interval` while idle) passed
+  since the last FaceMesh run, a safety net for someone who stands
+  perfectly still or whom the cascade misses.
+
+After `idle_after` seconds without a face or motion the gate reports `idle`,
+and `poll_interval` asks the capture side to fetch only one frame every
+`idle_interval` seconds. Motion in a polled frame ends idle mode at once.
+
+    gate = PresenceGate()
+    if gate.check(rgb, t):
+        results = face_mesh.process(rgb)
+        gate.observe(bool(results.multi_face_landmarks), t)
+"""
+import logging
+import os
+import threading
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger("face01")
+
+def load_face_cascade():
+    """OpenCV's frontal-face Haar cascade, or None if this OpenCV build does not ship it."""
+    path = os.path.join(getattr(getattr(cv2, "data", None), "haarcascades", ""), "haarcascade_frontalface_default.xml")
+    if not hasattr(cv2, "CascadeClassifier") or not os.path.exists(path):
+        logger.info("PresenceGate: Haar cascade not available, using motion only")
+        return None
+    cascade = cv2.CascadeClassifier(path)
+    return None if cascade.empty() else cascade
+
+
+class PresenceGate:
+    """Decide per frame whether FaceMesh is worth running, and when to go idle.
+
+    width: thumbnail width (height follows the frame's aspect ratio).
+    pixel_threshold: grey-level change that counts a thumbnail pixel as moved.
+    motion_fraction: share of moved pixels that counts as motion.
+    recheck_interval: run FaceMesh at least this often (s) while searching.
+    idle_recheck_interval: the same while idle.
+    idle_after: seconds without a face or motion before going idle.
+    idle_interval: frame polling interval (s) while idle.
+    detector: True to confirm motion with the Haar cascade (if available),
+        False for motion only, or any object with OpenCV's
+        `detectMultiScale(gray, ...)` to use instead of the cascade.
+    """
+
+    def __init__(self, width: int = 160, pixel_threshold: int = 12, motion_fraction: float = 0.01,
+                 recheck_interval: float = 1.0, idle_recheck_interval: float = 3.0, idle_after: float = 5.0,
+                 idle_interval: float = 0.5, detector=True):
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.motion_fraction = motion_fraction
+        self.recheck_interval = recheck_interval
+        self.idle_recheck_interval = idle_recheck_interval
+        self.idle_after = idle_after
+        self.idle_interval = idle_interval
+        if isinstance(detector, bool):
+            self.cascade = load_face_cascade() if detector else None
+        else:
+            self.cascade = detector
+        self.state = "searching"   # "active" (얼굴 추적 중) / "searching" / "idle"
+        self._lock = threading.Lock()
+        self._small = None
+        self._gray = [None, None]   # 이전 / 현재 썸네일 (번갈아 사용)
+        self._cur = 0
+        self._has_prev = False
+        self._diff = None
+        self._last_mesh = float("-inf")
+        self._last_activity = None  # 마지막으로 얼굴이나 움직임을 본 시각
+        self.motion = 0.0
+        self.checked = self.gated = self.detections = 0
+
+    @property
+    def idle(self) -> bool:
+        return self.state == "idle"
+
+    @property
+    def poll_interval(self) -> float:
+        """Seconds between captured frames the pipeline should process (0 = every frame)."""
+        return self.idle_interval if self.state == "idle" else 0.0
+
+    def _thumbnail(self, rgb: np.ndarray) -> np.ndarray:
+        h, w = rgb.shape[:2]
+        size = (self.width, max(1, round(h * self.width / float(w))))
+        if self._small is None or self._small.shape[:2] != size[::-1]:
+            self._small = np.empty(size[::-1] + (3,), dtype=np.uint8)
+            self._gray = [np.empty(size[::-1], dtype=np.uint8) for _ in range(2)]
+            self._diff = np.empty(size[::-1], dtype=np.uint8)
+            self._has_prev = False
+        self._cur ^= 1
+        cv2.resize(rgb, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(self._small, cv2.COLOR_RGB2GRAY, dst=self._gray[self._cur])
+
+    def _moved(self, gray: np.ndarray) -> bool:
+        if not self._has_prev:
+            self._has_prev = True
+            self.motion = 1.0
+            return True
+        cv2.absdiff(gray, self._gray[self._cur ^ 1], dst=self._diff)
+        cv2.threshold(self._diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self._diff)
+        self.motion = cv2.countNonZero(self._diff) / float(self._diff.size)
+        return self.motion >= self.motion_fraction
+
+    def _detect(self, gray: np.ndarray) -> bool:
+        side = min(gray.shape[:2])
+        faces = self.cascade.detectMultiScale(gray, scaleFactor=1.15, minNeighbors=3,
+                                              minSize=(max(16, side // 6), max(16, side // 6)))
+        return len(faces) > 0
+
+    def check(self, rgb: np.ndarray, t: float) -> bool:
+        """True if FaceMesh should run on this frame (always while a face is being tracked)."""
+        with self._lock:
+            if self.state == "active":
+                return True
+            if self._last_activity is None:
+                self._last_activity = t
+            self.checked += 1
+            gray = self._thumbnail(rgb)
+            likely = False
+            if self._moved(gray):
+                self._last_activity = t
+                if self.state == "idle":
+                    logger.info("PresenceGate: motion, leaving idle mode")
+                    self.state = "searching"
+                likely = self.cascade is None or self._detect(gray)
+                self.detections += likely
+            elif self.state == "searching" and t - self._last_activity >= self.idle_after:
+                logger.info("PresenceGate: no face for %.0f s, idle polling every %.1f s",
+                            t - self._last_activity, self.idle_interval)
+                self.state = "idle"
+            recheck = self.idle_recheck_interval if self.state == "idle" else self.recheck_interval
+            if likely or t - self._last_mesh >= recheck:
+                self._last_mesh = t
+                return True
+            self.gated += 1
+            return False
+
+    def observe(self, found: bool, t: float) -> None:
+        """Report whether FaceMesh found a face on a frame `check` let through."""
+        with self._lock:
+            self._last_mesh = t
+            if found:
+                self.state = "active"
+                self._last_activity = t
+            elif self.state == "active":
+                # 얼굴을 놓친 직후에는 직전 썸네일이 오래됐으므로 비교를 새로 시작합니다.
+                self.state = "searching"
+                self._has_prev = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"state": self.state, "motion": round(self.motion, 4), "checked": self.checked,
+                    "gated": self.gated, "detections": self.detections, "detector": self.cascade is not None}
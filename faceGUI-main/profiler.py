@@ -0,0 +1,176 @@
+"""
+Per-stage timing with rolling percentiles, an on-video overlay, CSV/JSON
+export and on-demand cProfile captures.
+
+    timer = StageTimer()
+    with timer.stage("face_mesh.process"):
+        results = mesh.process(rgb)
+    timer.summary()  # {"face_mesh.process": {"n": .., "p50": .., "p95": .., "p99": .., ...}}
+
+`ProfileCapture` profiles the next N calls of a worker function with cProfile
+and dumps a `.prof` file that snakeviz / flameprof / gprof2dot can turn into a
+flamegraph.
+"""
+import cProfile
+import csv
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy as np
+
+SUMMARY_FIELDS = ("n", "mean", "p50", "p95", "p99", "max")
+
+
+class _Ring:
+    """Fixed-size float64 ring of the last `size` samples (no allocation per sample)."""
+
+    __slots__ = ("data", "pos", "count")
+
+    def __init__(self, size: int):
+        self.data = np.empty(max(1, int(size)), dtype=np.float64)
+        self.pos = 0
+        self.count = 0
+
+    def append(self, value: float) -> None:
+        self.data[self.pos] = value
+        self.pos = (self.pos + 1) % self.data.shape[0]
+        if self.count < self.data.shape[0]:
+            self.count += 1
+
+    def values(self) -> np.ndarray:
+        """Copy of the stored samples (not in time order; only order-free statistics are taken)."""
+        return self.data[:self.count].copy()
+
+
+class StageTimer:
+    """Rolling window of durations (ms) per named stage; safe to use from several threads."""
+
+    def __init__(self, window: int = 600):
+        self.window = window  # 새로 생기는 단계의 창 크기 (reset() 뒤에 바꿀 수 있음)
+        self._samples = OrderedDict()
+        self._lock = threading.Lock()
+        self.enabled = True
+
+    def add(self, name: str, ms: float) -> None:
+        with self._lock:
+            buf = self._samples.get(name)
+            if buf is None:
+                buf = self._samples[name] = _Ring(self.window)
+            buf.append(ms)
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - t0) * 1000.0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self) -> "OrderedDict[str, dict]":
+        """Per-stage n / mean / p50 / p95 / p99 / max in milliseconds, in first-seen order."""
+        with self._lock:
+            snap = [(name, buf.values()) for name, buf in self._samples.items()]
+        out = OrderedDict()
+        for name, arr in snap:
+            if not arr.size:
+                continue
+            p50, p95, p99 = np.percentile(arr, (50, 95, 99))
+            out[name] = {"n": int(arr.size), "mean": float(arr.mean()), "p50": float(p50),
+                         "p95": float(p95), "p99": float(p99), "max": float(arr.max())}
+        return out
+
+    def export_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"generated": time.time(), "window": self.window, "stages": self.summary()}, f, indent=2)
+
+    def export_csv(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(("stage",) + SUMMARY_FIELDS)
+            for name, s in self.summary().items():
+                w.writerow([name] + [s["n"]] + [f"{s[k]:.3f}" for k in SUMMARY_FIELDS[1:]])
+
+    def format_lines(self, stages: Optional[list] = None) -> list:
+        """Short text lines ("stage  p50/p95/p99 ms") for an overlay or side panel."""
+        lines = []
+        for name, s in self.summary().items():
+            if stages is not None and name not in stages:
+                continue
+            lines.append(f"{name:<18}{s['p50']:6.1f}{s['p95']:6.1f}{s['p99']:6.1f}")
+        return lines
+
+
+def draw_overlay(rgb: np.ndarray, lines, origin=(8, 18), line_height: int = 16) -> None:
+    """Draw profiler lines on the frame over a dark band so they stay readable."""
+    import cv2
+
+    if not lines:
+        return
+    x, y = origin
+    width = min(rgb.shape[1] - x, 8 + 8 * max(len(line) for line in lines))
+    band = rgb[y - 14:y - 14 + line_height * (len(lines) + 1) + 4, x - 4:x - 4 + width]
+    band //= 3  # 배경을 어둡게 (제자리 연산, 추가 할당 없음)
+    header = f"{'stage (ms)':<18}{'p50':>6}{'p95':>6}{'p99':>6}"
+    for i, line in enumerate([header] + list(lines)):
+        cv2.putText(rgb, line, (x, y + i * line_height), cv2.FONT_HERSHEY_PLAIN, 0.9, (255, 255, 0), 1, cv2.LINE_AA)
+
+
+class ProfileCapture:
+    """cProfile the next `frames` calls wrapped by `run`, then dump to `path`."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profile = None
+        self._remaining = 0
+        self._path = None
+        self.last_path = None
+
+    @property
+    def active(self) -> bool:
+        return self._remaining > 0
+
+    def start(self, frames: int, path: str) -> None:
+        with self._lock:
+            self._profile = cProfile.Profile()
+            self._remaining = int(frames)
+            self._path = path
+
+    def stop(self) -> None:
+        """Cancel the active capture without writing a file."""
+        with self._lock:
+            self._profile = None
+            self._remaining = 0
+
+    def run(self, fn, *args, **kwargs):
+        """Call `fn`; profiled while a capture is active (must run on the profiled thread)."""
+        if not self._remaining:
+            return fn(*args, **kwargs)
+        # start()/stop() 가 다른 스레드에서 캡처를 바꿀 수 있으므로 잠금 안에서 한 번만 읽습니다.
+        with self._lock:
+            prof = self._profile
+        if prof is None:
+            return fn(*args, **kwargs)
+        prof.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            prof.disable()
+            with self._lock:
+                # 그 사이 취소되었거나 새 캡처가 시작됐다면 이 프레임은 세지 않습니다.
+                if self._profile is prof:
+                    self._remaining -= 1
+                    if self._remaining == 0:
+                        prof.dump_stats(self._path)
+                        self.last_path = self._path
+                        self._profile = None
@@ -0,0 +1,124 @@
+"""
+Tk render helpers for the live preview.
+
+`FrameRenderer` keeps one persistent PhotoImage on the video label and blits
+each new frame into it in place, instead of building a new PIL image, a new
+PhotoImage and reconfiguring the label every frame. The label is only
+reconfigured when the frame size changes. Two blit paths are available:
+
+- "paste": `ImageTk.PhotoImage.paste` of an RGBA image. PIL stores RGB
+  pixels in 4 bytes, so the frame is widened once with cv2 into a reused
+  RGBA buffer and wrapped by `Image.frombuffer` without another copy; PIL's
+  Tk extension then copies that block straight into the Tk photo.
+- "ppm": a binary PPM (header + raw RGB bytes) handed to Tk's own
+  `PhotoImage` decoder; used automatically when PIL's Tk extension is missing.
+
+`CachedText` / `CachedVar` push a string to a Text widget or a StringVar only
+when it differs from what is already shown.
+"""
+import tkinter as tk
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+
+def to_pil(rgb: np.ndarray, rgba_out: Optional[np.ndarray] = None) -> Image.Image:
+    """RGBA PIL image of an (H, W, 3) frame, backed by `rgba_out` when its shape fits.
+
+    The returned image shares memory with the buffer, so it is only valid
+    until the buffer is written again.
+    """
+    h, w = rgb.shape[:2]
+    if rgba_out is None or rgba_out.shape != (h, w, 4):
+        rgba_out = np.empty((h, w, 4), dtype=np.uint8)
+    cv2.cvtColor(rgb, cv2.COLOR_RGB2RGBA, dst=rgba_out)
+    return Image.frombuffer("RGBA", (w, h), rgba_out, "raw", "RGBA", 0, 1)
+
+
+def ppm_bytes(rgb: np.ndarray) -> bytes:
+    h, w = rgb.shape[:2]
+    return b"P6 %d %d 255\n" % (w, h) + np.ascontiguousarray(rgb).tobytes()
+
+
+class FrameRenderer:
+    """Show RGB frames on a Tk label through a single, reused PhotoImage."""
+
+    def __init__(self, label, mode: str = "paste"):
+        self.label = label
+        self.mode = mode
+        self._photo = None
+        self._size: Optional[Tuple[int, int]] = None
+        self._blank_key = None   # (w, h, color) of the blank frame currently shown
+        self._blank = {}         # (w, h, color) -> cached blank array
+        self._rgba = None        # paste 경로의 재사용 RGBA 버퍼
+
+    def _ensure_photo(self, w: int, h: int) -> None:
+        if self._photo is not None and self._size == (w, h):
+            return
+        if self.mode == "paste":
+            self._photo = ImageTk.PhotoImage("RGBA", (w, h))
+            self._rgba = np.empty((h, w, 4), dtype=np.uint8)
+        else:
+            self._photo = tk.PhotoImage(width=w, height=h)
+        self._size = (w, h)
+        self.label.configure(image=self._photo)
+        self.label.imgtk = self._photo  # 참조 유지 (GC 방지)
+
+    def show(self, rgb: np.ndarray) -> None:
+        h, w = rgb.shape[:2]
+        self._ensure_photo(w, h)
+        self._blank_key = None
+        if self.mode == "paste":
+            try:
+                self._photo.paste(to_pil(rgb, self._rgba))
+                return
+            except tk.TclError:
+                # PIL의 Tk 확장(_imagingtk)을 쓸 수 없는 환경: Tk 내장 PPM 디코더로 전환
+                self.mode = "ppm"
+                self._photo = None
+                self._ensure_photo(w, h)
+        self._photo.configure(data=ppm_bytes(rgb), format="PPM")
+
+    def show_blank(self, width: int, height: int, color=(120, 120, 120)) -> None:
+        """Gray placeholder; drawn once and skipped while it is already on screen."""
+        key = (width, height, tuple(color))
+        if self._blank_key == key:
+            return
+        blank = self._blank.get(key)
+        if blank is None:
+            blank = self._blank[key] = np.full((height, width, 3), color, dtype=np.uint8)
+        self.show(blank)
+        self._blank_key = key
+
+
+class CachedText:
+    """Replace a Text widget's contents only when the string actually changes."""
+
+    def __init__(self, widget, initial: Optional[str] = None):
+        self.widget = widget
+        self.current = initial
+
+    def set(self, text: str) -> bool:
+        if text == self.current:
+            return False
+        self.widget.delete(1.0, tk.END)
+        self.widget.insert(tk.END, text)
+        self.current = text
+        return True
+
+
+class CachedVar:
+    """StringVar wrapper that skips `set` calls with an unchanged value."""
+
+    def __init__(self, var):
+        self.var = var
+        self.current = var.get()
+
+    def set(self, value: str) -> bool:
+        if value == self.current:
+            return False
+        self.var.set(value)
+        self.current = value
+        return True
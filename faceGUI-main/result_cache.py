@@ -0,0 +1,166 @@
+"""
+Persistent on-disk cache for still-image analysis results.
+
+Entries are keyed by a BLAKE2b hash of the image file bytes plus the FaceMesh
+settings (`hash_file`, batch CLI), or of the file's path, size and mtime plus
+the settings (`stat_key`, GUI: one stat instead of reading the file on the Tk
+thread). They are stored as small uncompressed `.npz` files (landmark array,
+per-face analysis text, image size and an optional encoded preview). The
+cache is bounded by total size and evicts least-recently-used entries, using
+file mtimes as the access clock so several processes can share a directory.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger("face01")
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".face01_cache")
+
+
+def hash_file(path, settings: dict, chunk_size: int = 1 << 20) -> str:
+    """Cache key: hash of the file bytes plus the (JSON-serialised) settings."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(json.dumps({"v": CACHE_VERSION, **settings}, sort_keys=True, default=str).encode("utf-8"))
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def stat_key(path, settings: dict) -> str:
+    """Cache key from the file's absolute path, size and mtime plus the settings (one stat, no read)."""
+    st = os.stat(path)
+    h = hashlib.blake2b(digest_size=20)
+    h.update(json.dumps({"v": CACHE_VERSION, "path": os.path.abspath(path), "size": st.st_size,
+                         "mtime_ns": st.st_mtime_ns, **settings}, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+class CachedResult:
+    """One cache entry: landmarks (F, N, 3), per-face analysis texts, source size, preview bytes."""
+
+    __slots__ = ("landmarks", "analyses", "width", "height", "preview")
+
+    def __init__(self, landmarks: np.ndarray, analyses, width: int, height: int, preview: Optional[bytes] = None):
+        self.landmarks = landmarks
+        self.analyses = list(analyses)
+        self.width = width
+        self.height = height
+        self.preview = preview
+
+
+class ResultCache:
+    """Size-bounded LRU cache of `CachedResult`s in a directory."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        # 매 put마다 디렉터리를 스캔하지 않도록 대략적인 총 크기를 추적합니다.
+        self._approx_bytes = self._scan()[1]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                entry = CachedResult(
+                    landmarks=data["landmarks"],
+                    analyses=data["analyses"].tolist(),
+                    width=int(data["size"][0]),
+                    height=int(data["size"][1]),
+                    preview=data["preview"].tobytes() if data["preview"].size else None,
+                )
+            os.utime(path)  # LRU: 접근 시각 갱신
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            # 손상된 항목은 지우고 miss로 처리
+            logger.warning("ResultCache: dropping unreadable entry %s: %s", path, e)
+            self._remove(path)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: CachedResult) -> None:
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                np.savez(
+                    f,
+                    landmarks=np.asarray(entry.landmarks, dtype=np.float32),
+                    analyses=np.array(entry.analyses, dtype=str),
+                    size=np.array([entry.width, entry.height], dtype=np.int32),
+                    preview=np.frombuffer(entry.preview or b"", dtype=np.uint8),
+                )
+            try:
+                old = os.path.getsize(path)  # 같은 키를 덮어쓰면 차이만 더합니다
+            except OSError:
+                old = 0
+            os.replace(tmp, path)
+            size = os.path.getsize(path) - old
+        except Exception as e:
+            logger.warning("ResultCache: failed to store %s: %s", key, e)
+            self._remove(tmp)
+            return
+        with self._lock:
+            self._approx_bytes += size
+            over = self._approx_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def _scan(self):
+        """List (mtime, size, path) of all entries and their total size."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for de in it:
+                if not de.name.endswith(".npz"):
+                    continue
+                try:
+                    st = de.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, de.path))
+                total += st.st_size
+        return entries, total
+
+    def evict(self, low_watermark: float = 0.9) -> int:
+        """Delete least-recently-used entries until the cache is under
+        `low_watermark * max_bytes`; returns bytes freed."""
+        with self._lock:
+            entries, total = self._scan()
+            freed = 0
+            if total > self.max_bytes:
+                target = self.max_bytes * low_watermark
+                for _, size, path in sorted(entries):
+                    if total - freed <= target:
+                        break
+                    if self._remove(path):
+                        freed += size
+                logger.debug("ResultCache: evicted %s bytes (total was %s)", freed, total)
+            self._approx_bytes = total - freed
+            return freed
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
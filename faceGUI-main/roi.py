@@ -0,0 +1,120 @@
+"""
+Region-of-interest cropping and downscaled inference.
+
+`RoiTracker` crops a square around the previous frame's face (plus margin),
+resizes it to a fixed inference size and maps the resulting normalized
+landmarks back to full-frame normalized coordinates, so drawing and
+`analyze_physiognomy_mp` keep working in full-frame pixels. When the face is
+lost it falls back to (optionally downscaled) full-frame detection.
+"""
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# (x0, y0, crop_w, crop_h, frame_w, frame_h) in full-frame pixels
+Transform = Tuple[int, int, int, int, int, int]
+
+
+def _reuse(buf: Optional[np.ndarray], shape) -> np.ndarray:
+    """`buf` if it already has `shape`, otherwise a new uint8 array."""
+    return buf if buf is not None and buf.shape == tuple(shape) else np.empty(shape, dtype=np.uint8)
+
+
+def downscale_for_inference(rgb: np.ndarray, max_side: Optional[int], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Shrink `rgb` so its longer side is at most `max_side`, keeping the aspect ratio.
+
+    Normalized landmarks are the same on the shrunk image, so no re-projection
+    is needed afterwards. The result is written into `out` when its shape fits.
+    """
+    h, w = rgb.shape[:2]
+    if not max_side or max(h, w) <= max_side:
+        return rgb
+    scale = max_side / float(max(h, w))
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    if out is not None and out.shape != (size[1], size[0]) + rgb.shape[2:]:
+        out = None
+    return cv2.resize(rgb, size, dst=out, interpolation=cv2.INTER_AREA)
+
+
+class RoiTracker:
+    """Track the face box across frames and prepare cropped inference inputs.
+
+    margin: extra border around the landmark box, as a fraction of its larger side.
+    roi_size: side of the square inference input while tracking (None = no resize).
+    full_max_side: downscale bound for full-frame detection when tracking is lost.
+    """
+
+    def __init__(self, margin: float = 0.4, roi_size: Optional[int] = 256,
+                 full_max_side: Optional[int] = 640, min_box: int = 48):
+        self.margin = margin
+        self.roi_size = roi_size
+        self.full_max_side = full_max_side
+        self.min_box = min_box
+        self.box = None  # (x0, y0, side) of the current square ROI, full-frame pixels
+        self.lost = 0
+        # 추론 입력 버퍼 (prepare 의 결과는 다음 prepare 호출 전까지만 유효)
+        self._crop = None
+        self._full = None
+
+    def reset(self) -> None:
+        self.box = None
+
+    def prepare(self, rgb: np.ndarray) -> Tuple[np.ndarray, Transform]:
+        """Return (inference_input, transform) for this frame; the input buffer is reused next frame."""
+        h, w = rgb.shape[:2]
+        if self.box is None:
+            small = downscale_for_inference(rgb, self.full_max_side, out=self._full)
+            if small is not rgb:
+                self._full = small
+            return small, (0, 0, w, h, w, h)
+        x0, y0, side = self.box
+        crop = rgb[y0:y0 + side, x0:x0 + side]
+        if self.roi_size and side != self.roi_size:
+            interp = cv2.INTER_AREA if side > self.roi_size else cv2.INTER_LINEAR
+            self._crop = _reuse(self._crop, (self.roi_size, self.roi_size) + rgb.shape[2:])
+            crop = cv2.resize(crop, (self.roi_size, self.roi_size), dst=self._crop, interpolation=interp)
+        else:
+            # MediaPipe needs a contiguous buffer
+            self._crop = _reuse(self._crop, crop.shape)
+            np.copyto(self._crop, crop)
+            crop = self._crop
+        return crop, (x0, y0, side, side, w, h)
+
+    @staticmethod
+    def reproject(arr: np.ndarray, transform: Transform) -> np.ndarray:
+        """Map crop-normalized landmarks to full-frame-normalized ones, in place."""
+        x0, y0, cw, ch, w, h = transform
+        if (x0, y0, cw, ch) == (0, 0, w, h):
+            return arr
+        arr[:, 0] *= cw / w
+        arr[:, 0] += x0 / w
+        arr[:, 1] *= ch / h
+        arr[:, 1] += y0 / h
+        # z는 x와 같은 스케일이므로 x 배율만 적용
+        arr[:, 2] *= cw / w
+        return arr
+
+    def update(self, arr: Optional[np.ndarray], frame_w: int, frame_h: int) -> None:
+        """Update the ROI from full-frame-normalized landmarks (None = face lost)."""
+        if arr is None:
+            self.lost += 1
+            self.box = None
+            return
+        self.lost = 0
+        # 최소/최대를 먼저 구하고 배율을 곱합니다 (같은 값, 열 전체의 임시 배열 없음).
+        xs, ys = arr[:, 0], arr[:, 1]
+        bx0, bx1 = float(xs.min() * frame_w), float(xs.max() * frame_w)
+        by0, by1 = float(ys.min() * frame_h), float(ys.max() * frame_h)
+        side = max(bx1 - bx0, by1 - by0)
+        side = int(side * (1.0 + 2.0 * self.margin))
+        side = max(side, self.min_box)
+        if side >= min(frame_w, frame_h):
+            # 얼굴이 화면 대부분을 차지하면 전체 프레임을 사용
+            self.box = None
+            return
+        cx, cy = (bx0 + bx1) / 2.0, (by0 + by1) / 2.0
+        # 프레임 밖으로 나가지 않도록 크기는 유지한 채 위치만 밀어 넣습니다.
+        x0 = int(min(max(cx - side / 2.0, 0), frame_w - side))
+        y0 = int(min(max(cy - side / 2.0, 0), frame_h - side))
+        self.box = (x0, y0, side)
@@ -0,0 +1,144 @@
+"""
+Adaptive inference scheduling for the live preview.
+
+`AdaptiveScheduler` decides, frame by frame, whether to run full FaceMesh
+inference. It keeps an EMA of the measured `process` time and picks the
+smallest inference interval (run every Nth frame) whose amortized cost stays
+within the configured per-frame budget, backing off when over budget and
+speeding up again when there is headroom. `LandmarkPredictor` fills the
+skipped frames by holding or linearly extrapolating the last landmarks.
+"""
+import threading
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+
+class AdaptiveScheduler:
+    """Run inference every `interval` frames, adapting `interval` to a latency budget.
+
+    budget_ms: inference time allowed per captured frame (amortized).
+    headroom: only speed up when the faster interval would use less than this
+              fraction of the budget (hysteresis against oscillation).
+    cooldown: inferences to wait between two interval changes.
+    """
+
+    def __init__(self, budget_ms: float = 25.0, min_interval: int = 1, max_interval: int = 8,
+                 headroom: float = 0.7, ema_alpha: float = 0.2, cooldown: int = 3, window: int = 120):
+        self.budget_ms = float(budget_ms)
+        self.min_interval = max(1, int(min_interval))
+        self.max_interval = max(self.min_interval, int(max_interval))
+        self.headroom = headroom
+        self.ema_alpha = ema_alpha
+        self.cooldown = cooldown
+        self.interval = self.min_interval
+        self.process_ms = None          # EMA of inference time
+        self._since_infer = self.interval  # so the very first frame is inferred
+        self._since_change = 0
+        self._history = deque(maxlen=window)  # True = inferred, False = skipped
+        self._lock = threading.Lock()
+
+    def should_infer(self, force: bool = False) -> bool:
+        """Call once per frame; True means run FaceMesh on this frame."""
+        with self._lock:
+            self._since_infer += 1
+            run = force or self._since_infer >= self.interval
+            if run:
+                self._since_infer = 0
+            self._history.append(run)
+            return run
+
+    def record(self, process_ms: float) -> None:
+        """Feed back the measured inference time and adapt the interval."""
+        with self._lock:
+            if self.process_ms is None:
+                self.process_ms = float(process_ms)
+            else:
+                self.process_ms += self.ema_alpha * (process_ms - self.process_ms)
+            self._since_change += 1
+            if self._since_change < self.cooldown:
+                return
+            cost = self.process_ms / self.interval
+            if cost > self.budget_ms and self.interval < self.max_interval:
+                self.interval += 1
+                self._since_change = 0
+            elif (self.interval > self.min_interval
+                  and self.process_ms / (self.interval - 1) < self.budget_ms * self.headroom):
+                self.interval -= 1
+                self._since_change = 0
+
+    @property
+    def skip_ratio(self) -> float:
+        with self._lock:
+            if not self._history:
+                return 0.0
+            return 1.0 - sum(self._history) / len(self._history)
+
+    def snapshot(self) -> dict:
+        return {
+            "interval": self.interval,
+            "skip_ratio": round(self.skip_ratio, 3),
+            "process_ms": None if self.process_ms is None else round(self.process_ms, 1),
+            "budget_ms": self.budget_ms,
+        }
+
+
+class LandmarkPredictor:
+    """Supplies landmarks for frames where inference was skipped.
+
+    mode "hold" reuses the last result; "linear" extrapolates from the last two
+    results by their timestamps, clamped to one inference gap ahead.
+    """
+
+    def __init__(self, mode: str = "linear", max_age: float = 0.5):
+        if mode not in ("hold", "linear"):
+            raise ValueError(f"unknown predictor mode: {mode}")
+        self.mode = mode
+        self.max_age = max_age
+        self._last = None
+        self._prev = None
+        self._t_last = 0.0
+        self._t_prev = 0.0
+        self._key = None
+
+    def reset(self) -> None:
+        self._last = self._prev = None
+
+    def update(self, arr: Optional[np.ndarray], t: float, key=None) -> None:
+        """Store a fresh inference result (None when no face was found).
+
+        `key` identifies what the rows are (e.g. the face track IDs); velocity is
+        only estimated between two results with the same key and shape.
+        """
+        if arr is None:
+            self.reset()
+            return
+        # 밀려나는 배열을 새 결과의 저장소로 다시 써서 프레임마다 복사본을 만들지 않습니다.
+        if self._last is not None and self._last.shape == arr.shape and key == self._key:
+            spare = self._prev
+            self._prev, self._t_prev = self._last, self._t_last
+        else:
+            spare, self._prev = self._last, None
+        if spare is None or spare.shape != arr.shape or spare.dtype != arr.dtype:
+            spare = np.empty_like(arr)
+        np.copyto(spare, arr)
+        self._last, self._t_last, self._key = spare, t, key
+
+    def predict(self, t: float, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Landmarks for time `t`, or None if there is nothing recent to reuse."""
+        if self._last is None or t - self._t_last > self.max_age:
+            return None
+        if out is None or out.ndim != self._last.ndim or any(o < d for o, d in zip(out.shape, self._last.shape)):
+            out = np.empty_like(self._last)
+        view = out[tuple(slice(0, d) for d in self._last.shape)]
+        gap = self._t_last - self._t_prev
+        if self.mode == "hold" or self._prev is None or gap <= 0:
+            view[:] = self._last
+            return view
+        alpha = min((t - self._t_last) / gap, 1.0)
+        # last + (last - prev) * alpha, computed in place
+        np.subtract(self._last, self._prev, out=view)
+        view *= alpha
+        view += self._last
+        return view
@@ -0,0 +1,352 @@
+"""
+Headless analysis service: HTTP uploads and WebSocket frame streams on localhost.
+
+    python server.py --port 8765 -j 4
+    python loadtest_client.py --mode http --concurrency 16 --duration 20
+
+Endpoints
+    POST /analyze   body = one encoded image (JPEG/PNG/...), reply = binary result
+    GET  /stream    WebSocket; each binary message is one encoded frame, each reply a binary result
+    GET  /metrics   JSON throughput, latency percentiles, queue depth, rejections
+    GET  /health    "ok"
+
+Binary result layout (`encode_result` / `decode_result`):
+    uint32 little-endian header length | UTF-8 JSON header | float32 landmarks (faces, points, 3)
+The header carries faces, points, width, height, analyses (the same strings as
+`analyze_physiognomy_mp`, one per face), latency_ms and, for streams, seq.
+
+FaceMesh runs on a process pool (one model per worker). Requests are queued
+in a bounded queue and grouped into small batches (up to --max-batch within
+--batch-window-ms) so each pool round trip carries several images. When the
+queue is full, HTTP requests get 503 with Retry-After. A WebSocket stream
+keeps only its newest unprocessed frame, so a fast sender has older frames
+dropped instead of building up latency. The counts are reported in /metrics.
+
+Requires aiohttp (pip install aiohttp).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from face_analysis import analyze_faces, create_face_mesh, landmarks_to_array
+from pipeline import StageCounter
+from profiler import StageTimer
+
+logger = logging.getLogger("face01.server")
+
+_HEADER = struct.Struct("<I")
+
+
+# --- wire format ---------------------------------------------------------
+
+def encode_result(header: dict, landmarks: Optional[np.ndarray]) -> bytes:
+    """Header JSON plus raw float32 landmarks; `header` gets faces/points filled in."""
+    if landmarks is None:
+        landmarks = np.zeros((0, 0, 3), dtype=np.float32)
+    landmarks = np.ascontiguousarray(landmarks, dtype=np.float32)
+    header = dict(header, faces=int(landmarks.shape[0]), points=int(landmarks.shape[1]))
+    head = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(len(head)) + head + landmarks.tobytes()
+
+
+def decode_result(data: bytes) -> Tuple[dict, np.ndarray]:
+    """Inverse of `encode_result`: (header, (faces, points, 3) float32 array)."""
+    (n,) = _HEADER.unpack_from(data)
+    header = json.loads(data[_HEADER.size:_HEADER.size + n].decode("utf-8"))
+    landmarks = np.frombuffer(data, dtype=np.float32, offset=_HEADER.size + n)
+    return header, landmarks.reshape(header["faces"], header["points"], 3)
+
+
+# --- worker processes ------------------------------------------------------
+
+_worker_mesh = None
+
+
+def _init_worker(max_num_faces: int, refine_landmarks: bool, synthetic: bool) -> None:
+    """Pool initializer: one FaceMesh per worker process (static image mode)."""
+    global _worker_mesh
+    if synthetic:
+        from face_analysis import SyntheticMesh
+        _worker_mesh = SyntheticMesh(max_num_faces, seed=os.getpid())
+    else:
+        _worker_mesh = create_face_mesh(static_image_mode=True, max_num_faces=max_num_faces,
+                                        refine_landmarks=refine_landmarks)
+
+
+def _analyze_blobs(blobs: List[bytes]) -> list:
+    """Worker: decode and analyze a batch of encoded images.
+
+    Returns one (landmarks bytes, faces, points, width, height, analyses, error, ms) tuple per blob.
+    """
+    import cv2
+    from roi import downscale_for_inference
+
+    out = []
+    for blob in blobs:
+        t0 = time.perf_counter()
+        try:
+            bgr = cv2.imdecode(np.frombuffer(blob, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if bgr is None:
+                raise ValueError("cannot decode image")
+            rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+            h, w = rgb.shape[:2]
+            results = _worker_mesh.process(downscale_for_inference(rgb, 1280))
+            faces = results.multi_face_landmarks if results else None
+            if faces:
+                batch = np.stack([landmarks_to_array(lm) for lm in faces])
+                analyses = analyze_faces(batch, w, h)
+                out.append((batch.tobytes(), batch.shape[0], batch.shape[1], w, h, analyses, None,
+                            (time.perf_counter() - t0) * 1000.0))
+            else:
+                out.append((b"", 0, 0, w, h, [], None, (time.perf_counter() - t0) * 1000.0))
+        except Exception as e:
+            out.append((b"", 0, 0, 0, 0, [], str(e), (time.perf_counter() - t0) * 1000.0))
+    return out
+
+
+# --- server ----------------------------------------------------------------
+
+class _Job:
+    __slots__ = ("blob", "future", "t_enqueued")
+
+    def __init__(self, blob: bytes, future: asyncio.Future):
+        self.blob = blob
+        self.future = future
+        self.t_enqueued = time.perf_counter()
+
+
+class AnalysisServer:
+    """Bounded queue -> micro-batcher -> process pool, shared by HTTP and WebSocket clients."""
+
+    def __init__(self, workers: int = 2, max_queue: int = 64, max_batch: int = 8, batch_window_ms: float = 5.0,
+                 max_num_faces: int = 1, refine_landmarks: bool = True, synthetic: bool = False):
+        self.workers = max(1, workers)
+        self.max_batch = max(1, max_batch)
+        self.batch_window = batch_window_ms / 1000.0
+        self.queue: Optional[asyncio.Queue] = None
+        self._max_queue = max_queue
+        self._pool_args = (max_num_faces, refine_landmarks, synthetic)
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.timer = StageTimer(window=2000)
+        self.throughput = StageCounter("results", window=5.0)
+        self.counts = {"requests": 0, "completed": 0, "errors": 0, "rejected": 0, "stream_dropped": 0,
+                       "batches": 0, "batched_items": 0, "streams": 0}
+        self._t_start = time.perf_counter()
+        self._batcher_task = None
+        self._slots = None
+
+    # --- lifecycle ---
+    async def start(self, app=None) -> None:
+        self.queue = asyncio.Queue(self._max_queue)
+        # 풀에 동시에 보내는 배치 수를 제한해 큐가 차면 새 요청을 거절하게 합니다 (back-pressure).
+        self._slots = asyncio.Semaphore(self.workers * 2)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                        initargs=self._pool_args)
+        # 모델 로딩을 첫 요청 전에 끝내 둡니다.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.pool, _analyze_blobs, []) for _ in range(self.workers)])
+        self._batcher_task = asyncio.create_task(self._batcher())
+        logger.info("AnalysisServer ready (%s workers, batch<=%s)", self.workers, self.max_batch)
+
+    async def stop(self, app=None) -> None:
+        if self._batcher_task is not None:
+            self._batcher_task.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    # --- queueing ---
+    def submit_nowait(self, blob: bytes) -> asyncio.Future:
+        """Queue one image; raises asyncio.QueueFull when the server is saturated."""
+        fut = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(_Job(blob, fut))
+        self.counts["requests"] += 1
+        return fut
+
+    async def submit(self, blob: bytes) -> asyncio.Future:
+        """Queue one image, waiting for room (used by streams, which drop frames upstream instead)."""
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put(_Job(blob, fut))
+        self.counts["requests"] += 1
+        return fut
+
+    async def _batcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(jobs) < self.max_batch:
+                try:
+                    jobs.append(self.queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    jobs.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._slots.acquire()
+            t_submit = time.perf_counter()
+            for job in jobs:
+                self.timer.add("queue_wait", (t_submit - job.t_enqueued) * 1000.0)
+            self.counts["batches"] += 1
+            self.counts["batched_items"] += len(jobs)
+            fut = loop.run_in_executor(self.pool, _analyze_blobs, [j.blob for j in jobs])
+            fut.add_done_callback(lambda f, jobs=jobs: self._finish(jobs, f))
+
+    def _finish(self, jobs, fut) -> None:
+        self._slots.release()
+        now = time.perf_counter()
+        try:
+            results = fut.result()
+        except Exception as e:
+            logger.exception("AnalysisServer: worker batch failed: %s", e)
+            results = [(b"", 0, 0, 0, 0, [], f"worker failed: {e}", 0.0)] * len(jobs)
+        for job, res in zip(jobs, results):
+            self.timer.add("inference", res[7])
+            self.timer.add("total", (now - job.t_enqueued) * 1000.0)
+            self.counts["errors" if res[6] else "completed"] += 1
+            self.throughput.tick(now)
+            if not job.future.done():
+                job.future.set_result((res, (now - job.t_enqueued) * 1000.0))
+
+    @staticmethod
+    def build_reply(res, latency_ms: float, **extra) -> bytes:
+        lm_bytes, faces, points, w, h, analyses, error, _ = res
+        landmarks = np.frombuffer(lm_bytes, dtype=np.float32).reshape(faces, points, 3) if faces else None
+        header = dict(width=w, height=h, analyses=analyses, latency_ms=round(latency_ms, 2), **extra)
+        if error:
+            header["error"] = error
+        return encode_result(header, landmarks)
+
+    def metrics(self) -> dict:
+        up = time.perf_counter() - self._t_start
+        c = self.counts
+        return {
+            "uptime_s": round(up, 1),
+            "throughput_per_s": round(self.throughput.fps(), 2),
+            "mean_throughput_per_s": round(c["completed"] / up, 2) if up > 0 else 0.0,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "mean_batch": round(c["batched_items"] / c["batches"], 2) if c["batches"] else 0.0,
+            **c,
+            "latency_ms": self.timer.summary(),
+        }
+
+    # --- aiohttp handlers ---
+    async def handle_analyze(self, request):
+        from aiohttp import web
+        blob = await request.read()
+        if not blob:
+            return web.Response(status=400, text="empty body")
+        try:
+            fut = self.submit_nowait(blob)
+        except asyncio.QueueFull:
+            self.counts["rejected"] += 1
+            return web.Response(status=503, text="busy", headers={"Retry-After": "1"})
+        res, latency = await fut
+        return web.Response(body=self.build_reply(res, latency), content_type="application/octet-stream",
+                            status=422 if res[6] else 200)
+
+    async def handle_stream(self, request):
+        from aiohttp import WSMsgType, web
+        ws = web.WebSocketResponse(max_msg_size=32 * 1024 * 1024)
+        await ws.prepare(request)
+        self.counts["streams"] += 1
+        latest = {"blob": None, "seq": 0}
+        ready = asyncio.Event()
+
+        async def worker():
+            # 처리 중에 들어온 프레임은 가장 최신 것만 남깁니다 (latest-frame-wins).
+            while True:
+                await ready.wait()
+                ready.clear()
+                blob, seq = latest["blob"], latest["seq"]
+                latest["blob"] = None
+                if ws.closed:
+                    return
+                fut = await self.submit(blob)
+                res, latency = await fut
+                if ws.closed:
+                    return
+                await ws.send_bytes(self.build_reply(res, latency, seq=seq))
+
+        task = asyncio.create_task(worker())
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.BINARY:
+                    if latest["blob"] is not None:
+                        self.counts["stream_dropped"] += 1
+                    latest["blob"] = msg.data
+                    latest["seq"] += 1
+                    ready.set()
+                elif msg.type == WSMsgType.ERROR:
+                    break
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.exception("AnalysisServer: stream worker failed: %s", e)
+        return ws
+
+    async def handle_metrics(self, request):
+        from aiohttp import web
+        return web.json_response(self.metrics())
+
+    async def handle_health(self, request):
+        from aiohttp import web
+        return web.Response(text="ok")
+
+    def make_app(self):
+        try:
+            from aiohttp import web
+        except ImportError:
+            raise SystemExit("server mode needs aiohttp: pip install aiohttp")
+        app = web.Application(client_max_size=32 * 1024 * 1024)
+        app.router.add_post("/analyze", self.handle_analyze)
+        app.router.add_get("/stream", self.handle_stream)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.router.add_get("/health", self.handle_health)
+        app.on_startup.append(self.start)
+        app.on_cleanup.append(self.stop)
+        return app
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local HTTP/WebSocket FaceMesh analysis service")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("-j", "--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    ap.add_argument("--max-queue", type=int, default=64, help="queued requests before HTTP 503")
+    ap.add_argument("--max-batch", type=int, default=8, help="images per worker round trip")
+    ap.add_argument("--batch-window-ms", type=float, default=5.0, help="wait this long to fill a batch")
+    ap.add_argument("--max-faces", type=int, default=1)
+    ap.add_argument("--mesh", choices=("mediapipe", "synthetic"), default="mediapipe",
+                    help="synthetic: seeded landmarks instead of FaceMesh (load-testing without the model)")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s", stream=sys.stderr)
+    server = AnalysisServer(workers=args.workers, max_queue=args.max_queue, max_batch=args.max_batch,
+                            batch_window_ms=args.batch_window_ms, max_num_faces=args.max_faces,
+                            synthetic=args.mesh == "synthetic")
+    app = server.make_app()
+    from aiohttp import web
+    web.run_app(app, host=args.host, port=args.port, print=lambda msg: logger.info(msg))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
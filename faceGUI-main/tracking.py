@@ -0,0 +1,174 @@
+"""
+Lightweight multi-face tracker.
+
+`FaceTracker.update` takes an (F, N, 3) batch of normalized landmarks, matches
+the faces to existing tracks by bounding-box IoU (greedy, highest IoU first)
+and returns stable integer IDs. Matched tracks are EMA-smoothed in one
+vectorized step over all faces; unmatched tracks survive `max_missed` frames.
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+_FIRST = np.zeros(1, dtype=np.intp)
+_NONE = np.zeros(0, dtype=np.intp)
+
+
+def landmark_boxes(batch: np.ndarray) -> np.ndarray:
+    """(F, N, 3) normalized landmarks -> (F, 4) boxes as x0, y0, x1, y1."""
+    xy = batch[:, :, :2]
+    return np.concatenate([xy.min(axis=1), xy.max(axis=1)], axis=1)
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between (A, 4) and (B, 4) boxes."""
+    if a.size == 0 or b.size == 0:
+        return np.zeros((a.shape[0], b.shape[0]), dtype=np.float32)
+    x0 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y0 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x1 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y1 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-12), 0.0)
+
+
+class FaceTracker:
+    """Assigns stable IDs to faces across frames and smooths their landmarks.
+
+    iou_threshold: minimum IoU to continue a track.
+    max_missed: frames a track may go unmatched before it is dropped.
+    smoothing: EMA weight of the new observation (1.0 = no smoothing).
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_missed: int = 5, smoothing: float = 0.6):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.smoothing = smoothing
+        self._next_id = 1
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.missed = np.zeros(0, dtype=np.int64)
+        self.landmarks: Optional[np.ndarray] = None  # (T, N, 3) smoothed, aligned with self.ids
+        self._ema = np.empty(0, dtype=np.float32)     # EMA 계산용 재사용 버퍼 (이전 / 현재)
+        self._store: Optional[np.ndarray] = None       # out= 을 쓸 때 self.landmarks 의 저장소
+
+    def reset(self) -> None:
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.missed = np.zeros(0, dtype=np.int64)
+        self.landmarks = None
+
+    def _match(self, boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Greedy IoU matching; returns (face_idx, track_idx) arrays."""
+        if boxes.shape[0] == 1 and self.boxes.shape[0] == 1:
+            # 얼굴 하나, 트랙 하나 (기본 설정): 작은 배열 여러 개 대신 float 로 IoU 하나만 계산
+            (ax0, ay0, ax1, ay1), (bx0, by0, bx1, by1) = boxes[0].tolist(), self.boxes[0].tolist()
+            inter = max(min(ax1, bx1) - max(ax0, bx0), 0.0) * max(min(ay1, by1) - max(ay0, by0), 0.0)
+            union = (ax1 - ax0) * (ay1 - ay0) + (bx1 - bx0) * (by1 - by0) - inter
+            iou = inter / max(union, 1e-12) if union > 0 else 0.0
+            return (_FIRST, _FIRST) if iou >= self.iou_threshold else (_NONE, _NONE)
+        iou = iou_matrix(boxes, self.boxes)
+        faces, tracks = [], []
+        if iou.size:
+            order = np.argsort(iou, axis=None)[::-1]
+            used_f, used_t = set(), set()
+            for flat in order:
+                f, t = divmod(int(flat), iou.shape[1])
+                if iou[f, t] < self.iou_threshold:
+                    break
+                if f in used_f or t in used_t:
+                    continue
+                used_f.add(f)
+                used_t.add(t)
+                faces.append(f)
+                tracks.append(t)
+        return np.array(faces, dtype=np.intp), np.array(tracks, dtype=np.intp)
+
+    def update(self, batch: Optional[np.ndarray], out: Optional[np.ndarray] = None
+               ) -> Tuple[List[int], Optional[np.ndarray]]:
+        """Match this frame's faces; returns (ids, smoothed (F, N, 3)) aligned with `batch`.
+
+        With `out` (float32, same shape; may be `batch` itself) the smoothed
+        landmarks are written there and the tracker keeps its own copy in a
+        reused buffer, so a frame allocates no landmark-sized array.
+        """
+        if batch is None or batch.shape[0] == 0:
+            self.missed += 1
+            keep = self.missed <= self.max_missed
+            self._keep(keep)
+            return [], None
+
+        boxes = landmark_boxes(batch)
+        f_idx, t_idx = self._match(boxes)
+        n_faces = batch.shape[0]
+        ids = np.zeros(n_faces, dtype=np.int64)
+        if out is None:
+            smoothed = batch.astype(np.float32, copy=True)
+        else:
+            smoothed = out
+            if out is not batch:
+                np.copyto(out, batch)
+
+        if f_idx.size and self.landmarks is not None and self.landmarks.shape[1:] == batch.shape[1:]:
+            # 매칭된 모든 얼굴을 한 번에 EMA: prev + a * (cur - prev), 재사용 버퍼에서 계산
+            size = smoothed[0].size * f_idx.size
+            if self._ema.shape[0] < 2 * size:
+                self._ema = np.empty(2 * size, dtype=np.float32)
+            prev = self._ema[:size].reshape((f_idx.size,) + batch.shape[1:])
+            cur = self._ema[size:2 * size].reshape(prev.shape)
+            np.take(self.landmarks, t_idx, axis=0, out=prev, mode="clip")
+            np.take(smoothed, f_idx, axis=0, out=cur, mode="clip")
+            cur -= prev
+            cur *= self.smoothing
+            cur += prev
+            for j, f in enumerate(f_idx.tolist()):  # 얼굴 수만큼의 단순 복사 (fancy 대입은 임시 버퍼를 만듦)
+                smoothed[f] = cur[j]
+        if f_idx.size:
+            ids[f_idx] = self.ids[t_idx]
+
+        new_mask = np.ones(n_faces, dtype=bool)
+        new_mask[f_idx] = False
+        n_new = int(new_mask.sum())
+        if n_new:
+            ids[new_mask] = np.arange(self._next_id, self._next_id + n_new)
+            self._next_id += n_new
+
+        # 매칭되지 않은 기존 트랙은 max_missed 프레임 동안 유지합니다.
+        unmatched = np.ones(self.ids.shape[0], dtype=bool)
+        unmatched[t_idx] = False
+        self.missed[unmatched] += 1
+        stale_keep = unmatched & (self.missed <= self.max_missed)
+
+        if self.landmarks is None or self.landmarks.shape[1:] != batch.shape[1:]:
+            stale_keep[:] = False
+        if stale_keep.any():
+            self.ids = np.concatenate([ids, self.ids[stale_keep]])
+            self.boxes = np.concatenate([landmark_boxes(smoothed), self.boxes[stale_keep]])
+            self.missed = np.concatenate([np.zeros(n_faces, dtype=np.int64), self.missed[stale_keep]])
+            self.landmarks = np.concatenate([smoothed, self.landmarks[stale_keep]])
+            return ids.tolist(), smoothed
+        # 흔한 경우 (놓친 트랙 없음): 이어 붙일 것이 없으므로 현재 얼굴만 보관합니다.
+        self.ids = ids
+        self.boxes = landmark_boxes(smoothed)
+        self.missed = np.zeros(n_faces, dtype=np.int64)
+        if out is None:
+            self.landmarks = smoothed  # 새로 만든 배열이고 호출 측은 읽기만 합니다.
+        else:
+            # out 은 호출 측 버퍼이므로 복사해 둡니다 (직전 값은 위에서 이미 읽었음).
+            if self._store is None or self._store.shape != smoothed.shape:
+                self._store = np.empty(smoothed.shape, dtype=np.float32)
+            np.copyto(self._store, smoothed)
+            self.landmarks = self._store
+        return ids.tolist(), smoothed
+
+    def _keep(self, mask: np.ndarray) -> None:
+        self.ids = self.ids[mask]
+        self.boxes = self.boxes[mask]
+        self.missed = self.missed[mask]
+        if self.landmarks is not None:
+            self.landmarks = self.landmarks[mask]
+            if self.landmarks.shape[0] == 0:
+                self.landmarks = None